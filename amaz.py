@@ -2,21 +2,33 @@ from pathlib import Path
 from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
 import time
 import random
-import requests
-import os
-import zipfile
-import sys
-import pickle
+import re
 import logging
-from win32com.client import Dispatch
-from textblob import TextBlob
+from driver_pool import get_pool
+from card_parser import iter_result_cards, select_result_cards
+from prices import parse_price
+from product_stream import lowest_priced
+from result_cache import cached_async
+from sentiment_cache import NEGATIVE_THRESHOLD, POSITIVE_THRESHOLD, polarities, sentiment_label
+from review_store import REVIEW_STORE, add_reviews, amazon_asin, known_review_ids, split_new, stored_reviews
+from profile_pool import launch_with_profile
+from selector_stats import first_match
+from structured_data import product_from_driver
+from session_store import apply_session, has_valid_session, invalidate_session, save_session, session_version
+import driver_resolver
+from driver_resolver import resolve_driver_path, major_of
+from waits import wait_for, wait_for_document, wait_for_staleness
+from fetch_profiles import DEFAULT_PROFILE, apply_profile_options, apply_profile
+from http_fetch import fetch_html
+from html_archive import REPLAY, archive_page, replay_html
+from async_engine import run, run_blocking
+from network_capture import NetworkCapture, enable_capture_options, html_fragments
+from tab_runner import TabJob
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -29,45 +41,16 @@ def log_debug(message):
         print(f"[DEBUG] {message}")
 
 def get_chrome_version():
-    """Get the installed Chrome version."""
-    try:
-        chrome_path = r"C:/Program Files/Google/Chrome/Application/chrome.exe"
-        if os.path.exists(chrome_path):
-            parser = Dispatch('Scripting.FileSystemObject')
-            version = parser.GetFileVersion(chrome_path)
-            return version.split('.')[0]  # Return major version number
-    except Exception as e:
-        log_debug(f"Error getting Chrome version: {e}")
-    return None
+    """Get the installed Chrome major version."""
+    return major_of(driver_resolver.get_chrome_version())
 
 def download_chromedriver():
-    """Download the appropriate ChromeDriver version."""
-    try:
-        chrome_version = get_chrome_version()
-        if not chrome_version:
-            log_debug("Could not determine Chrome version. Please install Chrome first.")
-            sys.exit(1)
-
-        log_debug(f"Downloading ChromeDriver for Chrome version {chrome_version}")
-        download_url = f"https://chromedriver.storage.googleapis.com/LATEST_RELEASE_{chrome_version}"
-        response = requests.get(download_url)
-        driver_version = response.text.strip()
-        
-        driver_url = f"https://chromedriver.storage.googleapis.com/{driver_version}/chromedriver_win32.zip"
-        response = requests.get(driver_url)
-        
-        with open("chromedriver.zip", "wb") as f:
-            f.write(response.content)
-        
-        with zipfile.ZipFile("chromedriver.zip", "r") as zip_ref:
-            zip_ref.extractall()
-        
-        os.remove("chromedriver.zip")
-        log_debug("ChromeDriver downloaded and extracted successfully")
-        return True
-    except Exception as e:
-        log_debug(f"Error downloading ChromeDriver: {e}")
+    """Download the ChromeDriver for the installed Chrome into the local cache."""
+    chrome_version = get_chrome_version()
+    if not chrome_version:
+        log_debug("Could not determine Chrome version. Please install Chrome first.")
         return False
+    return driver_resolver.download_chromedriver(chrome_version) is not None
 
 def get_random_user_agent():
     user_agents = [
@@ -77,8 +60,12 @@ def get_random_user_agent():
     ]
     return random.choice(user_agents)
 
-def setup_chrome_driver(driver_path, headless=False):
-    """Setup Chrome driver with anti-detection measures"""
+def setup_chrome_driver(driver_path, headless=False, profile="full", user_data_dir=None):
+    """Setup Chrome driver with anti-detection measures.
+
+    profile="lean" blocks images, fonts, media and analytics hosts.
+    user_data_dir keeps the HTTP cache and cookies between launches.
+    """
     chrome_options = Options()
     chrome_options.add_argument('--disable-blink-features=AutomationControlled')
     chrome_options.add_argument('--disable-infobars')
@@ -96,208 +83,366 @@ def setup_chrome_driver(driver_path, headless=False):
     if headless:
         chrome_options.add_argument('--headless')
     
+    apply_profile_options(chrome_options, profile)
+    # Result updates and review pages arrive as background ajax responses that can be read directly
+    enable_capture_options(chrome_options)
+    if user_data_dir:
+        chrome_options.add_argument(f'--user-data-dir={user_data_dir}')
+    
     log_debug("Starting Chrome browser...")
     
-    try:
-        service = Service(driver_path)
-        browser = webdriver.Chrome(service=service, options=chrome_options)
-    except Exception as e:
-        if "This version of ChromeDriver only supports Chrome version" in str(e):
-            log_debug("ChromeDriver version mismatch detected. Downloading correct version...")
-            if download_chromedriver():
-                # Retry with new ChromeDriver
-                service = Service(driver_path)
-                browser = webdriver.Chrome(service=service, options=chrome_options)
-            else:
-                raise Exception("Failed to download compatible ChromeDriver")
-        else:
-            raise e
+    # The resolver has already matched the driver to the installed Chrome
+    service = Service(resolve_driver_path(driver_path))
+    browser = webdriver.Chrome(service=service, options=chrome_options)
     
     browser.execute_cdp_cmd('Network.setUserAgentOverride', {
         "userAgent": get_random_user_agent()
     })
     browser.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     browser.set_window_size(1920, 1080)
+    apply_profile(browser, profile)
     return browser
 
-def get_html(url, driver_path):
-    browser = setup_chrome_driver(driver_path, headless=True)
+def get_browser_pool(driver_path, headless=True, profile=DEFAULT_PROFILE):
+    """Shared pool of warm Chrome instances for the given driver, mode and fetch profile"""
+    profile_name = f"amazon-{'headless' if headless else 'visible'}-{profile}"
+    return get_pool(("amazon", driver_path, headless, profile),
+                    lambda: launch_with_profile(profile_name, lambda user_data_dir: setup_chrome_driver(
+                        driver_path, headless=headless, profile=profile, user_data_dir=user_data_dir)))
+
+def get_html(url, driver_path, profile=DEFAULT_PROFILE):
+    if REPLAY:
+        return replay_html(url)
+    with get_browser_pool(driver_path, profile=profile).driver() as browser:
+        capture = NetworkCapture(browser)
+        try:
+            capture.clear()
+            log_debug(f"Navigating to URL: {url}")
+            browser.get(url)
+            
+            # Return as soon as the result cards are rendered instead of sleeping
+            if not wait_for(browser, "amazon", "results"):
+                raise TimeoutException("Search results did not appear")
+            
+            for i in range(3):
+                scroll_amount = random.randint(300, 700)
+                browser.execute_script(f"window.scrollTo(0, {scroll_amount})")
+            
+            log_debug("Page loaded successfully")
+            html = browser.page_source
+            archive_page(url, html)
+            # Results re-rendered by /s/query replace the page's cards; parse those when there are any
+            captured = "".join(fragment for payload in capture.payloads("amazon", "search")
+                               for fragment in html_fragments(payload))
+            if captured and select_result_cards(captured, PRODUCT_CARD_SELECTORS, 1)[1]:
+                log_debug("Using result cards from captured search responses")
+                return captured
+            return html
+        except Exception as e:
+            log_debug(f"Error during page load: {str(e)}")
+            raise
+
+PRICE_SELECTORS = [
+    'span.a-price-whole',
+    'span.a-price span[aria-hidden="true"]',
+    'span.a-price',
+    'span.a-offscreen'
+]
+
+def extract_price(card):
+    def parse(selector):
+        price_elem = card.select_one(selector)
+        return parse_price(price_elem.text) if price_elem else None
     
-    try:
-        log_debug(f"Navigating to URL: {url}")
-        browser.get(url)
-        
-        delay = random.uniform(3, 7)
-        log_debug(f"Waiting {delay:.2f} seconds for page to load...")
-        time.sleep(delay)
-        
-        wait = WebDriverWait(browser, 10)
-        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'div.s-result-item,div[data-component-type="s-search-result"]')))
+    # Fixed order: the broader selectors can match the struck-out list price
+    _, price = first_match("amazon", "price", PRICE_SELECTORS, parse, reorder=False)
+    return price if price is not None else float('inf')  # Return infinity for items with no price
+
+PRODUCT_CARD_SELECTORS = [
+    'div[data-component-type="s-search-result"]',
+    'div.s-result-item',
+    'div.sg-col-inner'
+]
+
+def select_product_cards(html, limit=10):
+    """Parse a search results page and return its first product cards"""
+    log_debug("Parsing result cards...")
+    # Only the card subtrees are parsed, and parsing stops after `limit` cards
+    selector, prod_cards = select_result_cards(html, PRODUCT_CARD_SELECTORS, limit)
+    if prod_cards:
+        log_debug(f"Found {len(prod_cards)} products using selector: {selector}")
+    return prod_cards
+
+def parse_product_card(card, amazon_home='https://www.amazon.in'):
+    """Return [title, price, link] for one result card, or None if it is incomplete"""
+    title_elem = (card.select_one('h2 a.a-link-normal span') or 
+                card.select_one('h2 span.a-text-normal') or
+                card.select_one('h2'))
+    
+    if not title_elem:
+        return None
         
-        for i in range(3):
-            scroll_amount = random.randint(300, 700)
-            browser.execute_script(f"window.scrollTo(0, {scroll_amount})")
-            time.sleep(random.uniform(0.5, 1.5))
+    title = title_elem.text.strip()
+    
+    link_elem = card.select_one('h2 a') or card.select_one('a.a-link-normal')
+    if not link_elem:
+        return None
         
-        log_debug("Page loaded successfully")
-        return browser.page_source
-    except Exception as e:
-        log_debug(f"Error during page load: {str(e)}")
-        raise
-    finally:
-        browser.quit()
+    link = link_elem.get('href', '')
+    if not link.startswith('http'):
+        link = amazon_home + link
+    
+    price = extract_price(card)
+    
+    if title and link and price != float('inf'):
+        return [title, price, link]
+    return None
 
-def extract_price(card):
-    price_selectors = [
-        'span.a-price-whole',
-        'span.a-price span[aria-hidden="true"]',
-        'span.a-price',
-        'span.a-offscreen'
-    ]
+def iter_search_results(html, limit=10):
+    """Yield each complete product from a search results page as soon as its card is parsed"""
+    for card in iter_result_cards(html, PRODUCT_CARD_SELECTORS, limit):
+        try:
+            product = parse_product_card(card)
+        except Exception as e:
+            log_debug(f"Error processing product: {str(e)}")
+            continue
+        if product:
+            yield product
+
+def parse_search_results(html, limit=10):
+    """Parse every complete product from a search results page"""
+    return list(iter_search_results(html, limit))
+
+REVIEW_TITLE_SELECTORS = [
+    'a[data-hook="review-title"]', 
+    'span[data-hook="review-title"]',
+    '.review-title',
+    '.a-size-base.review-title',
+    'div[data-hook="review"]',
+    'div.review',
+    'div.a-section.review'
+]
+
+# Newest reviews first, so a refresh can stop at the first page of known ones
+REVIEW_SORT = "?sortBy=recent" if REVIEW_STORE else ""
+
+# Star rating out of a "4.3 out of 5 stars" label
+RATING_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+# id, title, text and star rating of every review on the page in one call
+REVIEW_RECORDS_SCRIPT = """
+return Array.from(document.querySelectorAll('div[data-hook="review"]')).map(review => {
+    const title = review.querySelector('[data-hook="review-title"]');
+    const spans = title ? title.querySelectorAll('span') : [];
+    const body = review.querySelector('[data-hook="review-body"]');
+    const stars = review.querySelector('[data-hook="review-star-rating"], [data-hook="cmps-review-star-rating"]');
+    return {
+        id: review.id || null,
+        title: title ? (spans.length ? spans[spans.length - 1] : title).textContent.trim() : '',
+        text: body ? body.innerText.trim() : '',
+        rating: stars ? parseFloat(stars.textContent) || null : null
+    };
+});
+"""
+
+def parse_review_titles_html(html):
+    """Static-HTML counterpart of AmazonReviewScraper.extract_review_titles"""
+    soup = BeautifulSoup(html, 'lxml')
+    review_titles = []
+    for selector in REVIEW_TITLE_SELECTORS:
+        elements = soup.select(selector)
+        if elements:
+            for element in elements:
+                title = element.get_text("\n", strip=True)
+                if title and len(title) > 5:
+                    review_titles.append(title.split("\n")[0])
+            break
+    return list(dict.fromkeys(review_titles))
+
+def parse_review_records_html(html):
+    """Static-HTML counterpart of REVIEW_RECORDS_SCRIPT"""
+    soup = BeautifulSoup(html, 'lxml')
+    records = []
+    for review in soup.select('div[data-hook="review"]'):
+        title = review.select_one('[data-hook="review-title"]')
+        spans = title.select('span') if title else []
+        body = review.select_one('[data-hook="review-body"]')
+        stars = review.select_one('[data-hook="review-star-rating"], [data-hook="cmps-review-star-rating"]')
+        rating = re.search(r'\d+(?:\.\d+)?', stars.get_text()) if stars else None
+        records.append({
+            'id': review.get('id'),
+            'title': (spans[-1] if spans else title).get_text().strip() if title else '',
+            'text': body.get_text("\n").strip() if body else '',
+            'rating': float(rating.group()) if rating else None,
+        })
+    return records
+
+def amazon_search_job(search_term):
+    """Tab job that loads an Amazon search and parses its products"""
+    url = f"https://www.amazon.in/s?k={search_term.replace(' ', '+')}"
+    return TabJob(url, "amazon", "results", parse_search_results)
+
+def amazon_review_job(product_url):
+    """Tab job that loads the first review page of a product and parses its titles"""
+    asin = amazon_asin(product_url)
+    if not asin:
+        raise ValueError(f"No ASIN in {product_url}")
+    url = f"https://www.amazon.in/product-reviews/{asin}/{REVIEW_SORT}"
+    return TabJob(url, "amazon", "reviews", parse_review_titles_html)
+
+def fetch_product_cards(url, driver_path, profile=DEFAULT_PROFILE, try_http=True, limit=10):
+    """Get the product cards for a search page, over plain HTTP if possible.
+
+    Falls back to a pooled browser only when the static response has no
+    parsable result cards.
+    """
+    return list(iter_product_cards(url, driver_path, profile, try_http, limit))
+
+def iter_product_cards(url, driver_path, profile=DEFAULT_PROFILE, try_http=True, limit=10):
+    """Generator form of fetch_product_cards: cards are yielded while the page is still being parsed"""
+    if try_http:
+        html = fetch_html(url)
+        if html:
+            cards = iter_result_cards(html, PRODUCT_CARD_SELECTORS, limit)
+            first = next(cards, None)
+            if first is not None:
+                log_debug("Using static HTML - no browser needed")
+                yield first
+                yield from cards
+                return
+            log_debug("Static HTML has no result cards, falling back to the browser")
     
-    for selector in price_selectors:
-        price_elem = card.select_one(selector)
-        if price_elem:
-            price_text = price_elem.text.strip().replace('₹', '').replace(',', '').strip('.')
-            # Extract numeric part only
-            import re
-            price_match = re.search(r'\d+(?:\.\d+)?', price_text)
-            if price_match:
-                return float(price_match.group())
-    return float('inf')  # Return infinity for items with no price
-
-def find_lowest_price_product(search_term, driver_path):
+    yield from iter_result_cards(get_html(url, driver_path, profile=profile), PRODUCT_CARD_SELECTORS, limit)
+
+def stream_amazon_products(search_term, driver_path, profile=DEFAULT_PROFILE, limit=10):
+    """Yield [title, price, link] for each complete result card as soon as it is parsed.
+
+    Cards after the point where the consumer stops iterating are never parsed.
+    A failed or empty page is retried, but only until the first product has
+    been yielded.
+    """
     search_term = search_term.replace(' ', '+')
     amazon_link = f"https://www.amazon.in/s?k={search_term}"
-    amazon_home = 'https://www.amazon.in'
-    max_retries = 3
+    # A replayed page is the same on every attempt
+    max_retries = 1 if REPLAY else 3
     retry_count = 0
     
-    lowest_price = float('inf')
-    lowest_price_product = None
-    
     while retry_count < max_retries:
+        yielded = 0
         try:
-            html = get_html(amazon_link, driver_path)
-            log_debug("Parsing HTML with BeautifulSoup...")
-            soup = BeautifulSoup(html, 'lxml')
-            
-            selectors = [
-                'div[data-component-type="s-search-result"]',
-                'div.s-result-item',
-                'div.sg-col-inner'
-            ]
-            
-            prod_cards = []
-            for selector in selectors:
-                prod_cards = soup.select(selector)
-                if prod_cards:
-                    log_debug(f"Found {len(prod_cards)} products using selector: {selector}")
-                    break
-            
-            if not prod_cards:
-                retry_count += 1
-                log_debug(f"No products found. Retry {retry_count}/{max_retries}")
-                time.sleep(random.uniform(5, 10))
-                continue
-            
-            items = []
-            for idx, card in enumerate(prod_cards[:10]):  # Look at first 10 products
+            # Only the first attempt tries plain HTTP; retries go straight to the browser
+            for idx, card in enumerate(iter_product_cards(amazon_link, driver_path, profile=profile,
+                                                          try_http=retry_count == 0, limit=limit)):
                 try:
-                    title_elem = (card.select_one('h2 a.a-link-normal span') or 
-                                card.select_one('h2 span.a-text-normal') or
-                                card.select_one('h2'))
-                    
-                    if not title_elem:
-                        continue
-                        
-                    title = title_elem.text.strip()
-                    
-                    link_elem = card.select_one('h2 a') or card.select_one('a.a-link-normal')
-                    if not link_elem:
-                        continue
-                        
-                    link = link_elem.get('href', '')
-                    if not link.startswith('http'):
-                        link = amazon_home + link
-                    
-                    price = extract_price(card)
-                    
-                    if title and link and price != float('inf'):
-                        items.append([title, price, link])
-                        print(f"\nProduct {idx + 1}:")
-                        print(f"Title: {title}")
-                        print(f"Price: ₹{price}")
-                        print(f"Link: {link}")
-                        
-                        if price < lowest_price:
-                            lowest_price = price
-                            lowest_price_product = [title, price, link]
-                
+                    product = parse_product_card(card)
                 except Exception as e:
                     log_debug(f"Error processing product {idx + 1}: {str(e)}")
                     continue
+                if product:
+                    yielded += 1
+                    yield product
             
-            if items:
-                print("\n" + "="*50)
-                print(f"LOWEST PRICE PRODUCT:")
-                print(f"Title: {lowest_price_product[0]}")
-                print(f"Price: ₹{lowest_price_product[1]}")
-                print(f"Link: {lowest_price_product[2]}")
-                print("="*50)
-                return lowest_price_product
+            if yielded:
+                return
+            
+            retry_count += 1
+            log_debug(f"No products found. Retry {retry_count}/{max_retries}")
+            if retry_count < max_retries:
+                time.sleep(random.uniform(5, 10))
             
         except Exception as e:
+            if yielded:
+                # Products already went to the consumer; a retry would repeat them
+                log_debug(f"Error after {yielded} products, stopping: {str(e)}")
+                return
             retry_count += 1
             log_debug(f"Error during scraping (attempt {retry_count}/{max_retries}): {str(e)}")
             if retry_count < max_retries:
                 time.sleep(random.uniform(5, 10))
             else:
                 print(f"Error during scraping: {str(e)}")
+
+def _find_lowest_price_product(search_term, driver_path, profile=DEFAULT_PROFILE):
+    shown = []
     
-    return None
+    def show(product):
+        title, price, link = product
+        shown.append(product)
+        print(f"\nProduct {len(shown)}:")
+        print(f"Title: {title}")
+        print(f"Price: ₹{price}")
+        print(f"Link: {link}")
+    
+    cheapest = lowest_priced(stream_amazon_products(search_term, driver_path, profile), on_product=show)
+    if not cheapest:
+        return None
+    
+    lowest_price_product = cheapest[0]
+    print("\n" + "="*50)
+    print(f"LOWEST PRICE PRODUCT:")
+    print(f"Title: {lowest_price_product[0]}")
+    print(f"Price: ₹{lowest_price_product[1]}")
+    print(f"Link: {lowest_price_product[2]}")
+    print("="*50)
+    return lowest_price_product
+
+async def find_lowest_price_product_async(search_term, driver_path, profile=DEFAULT_PROFILE):
+    """Search Amazon without blocking the event loop (bounded per domain)"""
+    return await cached_async("amazon-lowest", search_term, "amazon.in",
+                              lambda: _find_lowest_price_product(search_term, driver_path, profile))
+
+def find_lowest_price_product(search_term, driver_path, profile=DEFAULT_PROFILE):
+    return run(find_lowest_price_product_async(search_term, driver_path, profile))
 
 class AmazonReviewScraper:
-    def __init__(self, driver_path):
+    def __init__(self, driver_path, profile="full"):
+        # Full profile by default: the login page may need images (captcha)
         self.driver_path = driver_path
         self.driver = None
+        self.pool = get_browser_pool(driver_path, headless=False, profile=profile)
+        self._pooled = None
+        self.capture = None
+        self.session_version = None
+        self.product_info = {}
     
     def setup_driver(self):
-        """Setup Chrome driver with anti-detection measures - visible browser for login"""
-        self.driver = setup_chrome_driver(self.driver_path, headless=False)
+        """Borrow a visible Chrome driver from the pool - visible browser for login"""
+        self._pooled = self.pool.checkout()
+        self.driver = self._pooled.driver
+        # Start from an empty network log so only this scrape's review responses are read
+        self.capture = NetworkCapture(self.driver)
+        self.capture.clear()
+        # Reuse a stored sign-in without loading a page; login is only asked for if Amazon rejects it
+        if has_valid_session("amazon"):
+            self.session_version = apply_session(self.driver, "amazon")
         return self.driver
 
+    def release_driver(self, pages=1):
+        """Return the borrowed driver to the pool"""
+        if self._pooled:
+            self.pool.checkin(self._pooled, pages=pages)
+            self._pooled = None
+            self.driver = None
+            self.capture = None
+
     def handle_login(self):
         """Handle Amazon login process"""
         try:
-            # First check if we have saved cookies
-            if os.path.exists('amazon_cookies.pkl'):
-                try:
-                    # Try to load existing cookies
-                    self.driver.get("https://www.amazon.in")
-                    cookies = pickle.load(open("amazon_cookies.pkl", "rb"))
-                    for cookie in cookies:
-                        try:
-                            self.driver.add_cookie(cookie)
-                        except Exception:
-                            pass
-                    self.driver.refresh()
-                    time.sleep(3)
-                    
-                    # Check if login was successful
-                    if "Hello, Sign in" not in self.driver.page_source and "Sign in" not in self.driver.page_source:
-                        logger.info("Successfully logged in using saved cookies")
-                        return True
-                    else:
-                        logger.info("Saved cookies expired or invalid, proceeding to manual login")
-                        os.remove("amazon_cookies.pkl")  # Remove invalid cookies
-                except Exception as e:
-                    logger.error(f"Error loading cookies: {e}")
-                    os.remove("amazon_cookies.pkl")  # Remove corrupted cookies
+            # Another worker may have signed in since this browser picked up the shared session
+            if session_version("amazon") != self.session_version and has_valid_session("amazon"):
+                self.session_version = apply_session(self.driver, "amazon")
+                logger.info("Using the Amazon session saved by another worker")
+                return True
+            
+            if self.session_version is not None:
+                # Amazon rejected the stored session - make sure nobody else reuses it
+                logger.info("Saved cookies expired or invalid, proceeding to manual login")
+                invalidate_session("amazon", self.session_version)
+                self.session_version = None
             
             # Navigate to login page
             self.driver.get("https://www.amazon.in/ap/signin")
-            time.sleep(2)
+            wait_for(self.driver, "amazon", "login")
             
             # Prompt user for manual login
             print("\n==== AMAZON LOGIN REQUIRED ====")
@@ -306,9 +451,9 @@ class AmazonReviewScraper:
             print("=========================================")
             input()
             
-            # Save cookies after successful login
-            time.sleep(2)
-            pickle.dump(self.driver.get_cookies(), open("amazon_cookies.pkl", "wb"))
+            # Share the new session with every other worker
+            wait_for_document(self.driver)
+            self.session_version = save_session("amazon", self.driver.get_cookies())
             logger.info("Saved new cookies after manual login")
             return True
             
@@ -316,18 +461,60 @@ class AmazonReviewScraper:
             logger.error(f"Login error: {e}")
             return False
 
+    def extract_product_info(self):
+        """Name, price, rating and ASIN of the loaded product page"""
+        product_info = {}
+        
+        # Structured data answers every field in one or two round-trips
+        record = product_from_driver(self.driver)
+        if record and record.name:
+            product_info = {'name': record.name, 'price': record.price, 'rating': record.rating,
+                            'rating_count': record.rating_count, 'asin': record.sku}
+            logger.info(f"Found product info in structured data: {record.name}")
+        
+        # DOM lookups only for what the structured data did not have
+        fallbacks = {
+            'name': (By.ID, "productTitle"),
+            'price': (By.CSS_SELECTOR, "#corePriceDisplay_desktop_feature_div .a-price .a-offscreen"),
+            'rating': (By.CSS_SELECTOR, "#acrPopover"),
+            'asin': (By.ID, "ASIN"),
+        }
+        for field, locator in fallbacks.items():
+            if product_info.get(field) is not None:
+                continue
+            try:
+                element = self.driver.find_element(*locator)
+            except NoSuchElementException:
+                continue
+            if field == 'asin':
+                product_info[field] = element.get_attribute("value")
+            elif field == 'rating':
+                # "4.3 out of 5 stars"
+                rating = RATING_PATTERN.search(element.get_attribute("title") or element.text)
+                product_info[field] = float(rating.group()) if rating else None
+            elif field == 'price':
+                product_info[field] = parse_price(element.get_attribute("textContent"))
+            else:
+                product_info[field] = element.text.strip()
+        
+        # Only a 10-character ASIN is usable in the review URL
+        asin = product_info.get('asin')
+        if asin and not (len(str(asin)) == 10 and str(asin).isalnum()):
+            product_info['asin'] = None
+        return product_info
+    
     def navigate_to_reviews(self, product_url):
         """Try multiple methods to access reviews"""
         # Method 1: Try direct review URL
         try:
             # Extract product ID from URL and create review URL
-            if "/dp/" in product_url:
-                product_id = product_url.split("/dp/")[1].split("/")[0]
-                review_url = f"https://www.amazon.in/product-reviews/{product_id}/"
+            url_asin = amazon_asin(product_url)
+            if url_asin:
+                review_url = f"https://www.amazon.in/product-reviews/{url_asin}/{REVIEW_SORT}"
                 
                 logger.info(f"Navigating directly to reviews URL: {review_url}")
                 self.driver.get(review_url)
-                time.sleep(3)
+                wait_for(self.driver, "amazon", ("reviews", "login"))
                 
                 # Check if we need login
                 if "Sign in" in self.driver.page_source and "for your security" in self.driver.page_source:
@@ -336,7 +523,7 @@ class AmazonReviewScraper:
                         return False
                     # Retry after login
                     self.driver.get(review_url)
-                    time.sleep(3)
+                    wait_for(self.driver, "amazon", "reviews")
                 
                 # Check if we landed on a review page
                 review_indicators = ["customer reviews", "Customer reviews", "Top reviews", "top reviews"]
@@ -348,7 +535,7 @@ class AmazonReviewScraper:
             # Method 2: Try original product page and click review link
             logger.info("Direct review URL failed, trying product page...")
             self.driver.get(product_url)
-            time.sleep(3)
+            wait_for(self.driver, "amazon", ("product", "login"))
             
             # Check for login requirement
             if "Sign in" in self.driver.page_source and "for your security" in self.driver.page_source:
@@ -357,19 +544,35 @@ class AmazonReviewScraper:
                     return False
                 # Retry after login
                 self.driver.get(product_url)
-                time.sleep(3)
+                wait_for(self.driver, "amazon", "product")
+                
+            # Without an ASIN in the URL, the product record usually names it,
+            # which gives the review URL directly
+            asin = None
+            if not url_asin:
+                self.product_info = self.extract_product_info()
+                asin = self.product_info.get('asin')
+            if asin:
+                review_url = f"https://www.amazon.in/product-reviews/{asin}/{REVIEW_SORT}"
+                logger.info(f"Navigating to reviews URL from product data: {review_url}")
+                self.driver.get(review_url)
+                wait_for(self.driver, "amazon", "reviews")
+                if "customer reviews" in self.driver.page_source.lower():
+                    return True
+                self.driver.get(product_url)
+                wait_for(self.driver, "amazon", "product")
                 
             # Try to find and click a review link
             try:
+                # The product page is already loaded, so look the links up directly
+                # instead of waiting out a timeout on every candidate that is absent
                 review_link_texts = ["See all reviews", "See all customer reviews", "See more reviews"]
                 for text in review_link_texts:
                     try:
-                        review_link = WebDriverWait(self.driver, 3).until(
-                            EC.element_to_be_clickable((By.PARTIAL_LINK_TEXT, text))
-                        )
+                        review_link = self.driver.find_element(By.PARTIAL_LINK_TEXT, text)
                         review_link.click()
                         logger.info(f"Clicked '{text}' link")
-                        time.sleep(3)
+                        wait_for(self.driver, "amazon", "reviews")
                         return True
                     except:
                         continue
@@ -379,12 +582,10 @@ class AmazonReviewScraper:
                                    "a.a-link-emphasis[href*='customer-reviews']"]
                 for selector in review_selectors:
                     try:
-                        review_link = WebDriverWait(self.driver, 3).until(
-                            EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                        )
+                        review_link = self.driver.find_element(By.CSS_SELECTOR, selector)
                         review_link.click()
                         logger.info(f"Clicked review link using selector: {selector}")
-                        time.sleep(3)
+                        wait_for(self.driver, "amazon", "reviews")
                         return True
                     except:
                         continue
@@ -406,19 +607,11 @@ class AmazonReviewScraper:
     def extract_review_titles(self):
         """Extract review titles and comments from the current page"""
         review_titles = []
-        time.sleep(2)
+        wait_for(self.driver, "amazon", "reviews", timeout=5)
 
         try:
             # Try multiple selectors for reviews
-            selectors = [
-                'a[data-hook="review-title"]', 
-                'span[data-hook="review-title"]',
-                '.review-title',
-                '.a-size-base.review-title',
-                'div[data-hook="review"]',
-                'div.review',
-                'div.a-section.review'
-            ]
+            selectors = REVIEW_TITLE_SELECTORS
             
             for selector in selectors:
                 elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
@@ -429,7 +622,7 @@ class AmazonReviewScraper:
             if not elements:
                 # Try scrolling to load potential lazy-loaded content
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
+                wait_for(self.driver, "amazon", "reviews", timeout=3)
                 
                 # Try again after scrolling
                 for selector in selectors:
@@ -460,6 +653,29 @@ class AmazonReviewScraper:
             logger.error(f"Error extracting review titles: {e}")
             return []
 
+    def extract_review_records(self):
+        """Reviews on the current page as {id, title, text, rating}, in page order"""
+        wait_for(self.driver, "amazon", "reviews", timeout=5)
+        # Pages fetched by the ajax pagination are read from their responses first
+        records = []
+        if self.capture:
+            for payload in self.capture.payloads("amazon", "reviews", new_only=True):
+                for fragment in html_fragments(payload):
+                    records.extend(r for r in parse_review_records_html(fragment) if r['title'])
+        if records:
+            logger.info(f"Extracted {len(records)} reviews from captured responses")
+            return records
+        try:
+            records = [r for r in self.driver.execute_script(REVIEW_RECORDS_SCRIPT) or [] if r.get('title')]
+        except Exception as e:
+            logger.info(f"Could not read review records: {e}")
+            records = []
+        if records:
+            logger.info(f"Extracted {len(records)} reviews with ids")
+            return records
+        # Older layouts without data-hook reviews: titles only, identified by their hash
+        return [{'id': None, 'title': title, 'text': '', 'rating': None} for title in self.extract_review_titles()]
+
     def go_to_next_page(self):
         """Attempt to go to the next page of reviews"""
         try:
@@ -475,8 +691,12 @@ class AmazonReviewScraper:
                     next_button = self.driver.find_element(By.CSS_SELECTOR, selector)
                     # Make sure it's not disabled
                     if "a-disabled" not in next_button.get_attribute("class") and next_button.is_displayed():
+                        first_review = self.driver.find_elements(By.CSS_SELECTOR, 'div[data-hook="review"]')
                         next_button.click()
-                        time.sleep(3)
+                        # Wait for the old reviews to be replaced rather than a fixed delay
+                        if first_review:
+                            wait_for_staleness(self.driver, first_review[0])
+                        wait_for(self.driver, "amazon", "reviews")
                         logger.info("Navigated to next page")
                         return True
                 except NoSuchElementException:
@@ -499,19 +719,16 @@ class AmazonReviewScraper:
         neutral_count = 0
 
         print("\n🔹 Sentiment Analysis of Reviews:")
-        for i, review in enumerate(reviews, start=1):
-            sentiment = TextBlob(review).sentiment.polarity  # Get sentiment score
-            sentiment_str = ""
+        # Cached scores: a review already scored (here or by the UI) is not scored again
+        for i, (review, sentiment) in enumerate(zip(reviews, polarities(reviews)), start=1):
+            sentiment_str = sentiment_label(sentiment)
             
-            if sentiment > 0.1:
+            if sentiment > POSITIVE_THRESHOLD:
                 positive_count += 1
-                sentiment_str = "Positive 👍"
-            elif sentiment < -0.1:
+            elif sentiment < NEGATIVE_THRESHOLD:
                 negative_count += 1
-                sentiment_str = "Negative 👎"
             else:
                 neutral_count += 1
-                sentiment_str = "Neutral 😐"
                 
             print(f"{i}. \"{review}\" - {sentiment_str} (score: {sentiment:.2f})")
 
@@ -539,9 +756,17 @@ class AmazonReviewScraper:
         else:
             return "Neutral ⚖️ (Equal positive and negative sentiment)"
 
+    async def scrape_review_titles_async(self, product_url, max_pages=2):
+        """Async version of scrape_review_titles, bounded per domain"""
+        return await run_blocking("amazon.in", self._scrape_review_titles, product_url, max_pages)
+
     def scrape_review_titles(self, product_url, max_pages=2):
         """Scrape up to max_pages review titles from Amazon and analyze sentiment"""
+        return run(self.scrape_review_titles_async(product_url, max_pages))
+
+    def _scrape_review_titles(self, product_url, max_pages=2):
         self.setup_driver()
+        self.product_info = {}
         all_titles = []
         page_number = 1
 
@@ -551,20 +776,36 @@ class AmazonReviewScraper:
                 logger.error("Failed to navigate to reviews")
                 # Still attempt to extract from current page
             
+            # Reviews stored by an earlier run end the paging early
+            asin = amazon_asin(product_url) or self.product_info.get('asin') or amazon_asin(self.driver.current_url)
+            known = known_review_ids("amazon", asin)
+            new_reviews = []
+            
             # Extract reviews from pages
             while page_number <= max_pages:
                 logger.info(f"Scraping page {page_number}")
 
-                page_titles = self.extract_review_titles()
-                all_titles.extend(page_titles)
-                logger.info(f"Collected {len(page_titles)} titles from page {page_number}")
+                page_reviews = self.extract_review_records()
+                page_new, reached_known = split_new(page_reviews, known)
+                new_reviews.extend(page_new)
+                logger.info(f"Collected {len(page_new)} new of {len(page_reviews)} titles from page {page_number}")
 
-                if not page_titles or not self.go_to_next_page():
+                if reached_known:
+                    logger.info("Reached reviews seen on an earlier run")
+                    break
+                if not page_reviews or not self.go_to_next_page():
                     logger.info("No more pages available")
                     break
 
                 page_number += 1
-                time.sleep(2)
+
+            if asin and REVIEW_STORE:
+                add_reviews("amazon", asin, new_reviews)
+                # Analyse the newest reviews, as many as a full scrape of max_pages would give
+                reviews = stored_reviews("amazon", asin, limit=max_pages * 10)
+            else:
+                reviews = new_reviews
+            all_titles = list(dict.fromkeys(r['title'] for r in reviews if r['title'] and len(r['title']) > 5))
 
             # Perform sentiment analysis
             if all_titles:
@@ -577,8 +818,7 @@ class AmazonReviewScraper:
             logger.error(f"Error during review scraping: {e}")
             return [], f"Error occurred: {str(e)}"
         finally:
-            if self.driver:
-                self.driver.quit()
+            self.release_driver(pages=page_number)
 
 def main():
     # Setup chrome driver path
@@ -608,8 +848,8 @@ def main():
     
     # Clear existing cookies if user wants to
     cookie_choice = input("\nDo you want to clear existing login cookies and log in again? (y/n): ").strip().lower()
-    if cookie_choice == 'y' and os.path.exists('amazon_cookies.pkl'):
-        os.remove('amazon_cookies.pkl')
+    if cookie_choice == 'y' and session_version("amazon") is not None:
+        invalidate_session("amazon")
         print("Existing cookies cleared. You will need to log in again.")
     
     review_titles, decision = scraper.scrape_review_titles(product_url, max_pages=3)
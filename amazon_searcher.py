@@ -1,5 +1,3 @@
-import time
-import pickle
 import os
 import logging
 from selenium import webdriver
@@ -10,6 +8,9 @@ from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from textblob import TextBlob  # Import TextBlob for sentiment analysis
+from driver_resolver import resolve_driver_path
+from session_store import apply_session, has_valid_session, save_session
+from waits import wait_for, wait_for_staleness
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -30,7 +31,7 @@ class AmazonReviewScraper:
         chrome_options.add_experimental_option('useAutomationExtension', False)
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
 
-        service = Service(executable_path=self.driver_path)
+        service = Service(executable_path=resolve_driver_path(self.driver_path))
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
 
         self.driver.execute_cdp_cmd('Network.setUserAgentOverride', {
@@ -40,23 +41,21 @@ class AmazonReviewScraper:
 
     def handle_login(self):
         """Handle Amazon login process"""
-        if os.path.exists('amazon_cookies.pkl'):
-            self.driver.get("https://www.amazon.in")
-            cookies = pickle.load(open("amazon_cookies.pkl", "rb"))
-            for cookie in cookies:
-                self.driver.add_cookie(cookie)
+        # A valid stored session is installed without loading any page
+        if has_valid_session("amazon"):
+            apply_session(self.driver, "amazon")
             return True
 
         self.driver.get("https://www.amazon.in")
         print("\nPlease log in to Amazon manually and press Enter to continue...")
         input()
-        pickle.dump(self.driver.get_cookies(), open("amazon_cookies.pkl", "wb"))
+        save_session("amazon", self.driver.get_cookies())
         return True
 
     def navigate_to_reviews(self, product_url):
         """Navigate to the full review page by clicking 'See more reviews'"""
         self.driver.get(product_url)
-        time.sleep(3)
+        wait_for(self.driver, "amazon", "product")
 
         try:
             see_more_button = WebDriverWait(self.driver, 5).until(
@@ -64,7 +63,7 @@ class AmazonReviewScraper:
             )
             see_more_button.click()
             logger.info("Clicked 'See all reviews' to access the full review page.")
-            time.sleep(3)
+            wait_for(self.driver, "amazon", "reviews")
             return True
         except TimeoutException:
             logger.error("Could not find 'See all reviews' button. Proceeding with main product page.")
@@ -73,7 +72,7 @@ class AmazonReviewScraper:
     def extract_review_titles(self):
         """Extract only bolded review titles from the current page"""
         review_titles = []
-        time.sleep(2)
+        wait_for(self.driver, "amazon", "reviews", timeout=5)
 
         try:
             # Fixed: Updated selector to match Amazon's current structure
@@ -95,7 +94,7 @@ class AmazonReviewScraper:
         try:
             next_button = self.driver.find_element(By.CSS_SELECTOR, 'li.a-last a')
             next_button.click()
-            time.sleep(2)
+            wait_for_staleness(self.driver, next_button)
             return True
         except NoSuchElementException:
             return False
@@ -149,7 +148,6 @@ class AmazonReviewScraper:
                 break
 
             page_number += 1
-            time.sleep(2)
 
         self.driver.quit()
 
@@ -170,8 +168,8 @@ def get_driver_path():
         if not driver_path:
             driver_path = "chromedriver.exe"
             
-        # Check if the file exists
-        if os.path.isfile(driver_path):
+        # Accept the path if it exists or a matching driver can be resolved for it
+        if os.path.isfile(resolve_driver_path(driver_path)):
             return driver_path
         else:
             print(f"⚠️ The file '{driver_path}' does not exist. Please enter a valid path.")
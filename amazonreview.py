@@ -1,12 +1,18 @@
 from pathlib import Path
-from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
 import time
 import random
+from selenium.common.exceptions import TimeoutException
+from driver_pool import get_pool
+from card_parser import select_result_cards
+from prices import format_price, parse_price
+from profile_pool import launch_with_profile
+from driver_resolver import resolve_driver_path
+from waits import wait_for
+from fetch_profiles import DEFAULT_PROFILE, apply_profile_options, apply_profile
+from http_fetch import fetch_html
+from html_archive import REPLAY, archive_page, replay_html
 
 DEBUG = True
 
@@ -22,7 +28,7 @@ def get_random_user_agent():
     ]
     return random.choice(user_agents)
 
-def get_html(url):
+def create_browser(user_data_dir=None):
     op = webdriver.ChromeOptions()
     op.add_argument('--disable-blink-features=AutomationControlled')
     op.add_argument('--no-sandbox')
@@ -37,40 +43,49 @@ def get_html(url):
     op.add_argument('--disable-gpu')
     op.add_argument('--disable-software-rasterizer')
     
+    # Skip images, fonts, media and trackers - only text and links are parsed
+    apply_profile_options(op, DEFAULT_PROFILE)
+    if user_data_dir:
+        op.add_argument(f'--user-data-dir={user_data_dir}')
+    
     log_debug("Starting Chrome browser...")
     
-    service = Service(DRIVER_PATH)
+    service = Service(resolve_driver_path(DRIVER_PATH))
     browser = webdriver.Chrome(service=service, options=op)
     
     # Set window size to look more like a real browser
     browser.set_window_size(1920, 1080)
+    return apply_profile(browser, DEFAULT_PROFILE)
+
+def get_html(url):
+    if REPLAY:
+        return replay_html(url)
+    pool = get_pool(("amazonreview", DRIVER_PATH), lambda: launch_with_profile("amazonreview", create_browser))
+    pooled = pool.checkout()
+    browser = pooled.driver
     
     try:
         log_debug(f"Navigating to URL: {url}")
         browser.get(url)
         
-        # Add random delay between 3-7 seconds
-        delay = random.uniform(3, 7)
-        log_debug(f"Waiting {delay:.2f} seconds for page to load...")
-        time.sleep(delay)
-        
-        # Wait for specific elements instead of fixed time
-        wait = WebDriverWait(browser, 10)
-        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'div.s-result-item,div[data-component-type="s-search-result"]')))
+        # Wait for the result cards instead of a fixed delay
+        if not wait_for(browser, "amazon", "results"):
+            raise TimeoutException("Search results did not appear")
         
         # Simulate human-like scrolling
         for i in range(3):
             scroll_amount = random.randint(300, 700)
             browser.execute_script(f"window.scrollTo(0, {scroll_amount})")
-            time.sleep(random.uniform(0.5, 1.5))
         
         log_debug("Page loaded successfully")
-        return browser.page_source
+        html = browser.page_source
+        archive_page(url, html)
+        return html
     except Exception as e:
         log_debug(f"Error during page load: {str(e)}")
         raise
     finally:
-        browser.quit()
+        pool.checkin(pooled)
 
 def extract_price(card):
     """Extract price using multiple possible selectors"""
@@ -84,36 +99,41 @@ def extract_price(card):
     for selector in price_selectors:
         price_elem = card.select_one(selector)
         if price_elem:
-            price = price_elem.text.strip().replace('₹', '').replace(',', '').strip('.')
-            if price:
+            price = parse_price(price_elem.text)
+            if price is not None:
                 return price
     return 'Price not available'
 
+CARD_SELECTORS = [
+    'div[data-component-type="s-search-result"]',
+    'div.s-result-item',
+    'div.sg-col-inner'
+]
+
+def select_cards(html, limit=5):
+    """Parse a results page and return the first product cards, if any"""
+    log_debug("Parsing result cards...")
+    # Only the card subtrees are parsed, and parsing stops after `limit` cards
+    selector, prod_cards = select_result_cards(html, CARD_SELECTORS, limit)
+    if prod_cards:
+        log_debug(f"Found {len(prod_cards)} products using selector: {selector}")
+    return prod_cards
+
 def amazon():
     URL = amazon_link
     amazon_home = 'https://www.amazon.in'
     
-    max_retries = 3
+    # A replayed page is the same on every attempt, so one is enough
+    max_retries = 1 if REPLAY else 3
     retry_count = 0
     
     while retry_count < max_retries:
         try:
-            html = get_html(URL)
-            log_debug("Parsing HTML with BeautifulSoup...")
-            soup = BeautifulSoup(html, 'lxml')
-            
-            selectors = [
-                'div[data-component-type="s-search-result"]',
-                'div.s-result-item',
-                'div.sg-col-inner'
-            ]
-            
-            prod_cards = []
-            for selector in selectors:
-                prod_cards = soup.select(selector)
-                if prod_cards:
-                    log_debug(f"Found {len(prod_cards)} products using selector: {selector}")
-                    break
+            # Plain HTTP first; only start the browser when that has no result cards
+            html = fetch_html(URL) if retry_count == 0 else None
+            prod_cards = select_cards(html) if html else []
+            if not prod_cards:
+                prod_cards = select_cards(get_html(URL))
             
             if not prod_cards:
                 retry_count += 1
@@ -145,7 +165,7 @@ def amazon():
                         items.append([title, price, link])
                         print(f"\nProduct {idx + 1}:")
                         print(f"Title: {title}")
-                        print(f"Price: ₹{price}" if price != 'Price not available' else "Price: Not available")
+                        print(f"Price: {format_price(price)}" if price != 'Price not available' else "Price: Not available")
                         print(f"Link: {link}")
                 
                 except Exception as e:
@@ -6,22 +6,51 @@ from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 import time
 import random
 import pandas as pd
 import logging
+import os
+import threading
+from driver_pool import get_pool
+from card_parser import select_result_cards
+from flipkart_state import extract_state, state_products
+from prices import Price, format_price, parse_price
+from profile_pool import launch_with_profile
+from selector_stats import first_match
+from driver_resolver import resolve_driver_path
+from waits import wait_for, scroll_until_stable
+from fetch_profiles import DEFAULT_PROFILE, apply_profile_options, apply_profile
+from async_engine import run, search_all
+from amaz import amazon_review_job, amazon_search_job
+from flipAPI import flipkart_review_job, flipkart_search_job
+from tab_runner import DEFAULT_TABS, tab_browser
+from result_cache import cached_async
+from html_archive import REPLAY, ReplayMiss, archive_page, replay_html
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# How long the app reuses search results for the same query and settings
+APP_CACHE_TTL = int(os.environ.get("SCRAPER_APP_CACHE_TTL", "900"))
+# Seconds a comparison may take before the slower site is given up on
+SEARCH_TIMEOUT = float(os.environ.get("SCRAPER_SEARCH_TIMEOUT", "120"))
+
 # Database Functions
-def create_userdb():
-    """Create the SQLite database and users table if not exists."""
-    conn = sqlite3.connect("userdb.db")
+@st.cache_resource
+def get_userdb():
+    """One connection for the whole server, shared by every rerun and session.
+
+    Sessions run on different threads, so callers hold the lock while using it.
+    """
+    conn = sqlite3.connect("userdb.db", check_same_thread=False)
+    create_userdb(conn)
+    return conn, threading.Lock()
+
+def create_userdb(conn):
+    """Create the users table if not exists."""
     cursor = conn.cursor()
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS users (
@@ -30,33 +59,31 @@ def create_userdb():
         )
     """)
     conn.commit()
-    conn.close()
 
 def add_user(username, password):
     """Add a new user to the database."""
-    conn = sqlite3.connect("userdb.db")
-    cursor = conn.cursor()
-    try:
-        hashed_password = sha256(password.encode()).hexdigest()
-        cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", 
-                      (username, hashed_password))
-        conn.commit()
-        conn.close()
-        return True
-    except sqlite3.IntegrityError:
-        conn.close()
-        return False
+    conn, lock = get_userdb()
+    with lock:
+        cursor = conn.cursor()
+        try:
+            hashed_password = sha256(password.encode()).hexdigest()
+            cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", 
+                          (username, hashed_password))
+            conn.commit()
+            return True
+        except sqlite3.IntegrityError:
+            conn.rollback()
+            return False
 
 def authenticate_user(username, password):
     """Authenticate a user against the database."""
-    conn = sqlite3.connect("userdb.db")
-    cursor = conn.cursor()
-    hashed_password = sha256(password.encode()).hexdigest()
-    cursor.execute("SELECT * FROM users WHERE username = ? AND password = ?", 
-                  (username, hashed_password))
-    result = cursor.fetchone()
-    conn.close()
-    return result
+    conn, lock = get_userdb()
+    with lock:
+        cursor = conn.cursor()
+        hashed_password = sha256(password.encode()).hexdigest()
+        cursor.execute("SELECT * FROM users WHERE username = ? AND password = ?", 
+                      (username, hashed_password))
+        return cursor.fetchone()
 
 # Scraping Utility Functions
 def get_random_user_agent():
@@ -71,7 +98,7 @@ def get_random_user_agent():
     ]
     return random.choice(user_agents)
 
-def create_browser(driver_path):
+def create_browser(driver_path, profile=DEFAULT_PROFILE, user_data_dir=None):
     chrome_options = Options()
     chrome_options.add_argument('--no-sandbox')
     chrome_options.add_argument('--disable-dev-shm-usage')
@@ -83,97 +110,322 @@ def create_browser(driver_path):
     chrome_options.add_experimental_option('useAutomationExtension', False)
     chrome_options.add_argument('--disable-notifications')
     chrome_options.add_argument('--lang=en-US,en;q=0.9')
+    apply_profile_options(chrome_options, profile)
+    if user_data_dir:
+        chrome_options.add_argument(f'--user-data-dir={user_data_dir}')
     
-    service = Service(driver_path)
+    service = Service(resolve_driver_path(driver_path))
     browser = webdriver.Chrome(service=service, options=chrome_options)
     
     # Set navigator.webdriver to false using CDP
     browser.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    apply_profile(browser, profile)
     
     return browser
 
+def get_browser_pool(driver_path, profile=DEFAULT_PROFILE):
+    """Shared pool of warm headless browsers built by create_browser"""
+    return get_pool(("app", driver_path, profile),
+                    lambda: launch_with_profile(f"app-{profile}", lambda user_data_dir: create_browser(
+                        driver_path, profile, user_data_dir)))
+
+# Result Page Parsers
+# Candidate selectors per field; selector_stats reorders them by recent success
+AMAZON_PRICE_SELECTORS = [
+    'span.a-price-whole',
+    'span.a-price span[aria-hidden="true"]',
+    'span.a-price',
+    'span.a-offscreen'
+]
+
+FLIPKART_CONTAINER_SELECTORS = [
+    'div._1AtVbE div._13oc-S',
+    'div._1AtVbE',
+    'div[data-id]',
+    'div._4ddWXP',
+    'div._2B099V',
+    'a._1fQZEK',
+    '._3pLy-c',
+    '._4rR01T'
+]
+
+FLIPKART_TITLE_SELECTORS = [
+    'div._4rR01T', 
+    'a.s1Q9rs', 
+    'a.IRpwTa', 
+    'div.CXW8mj',
+    '.s1Q9rs',
+    '.B_NuCI'
+]
+
+FLIPKART_PRICE_SELECTORS = [
+    'div._30jeq3._1_WHN1',
+    'div._30jeq3',
+    'div._25b18c',
+    'div._3tbKJL'
+]
+
+FLIPKART_LINK_SELECTORS = [
+    'a._1fQZEK',
+    'a.s1Q9rs',
+    'a._2rpwqI',
+    'a.IRpwTa',
+    'a[href*="/p/"]'
+]
+
+def parse_amazon_results(html, limit=5):
+    """Extract title, price and link from an Amazon search results page"""
+    amazon_home = 'https://www.amazon.in'
+    
+    # Only the first `limit` result cards are parsed, not the whole page
+    _, cards = select_result_cards(html, ['div[data-component-type="s-search-result"]'], limit)
+
+    amazon_results = []
+    for card in cards:
+        try:
+            title_elem = (card.select_one('h2 a.a-link-normal span') or 
+                        card.select_one('h2 span.a-text-normal') or
+                        card.select_one('h2'))
+
+            if not title_elem:
+                continue
+
+            title = title_elem.text.strip()
+
+            link_elem = card.select_one('h2 a') or card.select_one('a.a-link-normal')
+            if not link_elem:
+                continue
+
+            link = amazon_home + link_elem.get('href', '')
+
+            price = 'Not Available'
+            _, price_elem = first_match("amazon", "price", AMAZON_PRICE_SELECTORS, card.select_one, reorder=False)
+            parsed = parse_price(price_elem.text) if price_elem else None
+            if parsed is not None:
+                price = parsed
+
+            amazon_results.append({
+                'title': title,
+                'price': price,
+                'link': link
+            })
+
+        except Exception as e:
+            logger.error(f"Amazon product processing error: {e}")
+
+    logger.info(f"Amazon found {len(amazon_results)} results")
+    return amazon_results
+
+# Markers for the generic fallback as (tag name or None, class)
+GENERIC_TITLE_MARKERS = [('div', '_4rR01T'), ('a', 's1Q9rs'), ('a', 'IRpwTa'), ('div', 'CXW8mj'),
+                         (None, '_3LWZlK'), (None, '_4ddWXP'), (None, 's1Q9rs')]
+GENERIC_PRICE_MARKERS = [('div', '_30jeq3'), ('div', '_25b18c')]
+
+def _has_marker(tag, markers):
+    classes = tag.get('class') or ()
+    return any((name is None or tag.name == name) and cls in classes for name, cls in markers)
+
+def find_generic_containers(soup, max_depth=5):
+    """Nearest ancestor (up to max_depth levels) of each title-like node that also holds a price.
+
+    One pass over the tree marks every ancestor of a price-like node, so the
+    containment check is a set lookup instead of a subtree search per level.
+    """
+    priced = set()
+    titles = []
+    for tag in soup.find_all(True):
+        if _has_marker(tag, GENERIC_PRICE_MARKERS):
+            parent = tag.parent
+            # Stop at the first marked ancestor - everything above it is marked already
+            while parent is not None and id(parent) not in priced:
+                priced.add(id(parent))
+                parent = parent.parent
+        if _has_marker(tag, GENERIC_TITLE_MARKERS):
+            titles.append(tag)
+
+    containers = []
+    seen = set()
+    for title in titles:
+        container = title.parent
+        for _ in range(max_depth):
+            if container is None:
+                break
+            if id(container) in priced:
+                if id(container) not in seen:
+                    seen.add(id(container))
+                    containers.append(container)
+                break
+            container = container.parent
+    return containers
+
+def parse_flipkart_results(html, limit=5):
+    """Extract title, price and link from a Flipkart search results page"""
+    # The embedded page state holds clean product data; class-name selectors are the fallback
+    state_results = state_products(extract_state(html), limit)
+    if state_results:
+        logger.info(f"Flipkart found {len(state_results)} results in the page state")
+        return [{'title': p['title'], 'price': p['price'], 'link': p['link']} for p in state_results]
+
+    soup = BeautifulSoup(html, 'lxml')
+
+    flipkart_results = []
+
+    # Try the selector patterns Flipkart might be using, most specific first
+    pattern, product_containers = first_match("flipkart", "results", FLIPKART_CONTAINER_SELECTORS, soup.select,
+                                              reorder=False)
+    if pattern:
+        logger.info(f"Selector '{pattern}' found {len(product_containers)} elements")
+    else:
+        product_containers = []
+
+    # If we still have no containers, try a more general approach
+    if not product_containers:
+        logger.info("Trying generic product container identification")
+        # Look for the nearest container holding both a title-like and a price-like element
+        product_containers = find_generic_containers(soup)
+
+    logger.info(f"Found {len(product_containers)} product containers")
+
+    # Process up to 5 product containers
+    for container in product_containers[:limit]:
+        try:
+            # Title extraction - using multiple possible selectors
+            title = "Title Not Available"
+            _, title_elem = first_match("flipkart", "title", FLIPKART_TITLE_SELECTORS, container.select_one)
+            if title_elem:
+                title = title_elem.text.strip()
+
+            # Fallback title extraction - look for any text that might be a title
+            if title == "Title Not Available":
+                for link in container.select('a'):
+                    if link.text and len(link.text.strip()) > 10:
+                        title = link.text.strip()
+                        break
+
+            # Price extraction - using multiple possible selectors
+            price = "Price Not Available"
+            _, price_elem = first_match("flipkart", "price", FLIPKART_PRICE_SELECTORS, container.select_one, reorder=False)
+            parsed = parse_price(price_elem.text) if price_elem else None
+            if parsed is not None:
+                price = parsed
+
+            # Link extraction - using multiple possible selectors
+            link = "Link Not Available"
+            _, link_elem = first_match("flipkart", "link", FLIPKART_LINK_SELECTORS, container.select_one, reorder=False)
+            if link_elem:
+                link = link_elem.get('href')
+
+            # If no link found, try any link in the container
+            if link == "Link Not Available":
+                any_link = container.select_one('a')
+                if any_link:
+                    link = any_link.get('href')
+
+            # Format the link correctly
+            if link != "Link Not Available" and not link.startswith('http'):
+                link = f"https://www.flipkart.com{link}"
+
+            # Only add if we have at least a title or price
+            if title != "Title Not Available" or price != "Price Not Available":
+                flipkart_results.append({
+                    'title': title,
+                    'price': price,
+                    'link': link
+                })
+                logger.info(f"Added Flipkart product: {title[:30]}...")
+
+        except Exception as e:
+            logger.error(f"Flipkart product processing error: {e}")
+
+    # If we still have no results, try an alternative approach
+    if not flipkart_results:
+        logger.info("Trying alternative Flipkart extraction approach")
+
+        # Look specifically for product grid items
+        grid_items = soup.select('div._1xHGtK._373qXS, div._4ddWXP, div._1xHGtK')
+        logger.info(f"Found {len(grid_items)} grid items")
+
+        for item in grid_items[:limit]:
+            try:
+                title = item.select_one('a.IRpwTa, a.s1Q9rs, div._2WkVRV').text.strip() if item.select_one('a.IRpwTa, a.s1Q9rs, div._2WkVRV') else "Title Not Available"
+                price_elem = item.select_one('div._30jeq3, div._30jeq3._1_WHN1')
+                price = parse_price(price_elem.text) if price_elem else None
+                if price is None:
+                    price = "Price Not Available"
+                link = item.select_one('a').get('href') if item.select_one('a') else "Link Not Available"
+
+                if link != "Link Not Available" and not link.startswith('http'):
+                    link = f"https://www.flipkart.com{link}"
+
+                flipkart_results.append({
+                    'title': title,
+                    'price': price,
+                    'link': link
+                })
+
+            except Exception as e:
+                logger.error(f"Flipkart alternative extraction error: {e}")
+
+    logger.info(f"Flipkart found {len(flipkart_results)} results")
+    return flipkart_results
+
+def show_price(price):
+    return format_price(price) if isinstance(price, Price) else price
+
 # Amazon Scraping Function
-def scrape_amazon(name, driver_path):
+def _scrape_amazon(name, driver_path, profile=DEFAULT_PROFILE):
     name = name.replace(' ', '+')
     URL = f"https://www.amazon.in/s?k={name}"
-    amazon_home = 'https://www.amazon.in'
     
-    browser = create_browser(driver_path)
+    if REPLAY:
+        try:
+            return parse_amazon_results(replay_html(URL))
+        except ReplayMiss as e:
+            logger.error(str(e))
+            return []
+    
+    pool = get_browser_pool(driver_path, profile)
+    pooled = pool.checkout()
+    browser = pooled.driver
     
     try:
         browser.get(URL)
-        time.sleep(random.uniform(3, 7))
         
-        WebDriverWait(browser, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'div[data-component-type="s-search-result"]'))
-        )
+        # Continue as soon as the result cards are rendered
+        if not wait_for(browser, "amazon", "results"):
+            logger.warning("Timeout waiting for Amazon results")
         
         for _ in range(3):
             browser.execute_script("window.scrollBy(0, 500);")
-            time.sleep(random.uniform(0.5, 1.5))
         
         html = browser.page_source
         logger.info(f"Amazon HTML length: {len(html)}")
+        archive_page(URL, html)
         
-        soup = BeautifulSoup(html, 'lxml')
-        
-        amazon_results = []
-        for card in soup.select('div[data-component-type="s-search-result"]')[:5]:
-            try:
-                title_elem = (card.select_one('h2 a.a-link-normal span') or 
-                            card.select_one('h2 span.a-text-normal') or
-                            card.select_one('h2'))
-                
-                if not title_elem:
-                    continue
-                    
-                title = title_elem.text.strip()
-                
-                link_elem = card.select_one('h2 a') or card.select_one('a.a-link-normal')
-                if not link_elem:
-                    continue
-                    
-                link = amazon_home + link_elem.get('href', '')
-                
-                price_selectors = [
-                    'span.a-price-whole',
-                    'span.a-price span[aria-hidden="true"]',
-                    'span.a-price',
-                    'span.a-offscreen'
-                ]
-                
-                price = 'Not Available'
-                for selector in price_selectors:
-                    price_elem = card.select_one(selector)
-                    if price_elem:
-                        price = price_elem.text.strip().replace('₹', '').replace(',', '').strip('.')
-                        break
-                
-                amazon_results.append({
-                    'title': title,
-                    'price': price,
-                    'link': link
-                })
-                
-            except Exception as e:
-                logger.error(f"Amazon product processing error: {e}")
-        
-        logger.info(f"Amazon found {len(amazon_results)} results")
-        return amazon_results
+        return parse_amazon_results(html)
     
     except Exception as e:
         logger.error(f"Amazon scraping failed: {e}")
         return []
     
     finally:
-        browser.quit()
+        pool.checkin(pooled)
 
 # Flipkart Scraping Function - Updated
-def scrape_flipkart(name, driver_path):
+def _scrape_flipkart(name, driver_path, profile=DEFAULT_PROFILE):
     name = name.replace(' ', '+')
     URL = f"https://www.flipkart.com/search?q={name}"
     
-    browser = create_browser(driver_path)
+    if REPLAY:
+        try:
+            return parse_flipkart_results(replay_html(URL))
+        except ReplayMiss as e:
+            logger.error(str(e))
+            return []
+    
+    pool = get_browser_pool(driver_path, profile)
+    pooled = pool.checkout()
+    browser = pooled.driver
     
     try:
         # Add a debug message about starting the scrape
@@ -182,216 +434,133 @@ def scrape_flipkart(name, driver_path):
         # Go to Flipkart and handle any login popup that might appear
         browser.get(URL)
         
-        # Wait for page to load and handle popup if it appears
+        # Wait until either the results or the login popup shows up
+        wait_for(browser, "flipkart", ("results", "popup"))
+        
+        # Close the login popup if it appeared
         try:
-            # Try to close login popup if it appears
-            WebDriverWait(browser, 3).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, 'button._2KpZ6l._2doB4z'))
-            ).click()
-            logger.info("Closed Flipkart login popup")
+            popups = browser.find_elements(By.CSS_SELECTOR, 'button._2KpZ6l._2doB4z')
+            if popups:
+                popups[0].click()
+                logger.info("Closed Flipkart login popup")
         except Exception as popup_err:
             logger.info(f"No popup found or couldn't close: {popup_err}")
-            
-        # Wait longer for the page to fully load
-        time.sleep(8)
         
-        # Scroll multiple times with pauses to ensure dynamic content loads
-        for i in range(5):
-            browser.execute_script(f"window.scrollBy(0, {300 + i*200});")
-            time.sleep(1.5)
+        # Scroll to trigger lazy-loaded content, waiting only while the page keeps growing
+        scroll_until_stable(browser, steps=5)
         
         # Scroll back to top
         browser.execute_script("window.scrollTo(0, 0);")
-        time.sleep(1)
         
         # Wait for product elements to be present
-        try:
-            WebDriverWait(browser, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, 'div._1YokD2._3Mn1Gg, div._1AtVbE, div._4ddWXP'))
-            )
+        if wait_for(browser, "flipkart", "results"):
             logger.info("Flipkart product elements found")
-        except Exception as wait_err:
-            logger.warning(f"Timeout waiting for Flipkart elements: {wait_err}")
+        else:
+            logger.warning("Timeout waiting for Flipkart elements")
         
         # Get page source and create soup
         html = browser.page_source
         logger.info(f"Flipkart HTML length: {len(html)}")
         
-        # Add HTML debugging info to a file for inspection
-        with open("flipkart_debug.html", "w", encoding="utf-8") as f:
-            f.write(html[:10000])  # Write the first 10000 chars for debugging
-        
-        soup = BeautifulSoup(html, 'lxml')
-        
-        flipkart_results = []
-        
-        # Try multiple different selector patterns that Flipkart might be using
-        selector_patterns = [
-            'div._1AtVbE div._13oc-S',
-            'div._1AtVbE',
-            'div[data-id]',
-            'div._4ddWXP',
-            'div._2B099V',
-            'a._1fQZEK',
-            '._3pLy-c',
-            '._4rR01T'
-        ]
-        
-        # Try each selector pattern until we find products
-        for pattern in selector_patterns:
-            product_containers = soup.select(pattern)
-            logger.info(f"Selector '{pattern}' found {len(product_containers)} elements")
-            
-            if product_containers:
-                break
-        
-        # If we still have no containers, try a more general approach
-        if not product_containers:
-            logger.info("Trying generic product container identification")
-            # Look for any div containing both a title-like element and a price-like element
-            product_containers = []
-            
-            # All possible title selectors
-            title_selectors = ['div._4rR01T', 'a.s1Q9rs', 'a.IRpwTa', 'div.CXW8mj', '._3LWZlK', '._4ddWXP', '.s1Q9rs']
-            
-            # All possible price selectors
-            price_selectors = ['div._30jeq3', 'div._30jeq3._1_WHN1', 'div._25b18c']
-            
-            for title_sel in title_selectors:
-                title_elements = soup.select(title_sel)
-                for title_elem in title_elements:
-                    # Find nearest container
-                    container = title_elem.parent
-                    for _ in range(5):  # Look up to 5 levels up
-                        if container is None:
-                            break
-                        # Check if this container has a price element
-                        for price_sel in price_selectors:
-                            if container.select_one(price_sel):
-                                product_containers.append(container)
-                                break
-                        container = container.parent
+        # Keep the whole page for inspection and replay
+        archive_page(URL, html)
         
-        logger.info(f"Found {len(product_containers)} product containers")
-        
-        # Process up to 5 product containers
-        for container in product_containers[:5]:
-            try:
-                # Title extraction - using multiple possible selectors
-                title_selectors = [
-                    'div._4rR01T', 
-                    'a.s1Q9rs', 
-                    'a.IRpwTa', 
-                    'div.CXW8mj',
-                    '.s1Q9rs',
-                    '.B_NuCI'
-                ]
-                
-                title = "Title Not Available"
-                for selector in title_selectors:
-                    title_elem = container.select_one(selector)
-                    if title_elem:
-                        title = title_elem.text.strip()
-                        break
-                
-                # Fallback title extraction - look for any text that might be a title
-                if title == "Title Not Available":
-                    for link in container.select('a'):
-                        if link.text and len(link.text.strip()) > 10:
-                            title = link.text.strip()
-                            break
-                
-                # Price extraction - using multiple possible selectors
-                price_selectors = [
-                    'div._30jeq3._1_WHN1',
-                    'div._30jeq3',
-                    'div._25b18c',
-                    'div._3tbKJL'
-                ]
-                
-                price = "Price Not Available"
-                for selector in price_selectors:
-                    price_elem = container.select_one(selector)
-                    if price_elem:
-                        price = price_elem.text.replace('₹','').replace(',','')
-                        break
-                
-                # Link extraction - using multiple possible selectors
-                link_selectors = [
-                    'a._1fQZEK',
-                    'a.s1Q9rs',
-                    'a._2rpwqI',
-                    'a.IRpwTa',
-                    'a[href*="/p/"]'
-                ]
-                
-                link = "Link Not Available"
-                for selector in link_selectors:
-                    link_elem = container.select_one(selector)
-                    if link_elem:
-                        link = link_elem.get('href')
-                        break
-                
-                # If no link found, try any link in the container
-                if link == "Link Not Available":
-                    any_link = container.select_one('a')
-                    if any_link:
-                        link = any_link.get('href')
-                
-                # Format the link correctly
-                if link != "Link Not Available" and not link.startswith('http'):
-                    link = f"https://www.flipkart.com{link}"
-                
-                # Only add if we have at least a title or price
-                if title != "Title Not Available" or price != "Price Not Available":
-                    flipkart_results.append({
-                        'title': title,
-                        'price': price,
-                        'link': link
-                    })
-                    logger.info(f"Added Flipkart product: {title[:30]}...")
-            
-            except Exception as e:
-                logger.error(f"Flipkart product processing error: {e}")
-        
-        # If we still have no results, try an alternative approach
-        if not flipkart_results:
-            logger.info("Trying alternative Flipkart extraction approach")
-            
-            # Look specifically for product grid items
-            grid_items = soup.select('div._1xHGtK._373qXS, div._4ddWXP, div._1xHGtK')
-            logger.info(f"Found {len(grid_items)} grid items")
-            
-            for item in grid_items[:5]:
-                try:
-                    title = item.select_one('a.IRpwTa, a.s1Q9rs, div._2WkVRV').text.strip() if item.select_one('a.IRpwTa, a.s1Q9rs, div._2WkVRV') else "Title Not Available"
-                    price = item.select_one('div._30jeq3, div._30jeq3._1_WHN1').text.replace('₹','').replace(',','') if item.select_one('div._30jeq3, div._30jeq3._1_WHN1') else "Price Not Available"
-                    link = item.select_one('a').get('href') if item.select_one('a') else "Link Not Available"
-                    
-                    if link != "Link Not Available" and not link.startswith('http'):
-                        link = f"https://www.flipkart.com{link}"
-                    
-                    flipkart_results.append({
-                        'title': title,
-                        'price': price,
-                        'link': link
-                    })
-                    
-                except Exception as e:
-                    logger.error(f"Flipkart alternative extraction error: {e}")
-        
-        logger.info(f"Flipkart found {len(flipkart_results)} results")
-        return flipkart_results
+        return parse_flipkart_results(html)
     
     except Exception as e:
+        # Runs on a worker thread, so report through the log rather than the page
         logger.error(f"Flipkart scraping failed: {e}")
-        st.error(f"Flipkart scraping encountered an error: {e}")
         return []
     
     finally:
-        browser.quit()
+        pool.checkin(pooled)
+
+async def scrape_amazon_async(name, driver_path, profile=DEFAULT_PROFILE):
+    return await cached_async("app-amazon", name, "amazon.in",
+                              lambda: _scrape_amazon(name, driver_path, profile))
+
+async def scrape_flipkart_async(name, driver_path, profile=DEFAULT_PROFILE):
+    return await cached_async("app-flipkart", name, "flipkart.com",
+                              lambda: _scrape_flipkart(name, driver_path, profile))
+
+def scrape_amazon(name, driver_path, profile=DEFAULT_PROFILE):
+    return run(scrape_amazon_async(name, driver_path, profile))
+
+def scrape_flipkart(name, driver_path, profile=DEFAULT_PROFILE):
+    return run(scrape_flipkart_async(name, driver_path, profile))
+
+async def scrape_both(name, driver_path, profile=DEFAULT_PROFILE, timeout=SEARCH_TIMEOUT):
+    """Search Amazon and Flipkart at the same time; a site that fails or times out gives []"""
+    results = await search_all([name], {
+        "amazon": lambda query: scrape_amazon_async(query, driver_path, profile),
+        "flipkart": lambda query: scrape_flipkart_async(query, driver_path, profile),
+    }, timeout=timeout)
+    return results[name]["amazon"] or [], results[name]["flipkart"] or []
+
+# Multi-tab mode: one browser, one tab per page load
+def compare_in_tabs(name, driver_path, profile=DEFAULT_PROFILE, tabs=DEFAULT_TABS):
+    """Search both sites, then read the newest reviews of each site's cheapest product, all in tabs of one browser.
+
+    Returns (amazon_results, flipkart_results, reviews) where reviews maps
+    the site to the review titles or texts found; a page that failed or
+    timed out gives an empty list.
+    """
+    with tab_browser(get_browser_pool(driver_path, profile), tabs) as browser:
+        amazon_found, flipkart_found = browser.run([amazon_search_job(name), flipkart_search_job(name)])
+        amazon_results = [{'title': title, 'price': price, 'link': link} for title, price, link in amazon_found or []]
+        flipkart_results = flipkart_found or []
+
+        sites, review_jobs = [], []
+        for site, results, review_job in (("amazon", amazon_results, amazon_review_job),
+                                          ("flipkart", flipkart_results, flipkart_review_job)):
+            if not results:
+                continue
+            cheapest = min(results, key=lambda product: product['price'])
+            try:
+                review_jobs.append(review_job(cheapest['link']))
+            except ValueError as e:
+                logger.info(f"Skipping {site} reviews: {e}")
+                continue
+            sites.append(site)
+        found = browser.run(review_jobs)
+
+    reviews = {site: found_reviews or [] for site, found_reviews in zip(sites, found)}
+    return amazon_results, flipkart_results, reviews
 
 # Price Comparison UI
+class NoResults(Exception):
+    """Raised inside cached searches so an empty result is never cached"""
+
+@st.cache_resource
+def warm_browsers(driver_path):
+    """Start the pooled browsers once per server instead of on every rerun"""
+    pool = get_browser_pool(driver_path)
+    pool.warm()
+    return pool
+
+@st.cache_data(ttl=APP_CACHE_TTL, show_spinner=False)
+def compare_prices(query, driver_path):
+    """Amazon and Flipkart results for a query; reruns with the same query reuse them"""
+    amazon_results, flipkart_results = run(scrape_both(query, driver_path))
+    if not amazon_results and not flipkart_results:
+        raise NoResults(query)
+    return amazon_results, flipkart_results
+
+@st.cache_data(ttl=APP_CACHE_TTL, show_spinner=False)
+def compare_prices_in_tabs(query, driver_path):
+    """compare_prices in one browser's tabs, plus the cheapest products' newest reviews"""
+    amazon_results, flipkart_results, reviews = compare_in_tabs(query, driver_path)
+    if not amazon_results and not flipkart_results:
+        raise NoResults(query)
+    return amazon_results, flipkart_results, reviews
+
+def show_reviews(reviews, count=5):
+    """Newest reviews of a site's cheapest product, when multi-tab mode read them"""
+    if reviews:
+        st.markdown("**Latest reviews of the cheapest product**")
+        for review in reviews[:count]:
+            st.markdown(f"- {review[:200]}")
+
 def show_price_comparison():
     col1, col2, col3 = st.columns([1,2,1])
     with col2:
@@ -410,22 +579,34 @@ def show_price_comparison():
     
     # Add debug info about the driver path
     st.sidebar.info(f"Using Chrome driver at: {DRIVER_PATH}")
+    # Start browsers in the background so the first comparison skips the cold launch
+    warm_browsers(DRIVER_PATH)
     # Add a checkbox to enable debug mode
     debug_mode = st.sidebar.checkbox("Enable Debug Mode")
+    # Replay has no live pages to load in tabs
+    tab_mode = not REPLAY and st.sidebar.checkbox(
+        "Multi-tab mode", help="Search both sites and read the cheapest products' reviews in tabs of one browser")
 
+    # Keep showing the last search when another widget triggers a rerun
     if search_button and search_query:
+        st.session_state.search_query = search_query
+    search_query = st.session_state.get("search_query")
+
+    if search_query:
         progress_text = "Searching across platforms..."
         progress_bar = st.progress(0)
-        
-        for i in range(100):
-            time.sleep(0.01)
-            progress_bar.progress(i + 1)
 
-        with st.spinner('Fetching results from Amazon...'):
-            amazon_results = scrape_amazon(search_query, DRIVER_PATH)
-        
-        with st.spinner('Fetching results from Flipkart...'):
-            flipkart_results = scrape_flipkart(search_query, DRIVER_PATH)
+        # Both sites are searched concurrently; a repeated query comes from the cache
+        with st.spinner('Fetching results from Amazon and Flipkart...'):
+            reviews = {}
+            try:
+                if tab_mode:
+                    amazon_results, flipkart_results, reviews = compare_prices_in_tabs(search_query, DRIVER_PATH)
+                else:
+                    amazon_results, flipkart_results = compare_prices(search_query, DRIVER_PATH)
+            except NoResults:
+                amazon_results, flipkart_results = [], []
+        progress_bar.progress(100)
 
         progress_bar.empty()
         
@@ -458,12 +639,13 @@ def show_price_comparison():
                         st.markdown(f"""
                             <div class="product-card">
                                 <h4>{product['title']}</h4>
-                                <p class="price-tag">₹{product['price']}</p>
+                                <p class="price-tag">{show_price(product['price'])}</p>
                                 <a href="{product['link']}" target="_blank">View on Amazon →</a>
                             </div>
                         """, unsafe_allow_html=True)
                 else:
                     st.info("No Amazon results found")
+                show_reviews(reviews.get("amazon"))
 
             with flipkart_col:
                 st.markdown("""
@@ -477,36 +659,20 @@ def show_price_comparison():
                         st.markdown(f"""
                             <div class="product-card">
                                 <h4>{product['title']}</h4>
-                                <p class="price-tag">₹{product['price']}</p>
+                                <p class="price-tag">{show_price(product['price'])}</p>
                                 <a href="{product['link']}" target="_blank">View on Flipkart →</a>
                             </div>
                         """, unsafe_allow_html=True)
                 else:
                     st.info("No Flipkart results found")
+                show_reviews(reviews.get("flipkart"))
 
             if amazon_results and flipkart_results:
                 st.markdown("### 💡 Price Analysis")
                 
-                # Convert prices to float, excluding non-numeric values
-                amazon_prices = []
-                for p in amazon_results:
-                    try:
-                        if p['price'] != 'Not Available':
-                            price_str = p['price'].replace('.','').replace(',','').strip()
-                            if price_str.isdigit():
-                                amazon_prices.append(float(price_str))
-                    except (ValueError, TypeError):
-                        pass
-                
-                flipkart_prices = []
-                for p in flipkart_results:
-                    try:
-                        if p['price'] != 'Price Not Available':
-                            price_str = p['price'].replace('.','').replace(',','').strip()
-                            if price_str.isdigit():
-                                flipkart_prices.append(float(price_str))
-                    except (ValueError, TypeError):
-                        pass
+                # Prices are already parsed; skip the "Not Available" placeholders
+                amazon_prices = [p['price'] for p in amazon_results if isinstance(p['price'], Price)]
+                flipkart_prices = [p['price'] for p in flipkart_results if isinstance(p['price'], Price)]
 
                 if amazon_prices and flipkart_prices:
                     analysis_cols = st.columns(3)
@@ -587,7 +753,7 @@ def main():
     """, unsafe_allow_html=True)
 
     # Initialize session state and database
-    create_userdb()
+    get_userdb()
     if "logged_in" not in st.session_state:
         st.session_state.logged_in = False
     if "username" not in st.session_state:
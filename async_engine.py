@@ -0,0 +1,113 @@
+import asyncio
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# How many jobs may hit one site at the same time
+DOMAIN_LIMITS = {
+    "amazon.in": int(os.environ.get("SCRAPER_AMAZON_CONCURRENCY", "4")),
+    "flipkart.com": int(os.environ.get("SCRAPER_FLIPKART_CONCURRENCY", "4")),
+}
+DEFAULT_DOMAIN_LIMIT = 4
+
+# Selenium and requests are blocking, so each job runs on a worker thread.
+# Every domain has its own pool sized to its limit: a queue of jobs for one
+# busy site waits in that pool's queue without holding threads the other
+# site needs, and the limit holds process-wide, whichever loop or thread
+# submits the job.
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def domain_executor(domain):
+    """Process-wide worker pool for a domain, as many threads as its concurrency limit"""
+    with _executors_lock:
+        executor = _executors.get(domain)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=DOMAIN_LIMITS.get(domain, DEFAULT_DOMAIN_LIMIT),
+                                          thread_name_prefix=f"scraper-{domain}")
+            _executors[domain] = executor
+        return executor
+
+
+def submit_blocking(domain, fn, *args, **kwargs):
+    """Queue a blocking call on the domain's workers from synchronous code; returns a Future"""
+    return domain_executor(domain).submit(fn, *args, **kwargs)
+
+
+async def run_blocking(domain, fn, *args, **kwargs):
+    """Run a blocking scraper call on a worker thread, bounded per domain.
+
+    Cancelling the awaiting task returns straight away. A job that is still
+    queued never starts; one already running finishes its current page and
+    its result is discarded.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(domain_executor(domain), functools.partial(fn, *args, **kwargs))
+
+
+async def gather_bounded(coros, timeout=None):
+    """Run coroutines concurrently and return their results in order.
+
+    Anything still running when timeout expires is cancelled. Failed or
+    cancelled jobs come back as exception objects instead of raising.
+    """
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    if not tasks:
+        return []
+    try:
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+    except asyncio.CancelledError:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    for task in pending:
+        task.cancel()
+    if pending:
+        logger.warning(f"Cancelled {len(pending)} scraping jobs after {timeout}s")
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    results = []
+    for task in tasks:
+        if task.cancelled():
+            results.append(asyncio.CancelledError())
+        elif task.exception() is not None:
+            results.append(task.exception())
+        else:
+            results.append(task.result())
+    return results
+
+
+def run(coro):
+    """Run a coroutine to completion from synchronous code"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # Already inside an event loop (e.g. a notebook): use a helper thread
+    with ThreadPoolExecutor(max_workers=1) as helper:
+        return helper.submit(asyncio.run, coro).result()
+
+
+async def search_all(queries, searches, timeout=None):
+    """Run every site's search for every query at once.
+
+    searches maps a site name to a coroutine function that takes the query.
+    Returns {query: {site: result}}; a site whose job failed or was
+    cancelled maps to None.
+    """
+    sites = list(searches)
+    jobs = [searches[site](query) for query in queries for site in sites]
+    results = await gather_bounded(jobs, timeout=timeout)
+
+    combined = {}
+    for index, query in enumerate(queries):
+        row = results[index * len(sites):(index + 1) * len(sites)]
+        combined[query] = {site: None if isinstance(result, BaseException) else result
+                           for site, result in zip(sites, row)}
+    return combined
@@ -0,0 +1,146 @@
+"""Offline parser benchmark: pages/sec and peak memory for every HTML parser.
+
+    python html_archive.py export saved/ --latest          # real pages from the archive
+    python benchmarks/bench_parsers.py --fixtures saved/
+    python benchmarks/bench_parsers.py                      # synthetic pages when there is no archive
+    python benchmarks/bench_parsers.py --json out.json --baseline base.json
+
+With --baseline the run fails (exit code 1) when any parser is slower than the
+baseline by more than --tolerance, so it can gate CI without network access.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The parsers record selector hits; keep a benchmark's thousands of runs out of the
+# user's real stats file, and start every run from the same empty stats
+_stats_dir = tempfile.TemporaryDirectory(prefix="bench-selector-stats-")
+os.environ["SCRAPER_SELECTOR_STATS"] = os.path.join(_stats_dir.name, "selector_stats.json")
+
+from fixtures import build_corpus, load_corpus  # noqa: E402
+
+
+def _parsers():
+    # Imported lazily so `--help` works without the scraper dependencies
+    import amaz
+    import app
+    import flipAPI
+    from card_parser import select_result_cards
+    from flipkart_state import extract_state, iter_state_reviews, state_product_info
+    from structured_data import extract_product
+
+    def amazon_prices(html):
+        _, cards = select_result_cards(html, amaz.PRODUCT_CARD_SELECTORS, 10)
+        return [amaz.extract_price(card) for card in cards]
+
+    def product_record(html):
+        record = extract_product(html)
+        return [record] if record else []
+
+    def state_product(html):
+        info = state_product_info(extract_state(html))
+        return [info] if info else []
+
+    def state_reviews(html):
+        return list(iter_state_reviews(extract_state(html)))
+
+    # name: (page kind, parse function)
+    return {
+        "amaz.parse_search_results": ("amazon_search", amaz.parse_search_results),
+        "amaz.extract_price": ("amazon_search", amazon_prices),
+        "app.parse_amazon_results": ("amazon_search", app.parse_amazon_results),
+        "app.parse_flipkart_results": ("flipkart_search", app.parse_flipkart_results),
+        "app.parse_flipkart_results[generic]": ("flipkart_search_generic", app.parse_flipkart_results),
+        "amaz.parse_review_titles_html": ("amazon_reviews", amaz.parse_review_titles_html),
+        "flipAPI.parse_reviews_html": ("flipkart_reviews", flipAPI.parse_reviews_html),
+        "flipkart_state.iter_state_reviews": ("flipkart_reviews", state_reviews),
+        "structured_data.extract_product": ("amazon_page", product_record),
+        "flipkart_state.state_product_info": ("flipkart_page", state_product),
+        "flipkart_state.iter_state_reviews[page]": ("flipkart_page", state_reviews),
+    }
+
+
+def measure(parse, pages, min_time):
+    """Return (pages_per_sec, peak_bytes, items_found) for one parser"""
+    # Peak memory from a single traced pass; timing runs untraced
+    tracemalloc.start()
+    found = sum(len(parse(html) or []) for html in pages)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    parsed = 0
+    start = time.perf_counter()
+    while True:
+        for html in pages:
+            parse(html)
+        parsed += len(pages)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return parsed / elapsed, peak, found
+
+
+def run(corpus, only=None, min_time=1.0):
+    results = {}
+    for name, (kind, parse) in _parsers().items():
+        if only and only not in name:
+            continue
+        pages = corpus.get(kind)
+        if not pages:
+            print(f"{name:40} skipped - no '{kind}' pages")
+            continue
+        pages_per_sec, peak, found = measure(parse, pages, min_time)
+        results[name] = {"pages_per_sec": pages_per_sec, "peak_kb": peak / 1024, "items": found}
+        print(f"{name:40} {pages_per_sec:9.1f} pages/s  {peak / 1024:9.0f} KB peak  {found:5} items")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Names of parsers that are slower than the baseline beyond tolerance"""
+    slower = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        floor = reference["pages_per_sec"] * (1 - tolerance)
+        if result["pages_per_sec"] < floor:
+            slower.append(name)
+            print(f"REGRESSION {name}: {result['pages_per_sec']:.1f} pages/s "
+                  f"vs baseline {reference['pages_per_sec']:.1f}")
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="directory of saved pages laid out as <kind>/*.html")
+    parser.add_argument("--only", help="run only parsers whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds to time each parser for")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs the baseline")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.fixtures) if args.fixtures else build_corpus()
+    sizes = {kind: sum(len(html) for html in pages) // max(len(pages), 1) // 1024 for kind, pages in corpus.items()}
+    print("Corpus: " + ", ".join(f"{kind} {len(corpus[kind])}x~{sizes[kind]}KB" for kind in corpus))
+
+    results = run(corpus, args.only, args.min_time)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""Synthetic Amazon/Flipkart pages shaped like the live markup the parsers expect.
+
+The primary corpus is real pages exported from the HTML archive
+(`python html_archive.py export <dir> --latest`), which uses the same
+<kind>/*.html layout. These synthetic pages only stand in when no archive is
+available, e.g. on a fresh CI runner. Run `python benchmarks/fixtures.py <dir>`
+to write them to disk.
+"""
+import json
+import os
+import random
+import sys
+
+SEED = 2024
+
+# Page kinds and how many variants of each are generated
+KINDS = {
+    "amazon_search": 4,
+    "flipkart_search": 4,
+    "flipkart_search_generic": 2,
+    "amazon_reviews": 3,
+    "flipkart_reviews": 3,
+    "amazon_page": 4,
+    "flipkart_page": 3,
+}
+
+WORDS = ("Wireless Bluetooth Earbuds Noise Cancelling Smart Watch Phone 5G 128GB Black Blue "
+         "Laptop Backpack Charger Fast USB Type-C Cable Speaker Portable Camera Tripod Stand").split()
+REVIEW_WORDS = ("great product battery life is good sound quality excellent value for money "
+                "not worth it stopped working after a week delivery was quick fits well").split()
+
+
+def _phrase(rng, words, low, high):
+    return " ".join(rng.choice(words) for _ in range(rng.randint(low, high)))
+
+
+def _inr(amount):
+    # Lakh-style grouping as shown on the sites: 1,23,456
+    text = str(amount)
+    if len(text) <= 3:
+        return text
+    head, tail = text[:-3], text[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    if head:
+        groups.insert(0, head)
+    return ",".join(groups + [tail])
+
+
+def _filler(rng, size):
+    """Navigation, scripts and inline state that pad real pages to hundreds of KB"""
+    parts = ['<header id="nav"><div class="nav-links">']
+    parts += [f'<a href="/nav/{i}">{_phrase(rng, WORDS, 1, 3)}</a>' for i in range(60)]
+    parts.append('</div></header>')
+    blob = "x" * 1024
+    while sum(len(part) for part in parts) < size:
+        parts.append(f'<script type="text/javascript">var state{len(parts)} = "{blob}";</script>')
+    return "".join(parts)
+
+
+def _page(rng, body, filler_kb):
+    head = _filler(rng, filler_kb * 1024 // 2)
+    tail = _filler(rng, filler_kb * 1024 // 2)
+    return f"<!DOCTYPE html><html><head><title>Results</title></head><body>{head}{body}{tail}</body></html>"
+
+
+def amazon_search(rng, cards=48):
+    items = []
+    for i in range(cards):
+        title = _phrase(rng, WORDS, 4, 12)
+        price = _inr(rng.randint(199, 250000))
+        items.append(
+            f'<div data-component-type="s-search-result" data-asin="B0{i:08d}" class="s-result-item">'
+            f'<div class="sg-col-inner"><h2><a class="a-link-normal" href="/dp/B0{i:08d}/ref=sr_1_{i}">'
+            f'<span class="a-text-normal">{title}</span></a></h2>'
+            f'<span class="a-price"><span class="a-offscreen">₹{price}</span>'
+            f'<span aria-hidden="true"><span class="a-price-whole">{price}.</span></span></span>'
+            f'<div class="a-row"><span class="a-icon-alt">4.{i % 10} out of 5 stars</span></div></div></div>'
+        )
+    return _page(rng, f'<div class="s-main-slot">{"".join(items)}</div>', 400)
+
+
+def flipkart_search(rng, cards=40, generic=False):
+    items = []
+    for i in range(cards):
+        title = _phrase(rng, WORDS, 4, 10)
+        price = _inr(rng.randint(199, 250000))
+        mrp = _inr(rng.randint(250001, 300000))
+        if generic:
+            # Unknown container classes force the generic container discovery
+            items.append(
+                f'<div class="zz{i % 7}"><div class="yy"><a class="s1Q9rs" href="/item-{i}/p/itm{i:06d}">{title}</a>'
+                f'<div class="xx"><div class="_30jeq3">₹{price}</div><div class="_3I9_wc">₹{mrp}</div></div></div></div>'
+            )
+        else:
+            items.append(
+                f'<div class="_1AtVbE"><div class="_13oc-S"><div data-id="ITM{i:06d}">'
+                f'<a class="_1fQZEK" href="/item-{i}/p/itm{i:06d}"><div class="_4rR01T">{title}</div>'
+                f'<div class="_30jeq3 _1_WHN1">₹{price}</div><div class="_3I9_wc _27UcVY">₹{mrp}</div></a>'
+                f'</div></div></div>'
+            )
+    return _page(rng, f'<div class="_1YokD2 _3Mn1Gg">{"".join(items)}</div>', 300)
+
+
+def amazon_reviews(rng, reviews=10):
+    items = []
+    for i in range(reviews):
+        items.append(
+            f'<div data-hook="review" class="a-section review"><a data-hook="review-title" class="review-title">'
+            f'<span>{_phrase(rng, REVIEW_WORDS, 3, 8)}</span></a>'
+            f'<span data-hook="review-body"><span>{_phrase(rng, REVIEW_WORDS, 20, 80)}</span></span></div>'
+        )
+    return _page(rng, f'<div id="cm_cr-review_list">{"".join(items)}</div>', 250)
+
+
+def _flipkart_review_nodes(rng, reviews):
+    return [{"type": "ProductReviewValue", "id": f"r{rng.randint(10**8, 10**9)}",
+             "title": _phrase(rng, REVIEW_WORDS, 2, 5), "text": _phrase(rng, REVIEW_WORDS, 15, 60),
+             "rating": rng.randint(1, 5)} for _ in range(reviews)]
+
+
+def _state_script(state):
+    return f'<script>window.__INITIAL_STATE__ = {json.dumps(state)};</script>'
+
+
+def flipkart_reviews(rng, reviews=10):
+    nodes = _flipkart_review_nodes(rng, reviews)
+    items = []
+    for node in nodes:
+        items.append(
+            f'<div class="col _2wzgFH"><p class="_2-N8zT">{node["title"]}</p>'
+            f'<div class="t-ZTKy"><div><div>{node["text"]}</div></div></div></div>'
+        )
+    # Live review pages render from the same state the scraper reads first
+    state = {"pageDataV4": {"page": {"data": {"10002": [{"widget": {"data": {"renderableComponents": [
+        {"value": node} for node in nodes]}}}]}}}}
+    return _page(rng, f'{_state_script(state)}<div class="_1YokD2">{"".join(items)}</div>', 200)
+
+
+def amazon_page(rng, microdata=None):
+    """Product page with schema.org markup: JSON-LD on some pages, microdata on others"""
+    microdata = rng.random() < 0.5 if microdata is None else microdata
+    name = _phrase(rng, WORDS, 4, 12)
+    price = rng.randint(199, 250000)
+    rating = round(rng.uniform(1, 5), 1)
+    count = rng.randint(1, 50000)
+    asin = f"B0{rng.randint(0, 10**8 - 1):08d}"
+    if microdata:
+        markup = (
+            f'<div itemscope itemtype="https://schema.org/Product"><h1 itemprop="name">{name}</h1>'
+            f'<meta itemprop="sku" content="{asin}"><div itemprop="brand" itemscope itemtype="https://schema.org/Brand">'
+            f'<span itemprop="name">{rng.choice(WORDS)}</span></div>'
+            f'<div itemprop="offers" itemscope itemtype="https://schema.org/Offer">'
+            f'<meta itemprop="priceCurrency" content="INR"><span itemprop="price" content="{price}">₹{_inr(price)}</span></div>'
+            f'<div itemprop="aggregateRating" itemscope itemtype="https://schema.org/AggregateRating">'
+            f'<span itemprop="ratingValue">{rating}</span><span itemprop="reviewCount">{count}</span></div></div>'
+        )
+    else:
+        markup = '<script type="application/ld+json">' + json.dumps({
+            "@context": "https://schema.org", "@type": "Product", "name": name, "sku": asin,
+            "brand": {"@type": "Brand", "name": rng.choice(WORDS)},
+            "offers": {"@type": "Offer", "price": str(price), "priceCurrency": "INR"},
+            "aggregateRating": {"@type": "AggregateRating", "ratingValue": rating, "reviewCount": count},
+        }) + '</script>'
+    body = (f'{markup}<div id="dp-container"><span id="productTitle">{name}</span>'
+            f'<span class="a-price"><span class="a-offscreen">₹{_inr(price)}</span></span>'
+            f'<span id="acrPopover" title="{rating} out of 5 stars"></span></div>')
+    return _page(rng, body, 500)
+
+
+def flipkart_page(rng, reviews=8):
+    """Product page whose details and top reviews come from the embedded state"""
+    name = _phrase(rng, WORDS, 4, 10)
+    price = rng.randint(199, 250000)
+    context = {
+        "id": f"ITM{rng.randint(0, 10**6):06d}",
+        "titles": {"title": name},
+        "pricing": {"finalPrice": {"value": price}, "mrp": {"value": price + rng.randint(0, 50000)}},
+        "rating": {"average": round(rng.uniform(1, 5), 1), "count": rng.randint(1, 50000)},
+    }
+    state = {"pageDataV4": {"page": {"pageData": {"pageContext": context}, "data": {"10003": [
+        {"widget": {"data": {"reviews": [{"value": node} for node in _flipkart_review_nodes(rng, reviews)]}}}]}}}}
+    body = (f'{_state_script(state)}<h1 class="yhB1nd"><span class="B_NuCI">{name}</span></h1>'
+            f'<div class="_30jeq3 _16Jk6d">₹{_inr(price)}</div>')
+    return _page(rng, body, 350)
+
+
+BUILDERS = {
+    "amazon_search": amazon_search,
+    "flipkart_search": flipkart_search,
+    "flipkart_search_generic": lambda rng: flipkart_search(rng, generic=True),
+    "amazon_reviews": amazon_reviews,
+    "flipkart_reviews": flipkart_reviews,
+    "amazon_page": amazon_page,
+    "flipkart_page": flipkart_page,
+}
+
+
+def build_corpus(seed=SEED):
+    """{kind: [html, ...]} - deterministic for a given seed"""
+    rng = random.Random(seed)
+    return {kind: [BUILDERS[kind](rng) for _ in range(count)] for kind, count in KINDS.items()}
+
+
+def load_corpus(directory):
+    """Read saved pages laid out as <directory>/<kind>/*.html, as written by html_archive export"""
+    corpus = {}
+    for kind in sorted(os.listdir(directory)):
+        kind_dir = os.path.join(directory, kind)
+        if not os.path.isdir(kind_dir):
+            continue
+        corpus[kind] = []
+        for name in sorted(os.listdir(kind_dir)):
+            if name.endswith(".html"):
+                with open(os.path.join(kind_dir, name), encoding="utf-8") as f:
+                    corpus[kind].append(f.read())
+    return corpus
+
+
+def write_corpus(directory, seed=SEED):
+    for kind, pages in build_corpus(seed).items():
+        os.makedirs(os.path.join(directory, kind), exist_ok=True)
+        for index, html in enumerate(pages):
+            with open(os.path.join(directory, kind, f"{index:02d}.html"), "w", encoding="utf-8") as f:
+                f.write(html)
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "fixtures")
+    write_corpus(target)
+    print(f"Wrote fixture corpus to {target}")
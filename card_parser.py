@@ -0,0 +1,148 @@
+import logging
+import os
+import re
+from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
+
+logger = logging.getLogger(__name__)
+
+# Set SCRAPER_PARTIAL_PARSE=0 to always build the full BeautifulSoup tree
+PARTIAL_PARSE = os.environ.get("SCRAPER_PARTIAL_PARSE", "1") != "0"
+# The page is fed to the parser in chunks so it can stop as soon as enough cards are in
+CHUNK_SIZE = 64 * 1024
+
+# tag, tag.class.class, .class, tag[attr="value"]
+SIMPLE_SELECTOR = re.compile(
+    r'^(?P<tag>[a-zA-Z][\w-]*)?(?P<classes>(?:\.[\w-]+)*)'
+    r'(?:\[(?P<attr>[\w-]+)=["\']?(?P<value>[^"\'\]]*)["\']?\])?$'
+)
+
+
+def compile_selector(selector):
+    """Turn a simple CSS selector into (tag, classes, attr, value), or None if unsupported"""
+    match = SIMPLE_SELECTOR.match(selector.strip())
+    if not match or not (match.group("tag") or match.group("classes") or match.group("attr")):
+        return None
+    classes = [cls for cls in match.group("classes").split(".") if cls]
+    return match.group("tag"), classes, match.group("attr"), match.group("value")
+
+
+def _matches(element, compiled):
+    tag, classes, attr, value = compiled
+    if tag and element.tag != tag:
+        return False
+    if classes:
+        element_classes = (element.get("class") or "").split()
+        if not all(cls in element_classes for cls in classes):
+            return False
+    if attr and element.get(attr) != value:
+        return False
+    return True
+
+
+def _to_soup(element):
+    """Re-parse one card subtree so callers keep the BeautifulSoup API"""
+    fragment = lxml_html.tostring(element, encoding="unicode")
+    soup = BeautifulSoup(fragment, "lxml")
+    return soup.find(element.tag)
+
+
+def _full_parse(html, selectors, limit):
+    soup = BeautifulSoup(html, "lxml")
+    for selector in selectors:
+        cards = soup.select(selector)
+        if cards:
+            return selector, cards[:limit] if limit else cards
+    return None, []
+
+
+def _iter_partial(html, compiled, limit):
+    """Stream the page and yield (selector index, card) pairs.
+
+    Cards for the first selector are yielded the moment they close, and parsing
+    stops once limit of them have been seen. Cards for the other selectors are
+    held back (up to limit each) and only the first non-empty group is yielded
+    if the first selector matched nothing in the whole page.
+    """
+    held = [[] for _ in compiled]
+    yielded = 0
+    tags = {spec[0] for spec in compiled}
+    parser = etree.HTMLPullParser(events=("end",), tag=None if None in tags else list(tags), encoding="utf-8")
+    data = html.encode("utf-8") if isinstance(html, str) else html
+
+    def matches():
+        for _, element in parser.read_events():
+            for index, spec in enumerate(compiled):
+                if _matches(element, spec):
+                    yield index, element
+
+    for start in range(0, len(data) + CHUNK_SIZE, CHUNK_SIZE):
+        if start < len(data):
+            parser.feed(data[start:start + CHUNK_SIZE])
+        else:
+            parser.close()
+        for index, element in matches():
+            if index == 0:
+                yield 0, _to_soup(element)
+                yielded += 1
+                if yielded >= limit:
+                    logger.debug(f"Stopped parsing after {start + CHUNK_SIZE} of {len(data)} bytes")
+                    return
+            elif len(held[index]) < limit:
+                held[index].append(_to_soup(element))
+
+    if yielded:
+        return
+    for index, cards in enumerate(held):
+        if cards:
+            for card in cards:
+                yield index, card
+            return
+
+
+def _partial_parse(html, compiled, limit):
+    index, cards = None, []
+    for card_index, card in _iter_partial(html, compiled, limit):
+        index = card_index
+        cards.append(card)
+    return index, cards
+
+
+def select_result_cards(html, selectors, limit=None):
+    """Return (selector, cards) for the first selector that matches the page.
+
+    With a limit, only the card subtrees are parsed and parsing stops once
+    enough cards have been found; cards are still BeautifulSoup tags.
+    """
+    compiled = [compile_selector(selector) for selector in selectors]
+    if not (PARTIAL_PARSE and limit and all(compiled)):
+        return _full_parse(html, selectors, limit)
+
+    try:
+        index, cards = _partial_parse(html, compiled, limit)
+    except Exception as e:
+        logger.warning(f"Partial parse failed, parsing the whole page: {e}")
+        return _full_parse(html, selectors, limit)
+    return (selectors[index] if index is not None else None), cards
+
+
+def iter_result_cards(html, selectors, limit):
+    """Yield the first limit cards of the first matching selector as soon as each is parsed"""
+    compiled = [compile_selector(selector) for selector in selectors]
+    if not (PARTIAL_PARSE and limit and all(compiled)):
+        yield from _full_parse(html, selectors, limit)[1]
+        return
+
+    stream = _iter_partial(html, compiled, limit)
+    try:
+        first = next(stream, None)
+    except Exception as e:
+        logger.warning(f"Partial parse failed, parsing the whole page: {e}")
+        yield from _full_parse(html, selectors, limit)[1]
+        return
+    if first is None:
+        return
+    yield first[1]
+    for _, card in stream:
+        yield card
@@ -0,0 +1,203 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from profile_pool import release_profile
+
+logger = logging.getLogger(__name__)
+
+# Pool settings (can be overridden from the environment)
+POOL_SIZE = int(os.environ.get("SCRAPER_POOL_SIZE", "2"))
+MAX_PAGES_PER_DRIVER = int(os.environ.get("SCRAPER_MAX_PAGES_PER_DRIVER", "50"))
+CHECKOUT_TIMEOUT = float(os.environ.get("SCRAPER_CHECKOUT_TIMEOUT", "120"))
+
+
+class PooledDriver:
+    """Book-keeping for one live browser owned by a pool"""
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.time()
+
+
+class DriverPool:
+    """Keeps a set of warm WebDriver instances that callers borrow and return"""
+    def __init__(self, factory, size=POOL_SIZE, max_pages=MAX_PAGES_PER_DRIVER, name="default"):
+        self.factory = factory
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.name = name
+        self._idle = []
+        self._live = 0
+        self._closed = False
+        self._warmed = False
+        self._cond = threading.Condition()
+
+    def _create(self):
+        logger.info(f"[{self.name}] Starting pooled browser ({self._live}/{self.size} live)")
+        return PooledDriver(self.factory())
+
+    def _destroy(self, pooled):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.debug(f"[{self.name}] Error quitting browser: {e}")
+        # Chrome must be gone before its profile is trimmed and unlocked
+        release_profile(pooled.driver)
+
+    def _is_healthy(self, pooled):
+        """Cheap liveness probe - a dead session raises on any command"""
+        try:
+            pooled.driver.current_url
+            pooled.driver.window_handles
+            return True
+        except Exception as e:
+            logger.info(f"[{self.name}] Discarding unhealthy browser: {e}")
+            return False
+
+    def checkout(self, timeout=CHECKOUT_TIMEOUT):
+        """Borrow a driver, starting a new one only if the pool is not yet full"""
+        deadline = time.monotonic() + timeout
+        while True:
+            pooled = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError(f"Driver pool '{self.name}' is closed")
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+                    if self._live < self.size:
+                        self._live += 1
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"No browser available in pool '{self.name}' after {timeout}s")
+                    self._cond.wait(remaining)
+
+            if pooled is None:
+                break
+            # Probe and quit outside the lock: both talk to Chrome and can take seconds
+            if self._is_healthy(pooled):
+                return pooled
+            self._destroy(pooled)
+            with self._cond:
+                self._live -= 1
+                self._cond.notify()
+
+        # Launch outside the lock so other callers are not blocked on Chrome start-up
+        try:
+            return self._create()
+        except Exception:
+            with self._cond:
+                self._live -= 1
+                self._cond.notify()
+            raise
+
+    def checkin(self, pooled, pages=1, discard=False):
+        """Return a borrowed driver; recycle it once it has served max_pages pages"""
+        pooled.pages += pages
+        recycle = discard or self._closed or (self.max_pages and pooled.pages >= self.max_pages)
+
+        if not recycle and not self._is_healthy(pooled):
+            recycle = True
+
+        if not recycle:
+            try:
+                # Leave the tab on a blank page so the next borrower starts clean
+                handles = pooled.driver.window_handles
+                for handle in handles[1:]:
+                    pooled.driver.switch_to.window(handle)
+                    pooled.driver.close()
+                pooled.driver.switch_to.window(handles[0])
+                pooled.driver.get("about:blank")
+            except Exception as e:
+                logger.info(f"[{self.name}] Could not reset browser, recycling it: {e}")
+                recycle = True
+
+        if recycle:
+            logger.info(f"[{self.name}] Recycling browser after {pooled.pages} pages")
+            self._destroy(pooled)
+
+        with self._cond:
+            if recycle:
+                self._live -= 1
+            else:
+                self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def driver(self, timeout=CHECKOUT_TIMEOUT):
+        """Context manager that checks a driver out and always checks it back in"""
+        pooled = self.checkout(timeout)
+        try:
+            yield pooled.driver
+        finally:
+            # A driver that raised mid-page may be wedged; checkin health-checks it
+            self.checkin(pooled)
+
+    def warm(self, count=None, background=True):
+        """Start browsers ahead of time so the first search does not pay for a cold launch"""
+        if self._warmed:
+            return
+        self._warmed = True
+        count = self.size if count is None else min(count, self.size)
+
+        def _fill():
+            started = []
+            try:
+                for _ in range(count):
+                    with self._cond:
+                        # Every browser is already busy, nothing to warm
+                        if self._live >= self.size and not self._idle:
+                            break
+                    started.append(self.checkout())
+            except Exception as e:
+                logger.warning(f"[{self.name}] Could not pre-warm browser: {e}")
+            finally:
+                for pooled in started:
+                    self.checkin(pooled, pages=0)
+
+        if background:
+            threading.Thread(target=_fill, name=f"warm-{self.name}", daemon=True).start()
+        else:
+            _fill()
+
+    def close(self):
+        """Quit every idle driver; drivers still checked out are quit on checkin"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._live -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._destroy(pooled)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, factory, size=POOL_SIZE, max_pages=MAX_PAGES_PER_DRIVER):
+    """Return the shared pool for key, creating it with factory on first use"""
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = DriverPool(factory, size=size, max_pages=max_pages, name=str(key))
+            _pools[key] = pool
+        return pool
+
+
+def close_all_pools():
+    """Shut down every shared pool (registered to run at interpreter exit)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_all_pools)
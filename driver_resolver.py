@@ -0,0 +1,241 @@
+import json
+import logging
+import os
+import platform
+import re
+import shutil
+import stat
+import subprocess
+import sys
+import threading
+import zipfile
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Downloaded drivers live here, one directory per Chrome major version
+CACHE_DIR = os.environ.get(
+    "SCRAPER_DRIVER_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "pricescraper", "chromedriver"),
+)
+
+# Chrome for Testing publishes a driver for every milestone from 115 onwards
+CFT_MILESTONES_URL = "https://googlechromelabs.github.io/chrome-for-testing/latest-versions-per-milestone-with-downloads.json"
+LEGACY_RELEASE_URL = "https://chromedriver.storage.googleapis.com/LATEST_RELEASE_{major}"
+LEGACY_DOWNLOAD_URL = "https://chromedriver.storage.googleapis.com/{version}/chromedriver_{platform}.zip"
+DOWNLOAD_TIMEOUT = float(os.environ.get("SCRAPER_DRIVER_DOWNLOAD_TIMEOUT", "60"))
+
+# Browser binaries to try when CHROME_BINARY is not set
+LINUX_BROWSERS = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"]
+MAC_BROWSERS = [
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    "/Applications/Chromium.app/Contents/MacOS/Chromium",
+]
+WINDOWS_BROWSERS = [
+    r"C:/Program Files/Google/Chrome/Application/chrome.exe",
+    r"C:/Program Files (x86)/Google/Chrome/Application/chrome.exe",
+    os.path.join(os.environ.get("LOCALAPPDATA", ""), "Google", "Chrome", "Application", "chrome.exe"),
+]
+
+VERSION_PATTERN = re.compile(r"(\d+)\.(\d+)\.(\d+)\.(\d+)")
+
+_resolved = {}
+_resolve_lock = threading.Lock()
+
+
+def driver_binary_name():
+    return "chromedriver.exe" if sys.platform.startswith("win") else "chromedriver"
+
+
+def platform_key():
+    """Chrome for Testing platform name for this machine"""
+    machine = platform.machine().lower()
+    if sys.platform.startswith("win"):
+        return "win64" if machine.endswith("64") else "win32"
+    if sys.platform == "darwin":
+        return "mac-arm64" if machine in ("arm64", "aarch64") else "mac-x64"
+    return "linux64"
+
+
+def _version_from_output(command):
+    try:
+        output = subprocess.run(command, capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug(f"Could not run {command[0]}: {e}")
+        return None
+    match = VERSION_PATTERN.search(output)
+    return match.group(0) if match else None
+
+
+def _windows_registry_version():
+    try:
+        import winreg
+    except ImportError:
+        return None
+    for root in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+        try:
+            with winreg.OpenKey(root, r"Software\Google\Chrome\BLBeacon") as key:
+                return winreg.QueryValueEx(key, "version")[0]
+        except OSError:
+            continue
+    return None
+
+
+def _windows_file_version(path):
+    # pywin32 is only present on some Windows installs
+    try:
+        from win32com.client import Dispatch
+    except ImportError:
+        return None
+    try:
+        return Dispatch('Scripting.FileSystemObject').GetFileVersion(path)
+    except Exception:
+        return None
+
+
+def find_chrome_binary():
+    """Path of the installed Chrome/Chromium, or None"""
+    configured = os.environ.get("CHROME_BINARY")
+    if configured:
+        return configured
+    if sys.platform.startswith("win"):
+        candidates = WINDOWS_BROWSERS
+    elif sys.platform == "darwin":
+        candidates = MAC_BROWSERS
+    else:
+        candidates = [shutil.which(name) for name in LINUX_BROWSERS]
+    for candidate in candidates:
+        if candidate and os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def get_chrome_version():
+    """Full version string of the installed browser (e.g. '124.0.6367.91'), or None"""
+    if sys.platform.startswith("win"):
+        version = _windows_registry_version()
+        if version:
+            return version
+        binary = find_chrome_binary()
+        return _windows_file_version(binary) if binary else None
+
+    binary = find_chrome_binary()
+    if not binary:
+        return None
+    return _version_from_output([binary, "--version"])
+
+
+def get_driver_version(driver_path):
+    """Full version string reported by a chromedriver binary, or None"""
+    if not driver_path or not os.path.isfile(driver_path):
+        return None
+    return _version_from_output([driver_path, "--version"])
+
+
+def major_of(version):
+    return version.split(".")[0] if version else None
+
+
+def cached_driver_path(major):
+    return os.path.join(CACHE_DIR, str(major), driver_binary_name())
+
+
+def _download_url(major):
+    """Look up the driver zip for a Chrome major version"""
+    plat = platform_key()
+    if int(major) >= 115:
+        response = requests.get(CFT_MILESTONES_URL, timeout=DOWNLOAD_TIMEOUT)
+        response.raise_for_status()
+        milestone = response.json()["milestones"].get(str(major))
+        if not milestone:
+            return None
+        for download in milestone["downloads"].get("chromedriver", []):
+            if download["platform"] == plat:
+                return download["url"]
+        return None
+
+    # Older milestones only exist on the legacy bucket, which has no arm64 Mac build
+    legacy_platform = {"linux64": "linux64", "mac-x64": "mac64", "mac-arm64": "mac_arm64"}.get(plat, "win32")
+    response = requests.get(LEGACY_RELEASE_URL.format(major=major), timeout=DOWNLOAD_TIMEOUT)
+    response.raise_for_status()
+    return LEGACY_DOWNLOAD_URL.format(version=response.text.strip(), platform=legacy_platform)
+
+
+def download_chromedriver(major):
+    """Download the driver for a Chrome major version into the cache.
+
+    Returns the cached binary path, or None if the download failed.
+    """
+    target = cached_driver_path(major)
+    target_dir = os.path.dirname(target)
+    os.makedirs(target_dir, exist_ok=True)
+
+    try:
+        url = _download_url(major)
+        if not url:
+            logger.error(f"No ChromeDriver published for Chrome {major} on {platform_key()}")
+            return None
+
+        logger.info(f"Downloading ChromeDriver for Chrome {major} from {url}")
+        response = requests.get(url, timeout=DOWNLOAD_TIMEOUT)
+        response.raise_for_status()
+
+        archive = os.path.join(target_dir, "chromedriver.zip")
+        with open(archive, "wb") as f:
+            f.write(response.content)
+
+        # The binary sits in a platform folder inside newer archives
+        with zipfile.ZipFile(archive) as zip_ref:
+            member = next(name for name in zip_ref.namelist()
+                          if os.path.basename(name) == driver_binary_name())
+            partial = target + ".part"
+            with zip_ref.open(member) as source, open(partial, "wb") as dest:
+                shutil.copyfileobj(source, dest)
+        os.remove(archive)
+
+        os.chmod(partial, os.stat(partial).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        os.replace(partial, target)
+
+        with open(os.path.join(target_dir, "version.json"), "w") as f:
+            json.dump({"major": str(major), "driver": get_driver_version(target)}, f)
+
+        logger.info(f"ChromeDriver cached at {target}")
+        return target
+    except Exception as e:
+        logger.error(f"Error downloading ChromeDriver for Chrome {major}: {e}")
+        return None
+
+
+def _resolve(preferred):
+    chrome_version = get_chrome_version()
+    chrome_major = major_of(chrome_version)
+    if not chrome_major:
+        # Without a version we cannot pick a driver; let Selenium report the problem
+        logger.warning("Could not determine the installed Chrome version")
+        return preferred
+
+    logger.info(f"Detected Chrome {chrome_version}")
+
+    # An explicitly supplied driver wins when it matches the browser
+    if preferred and major_of(get_driver_version(preferred)) == chrome_major:
+        return preferred
+
+    cached = cached_driver_path(chrome_major)
+    if os.path.isfile(cached):
+        logger.info(f"Using cached ChromeDriver {cached}")
+        return cached
+
+    return download_chromedriver(chrome_major) or preferred
+
+
+def resolve_driver_path(preferred=None):
+    """Path of a ChromeDriver that matches the installed browser.
+
+    Resolved once per process and per preferred path: a supplied driver is
+    used when its major version matches Chrome, otherwise the cache for that
+    version is used, and only a cache miss triggers a download.
+    """
+    with _resolve_lock:
+        if preferred not in _resolved:
+            _resolved[preferred] = _resolve(preferred)
+        return _resolved[preferred]
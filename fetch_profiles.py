@@ -0,0 +1,84 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# "full" loads pages as a normal browser would; "lean" drops everything the
+# scrapers never read (they only use text and hrefs)
+PROFILES = ("full", "lean")
+
+# Profile used by the headless search scrapers unless a caller picks one
+DEFAULT_PROFILE = os.environ.get("SCRAPER_FETCH_PROFILE", "lean")
+
+# Heavy resource types, matched by file extension (with or without a query string)
+BLOCKED_EXTENSIONS = [
+    "png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp",
+    "woff", "woff2", "ttf", "otf", "eot",
+    "mp4", "webm", "m3u8", "mp3", "ogg",
+]
+BLOCKED_RESOURCE_PATTERNS = [pattern for ext in BLOCKED_EXTENSIONS for pattern in (f"*.{ext}", f"*.{ext}?*")]
+
+# Analytics, advertising and tracking hosts seen on Amazon and Flipkart
+BLOCKED_HOSTS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*googlesyndication.com*",
+    "*doubleclick.net*",
+    "*facebook.net*",
+    "*facebook.com/tr*",
+    "*amazon-adsystem.com*",
+    "*fls-eu.amazon.*",
+    "*fls-na.amazon.*",
+    "*unagi.amazon.*",
+    "*unagi-na.amazon.*",
+    "*aax-eu.amazon.*",
+    "*aan.amazon.*",
+    "*rukminim*.flixcart.com*",
+    "*img1a.flixcart.com*",
+    "*hotjar.com*",
+    "*clarity.ms*",
+    "*branch.io*",
+    "*criteo.*",
+]
+
+
+def check_profile(profile):
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown fetch profile '{profile}'. Choose one of: {', '.join(PROFILES)}")
+    return profile
+
+
+def apply_profile_options(chrome_options, profile):
+    """Add launch-time settings for the profile to a ChromeOptions object"""
+    if check_profile(profile) != "lean":
+        return chrome_options
+
+    # Ask Chrome itself not to fetch or decode images and to skip autoplay media
+    chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+    chrome_options.add_argument('--autoplay-policy=user-gesture-required')
+    # Merge rather than replace: the caller may already have set prefs of its own
+    prefs = dict(chrome_options.experimental_options.get("prefs", {}))
+    prefs.update({
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.media_stream": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+    chrome_options.add_experimental_option("prefs", prefs)
+    return chrome_options
+
+
+def apply_profile(driver, profile):
+    """Install CDP request blocking for the profile on a running driver"""
+    if check_profile(profile) != "lean":
+        return driver
+
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {
+            "urls": BLOCKED_RESOURCE_PATTERNS + BLOCKED_HOSTS
+        })
+        logger.info(f"Lean profile active: blocking {len(BLOCKED_RESOURCE_PATTERNS) + len(BLOCKED_HOSTS)} URL patterns")
+    except Exception as e:
+        # Not fatal - the page still loads, just with everything on it
+        logger.warning(f"Could not enable request blocking: {e}")
+    return driver
@@ -1,139 +1,363 @@
 from pathlib import Path
+from bs4 import BeautifulSoup
+from lxml import html as lxml_html
+from urllib.parse import parse_qs, urlencode, urljoin, urlparse, urlunparse
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import time
 import logging
 import os
 import sys
-from textblob import TextBlob  # For sentiment analysis
+from driver_pool import get_pool
+from profile_pool import launch_with_profile
+from flipkart_state import extract_state, iter_state_reviews, state_from_browser, state_product_info, state_products
+from network_capture import NetworkCapture, enable_capture_options
+from prices import format_price, parse_price
+from structured_data import product_from_driver
+from selector_stats import first_match, record
+from driver_resolver import resolve_driver_path
+from waits import wait_for, wait_for_staleness, wait_for_url_change, scroll_until_stable
+from fetch_profiles import DEFAULT_PROFILE, apply_profile_options, apply_profile
+from async_engine import run, run_blocking
+from result_cache import cached_async
+from sentiment_cache import NEGATIVE_THRESHOLD, POSITIVE_THRESHOLD, polarities
+from review_store import REVIEW_STORE, add_reviews, flipkart_product_id, known_review_ids, split_new, stored_reviews
+from review_store import product_info as stored_product_info
+from html_archive import REPLAY, ReplayMiss, archive_page, replay_html
+from tab_runner import TabJob
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
+# Ways to find the product cards, tried in order: ("css" | "xpath", selector)
+PRODUCT_STRATEGIES = [
+    ("css", 'div[data-id]'),
+    ("css", 'div._1AtVbE'),
+    ("xpath", '//div[contains(@class, "product")]'),
+    ("xpath", '//a[contains(@href, "/p/")]/../..')
+]
+
+# XPaths relative to a product card
+TITLE_SELECTORS = [
+    './/a[contains(@href, "/p/")]//div[@class="_4rR01t"]',
+    './/div[contains(@class, "_4rR01t")]',
+    './/a[contains(@class, "s1Q9rs")]',
+    './/a[contains(@href, "/p/")]',
+    './/div[contains(@class, "product-title")]'
+]
+PRICE_SELECTOR = './/div[contains(@class, "_30jeq3") or contains(text(), "₹")]'
+LINK_SELECTOR = './/a[contains(@href, "/p/")]'
+
+# Runs the same strategies as the element-by-element path inside the page and
+# returns [{title, title_selector, price_text, link}, ...] for the first `limit` cards
+EXTRACT_CARDS_SCRIPT = """
+const [strategies, titleSelectors, priceSelector, linkSelector, limit] = arguments;
+
+function first(xpath, context) {
+    return document.evaluate(xpath, context, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+
+function all(kind, selector) {
+    if (kind === 'css') {
+        return Array.from(document.querySelectorAll(selector));
+    }
+    const snapshot = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const nodes = [];
+    for (let i = 0; i < snapshot.snapshotLength; i++) {
+        nodes.push(snapshot.snapshotItem(i));
+    }
+    return nodes;
+}
+
+let containers = [];
+for (const [kind, selector] of strategies) {
+    try {
+        containers = all(kind, selector);
+    } catch (e) {
+        containers = [];
+    }
+    if (containers.length) break;
+}
+
+return containers.slice(0, limit).map(container => {
+    let title = null;
+    let titleSelector = null;
+    for (const selector of titleSelectors) {
+        const node = first(selector, container);
+        const text = node ? node.innerText.trim() : '';
+        if (text && text !== 'Add to Compare') {
+            title = text;
+            titleSelector = selector;
+            break;
+        }
+    }
+    const price = first(priceSelector, container);
+    const link = first(linkSelector, container);
+    return {
+        title: title,
+        title_selector: titleSelector,
+        price_text: price ? price.innerText : null,
+        link: link ? link.href : null
+    };
+});
+"""
+
+def newest_reviews_url(url):
+    """Review page for a product or review URL, sorted newest first; None if it can't be derived"""
+    if "/product-reviews/" not in url:
+        if "/p/" not in url:
+            return None
+        url = url.replace("/p/", "/product-reviews/", 1)
+    parts = urlparse(url)
+    query = parse_qs(parts.query)
+    query["sortOrder"] = ["MOST_RECENT"]
+    return urlunparse(parts._replace(query=urlencode(query, doseq=True)))
+
+
+def parse_search_cards(html, limit=5):
+    """Cards from saved page HTML: the embedded state, else the same XPaths as the browser paths"""
+    products = state_products(extract_state(html), limit)
+    if products:
+        return [{'title': p['title'], 'price': p['price'], 'price_text': None, 'link': p['link']}
+                for p in products]
+    
+    tree = lxml_html.fromstring(html)
+    containers = []
+    for kind, selector in PRODUCT_STRATEGIES:
+        try:
+            containers = tree.cssselect(selector) if kind == "css" else tree.xpath(selector)
+        except Exception:
+            # .cssselect needs the cssselect package
+            containers = []
+        if containers:
+            break
+    
+    cards = []
+    for container in containers[:limit]:
+        title = None
+        for selector in TITLE_SELECTORS:
+            nodes = container.xpath(selector)
+            text = nodes[0].text_content().strip() if nodes else ''
+            if text and text != 'Add to Compare':
+                title = text
+                break
+        price = container.xpath(PRICE_SELECTOR)
+        link = container.xpath(LINK_SELECTOR)
+        cards.append({
+            'title': title,
+            'price_text': price[0].text_content().strip() if price else '',
+            'link': urljoin("https://www.flipkart.com", link[0].get('href')) if link else None,
+        })
+    return cards
+
+def product_from_card(card):
+    """{'title', 'price', 'price_text', 'link'} for a complete card, else None"""
+    title = card['title']
+    price = parse_price(card['price'] if card.get('price') is not None else card['price_text'])
+    link = card['link']
+    if not (title and price is not None and link):
+        return None
+    return {'title': title, 'price': price, 'price_text': format_price(price), 'link': link}
+
+def parse_search_products(html, limit=5):
+    """Complete products from a saved search results page"""
+    products = []
+    for card in parse_search_cards(html, limit):
+        product = product_from_card(card)
+        if product:
+            products.append(product)
+    return products
+
+def flipkart_search_job(search_term, limit=5):
+    """Tab job that loads a Flipkart search and parses its products"""
+    url = f"https://www.flipkart.com/search?q={search_term.replace(' ', '+')}"
+    return TabJob(url, "flipkart", "results", lambda html: parse_search_products(html, limit))
+
 class FlipkartProductSearch:
-    def __init__(self, driver_path="chromedriver.exe"):
+    def __init__(self, driver_path="chromedriver.exe", profile=DEFAULT_PROFILE):
         self.driver_path = driver_path
+        self.profile = profile
         self.products = []
+        self.pool = get_pool(("flipkart-search", driver_path, profile),
+                             lambda: launch_with_profile(f"flipkart-search-{profile}", self.create_browser))
     
-    def create_browser(self):
+    def create_browser(self, user_data_dir=None):
         chrome_options = Options()
         chrome_options.add_argument('--no-sandbox')
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_argument('--headless')
         chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+        apply_profile_options(chrome_options, self.profile)
+        enable_capture_options(chrome_options)
+        if user_data_dir:
+            chrome_options.add_argument(f'--user-data-dir={user_data_dir}')
         
-        service = Service(self.driver_path)
+        service = Service(resolve_driver_path(self.driver_path))
         browser = webdriver.Chrome(service=service, options=chrome_options)
-        return browser
+        return apply_profile(browser, self.profile)
+    
+    async def search_products_async(self, search_term):
+        """Search Flipkart without blocking the event loop (bounded per domain)"""
+        self.products = await cached_async("flipkart-search", search_term, "flipkart.com",
+                                           lambda: self._search_products(search_term))
+        return self.products
     
     def search_products(self, search_term):
         """Search for products on Flipkart using the search term"""
+        return run(self.search_products_async(search_term))
+    
+    def _search_products(self, search_term):
+        # Built locally: a background cache refresh runs this on another thread
+        # and must not touch the products of the caller that is already served
+        return list(self.iter_products(search_term))
+    
+    def iter_products(self, search_term, limit=5):
+        """Yield each valid product as soon as its card is parsed"""
+        for idx, card in enumerate(self._fetch_cards(search_term, limit), 1):
+            try:
+                product = product_from_card(card)
+                if product:
+                    print(f"\nProduct {idx}:")
+                    print(f"Title: {product['title']}")
+                    print(f"Price: ₹{product['price']:,.2f}")
+                    print(f"Link: {product['link']}")
+                    yield product
+            
+            except Exception as e:
+                print(f"Error processing product {idx}: {e}")
+    
+    def _fetch_cards(self, search_term, limit=5):
+        """Load the results page and return the raw card data; the browser goes back to the pool before parsing"""
         print(f"\n🔎 Searching for '{search_term}' on Flipkart...\n")
         search_term = search_term.replace(' ', '+')
         flipkart_link = f"https://www.flipkart.com/search?q={search_term}"
-        browser = self.create_browser()
+        
+        if REPLAY:
+            try:
+                return self._extract_cards_from_html(replay_html(flipkart_link), limit)
+            except ReplayMiss as e:
+                print(e)
+                return []
+        
+        pooled = self.pool.checkout()
+        browser = pooled.driver
+        capture = NetworkCapture(browser)
         
         try:
+            # Drop responses left in the log by the previous search on this browser
+            capture.clear()
             # Navigate to the search results page
             browser.get(flipkart_link)
-            time.sleep(10)  # Extended wait time
-            
-            # Try multiple strategies to find product elements
-            product_strategies = [
-                (By.CSS_SELECTOR, 'div[data-id]'),
-                (By.CSS_SELECTOR, 'div._1AtVbE'),
-                (By.XPATH, '//div[contains(@class, "product")]'),
-                (By.XPATH, '//a[contains(@href, "/p/")]/../..')
-            ]
+            # Continue as soon as the result cards are present
+            wait_for(browser, "flipkart", "results")
             
-            products_found = False
-            product_containers = []
+            # Prefer the embedded page state, then one in-page script, then per-element lookups
+            cards = self._extract_cards_from_state(browser, limit)
+            if len(cards) < limit:
+                cards += self._extract_cards_from_capture(capture, cards, limit)
+            if not cards:
+                cards = self._extract_cards_in_page(browser, limit)
+            if cards is None:
+                cards = self._extract_cards_by_element(browser, limit)
             
-            for strategy in product_strategies:
-                try:
-                    product_containers = browser.find_elements(*strategy)
-                    if product_containers:
-                        products_found = True
-                        print(f"Found {len(product_containers)} products using {strategy}")
-                        break
-                except Exception as e:
-                    print(f"Strategy {strategy} failed: {e}")
-            
-            if not products_found:
-                print("No products found. Saving page source for debugging.")
-                with open('debug_page_source.html', 'w', encoding='utf-8') as f:
-                    f.write(browser.page_source)
+            # Archive the page for replay; a page with no products is kept for debugging too
+            archive_page(flipkart_link, browser.page_source)
+            if not cards:
+                print("No products found. The page source is in the HTML archive.")
                 return []
             
-            # Process the first 5 products
-            for idx, container in enumerate(product_containers[:5], 1):
-                try:
-                    # More comprehensive title extraction
-                    title_selectors = [
-                        './/a[contains(@href, "/p/")]//div[@class="_4rR01t"]',
-                        './/div[contains(@class, "_4rR01t")]',
-                        './/a[contains(@class, "s1Q9rs")]',
-                        './/a[contains(@href, "/p/")]',
-                        './/div[contains(@class, "product-title")]'
-                    ]
-                    
-                    title = "Title Not Available"
-                    for selector in title_selectors:
-                        try:
-                            title_elem = container.find_element(By.XPATH, selector)
-                            candidate_title = title_elem.text.strip()
-                            if candidate_title and candidate_title != "Add to Compare":
-                                title = candidate_title
-                                break
-                        except:
-                            continue
-                    
-                    # Price extraction with multiple attempts
-                    try:
-                        price_elem = container.find_element(By.XPATH, './/div[contains(@class, "_30jeq3") or contains(text(), "₹")]')
-                        price_text = price_elem.text.replace('₹','').replace(',','')
-                        price = float(price_text) if price_text.replace('.', '', 1).isdigit() else float('inf')
-                    except:
-                        price = float('inf')
-                    
-                    # Link extraction
-                    try:
-                        link_elem = container.find_element(By.XPATH, './/a[contains(@href, "/p/")]')
-                        link = link_elem.get_attribute('href')
-                    except:
-                        link = None
-                    
-                    # Add to products list if we have valid data
-                    if title != "Title Not Available" and price != float('inf') and link:
-                        self.products.append({
-                            'title': title,
-                            'price': price,
-                            'price_text': f"₹{price:,.2f}",
-                            'link': link
-                        })
-                        print(f"\nProduct {idx}:")
-                        print(f"Title: {title}")
-                        print(f"Price: ₹{price:,.2f}")
-                        print(f"Link: {link}")
-                
-                except Exception as e:
-                    print(f"Error processing product {idx}: {e}")
-            
-            return self.products
+            return cards[:limit]
             
         except Exception as e:
             print(f"Overall scraping error: {e}")
-            with open('debug_error_page.html', 'w', encoding='utf-8') as f:
-                f.write(browser.page_source)
+            archive_page(flipkart_link, browser.page_source)
             return []
         
         finally:
-            browser.quit()
+            self.pool.checkin(pooled)
+    
+    def _extract_cards_from_html(self, html, limit=5):
+        return parse_search_cards(html, limit)
+    
+    def _extract_cards_from_state(self, browser, limit=5):
+        """Cards from the server-rendered state object, immune to class-name changes"""
+        products = state_products(state_from_browser(browser), limit)
+        if products:
+            print(f"Found {len(products)} products in the page state")
+        return [{'title': p['title'], 'price': p['price'], 'price_text': None, 'link': p['link']}
+                for p in products]
+    
+    def _extract_cards_from_capture(self, capture, cards, limit=5):
+        """Cards from search API responses ("load more", in-page updates) not already in cards"""
+        seen = {card['link'] for card in cards}
+        extra = []
+        for payload in capture.payloads("flipkart", "search"):
+            for p in state_products(payload, limit):
+                if p['link'] not in seen and len(cards) + len(extra) < limit:
+                    seen.add(p['link'])
+                    extra.append({'title': p['title'], 'price': p['price'], 'price_text': None, 'link': p['link']})
+        if extra:
+            print(f"Found {len(extra)} more products in captured search responses")
+        return extra
+    
+    def _extract_cards_in_page(self, browser, limit=5):
+        """Extract title, price text and link of every card with a single execute_script.
+
+        Returns None if the script itself fails, so the caller can fall back.
+        """
+        # The page tries title selectors from specific to broad; record which one won
+        title_selectors = TITLE_SELECTORS
+        try:
+            cards = browser.execute_script(EXTRACT_CARDS_SCRIPT, PRODUCT_STRATEGIES, title_selectors,
+                                           PRICE_SELECTOR, LINK_SELECTOR, limit)
+        except Exception as e:
+            logger.warning(f"In-page extraction failed, using element lookups: {e}")
+            return None
+        for card in cards or []:
+            winner = card.get('title_selector')
+            for selector in title_selectors:
+                record("flipkart", "search_title", selector, selector == winner)
+                if selector == winner:
+                    break
+        if cards:
+            print(f"Found {len(cards)} products in one script call")
+        return cards
+    
+    def _extract_cards_by_element(self, browser, limit=5):
+        """Slow path: one WebDriver round-trip per selector and card"""
+        product_containers = []
+        for strategy in PRODUCT_STRATEGIES:
+            by = By.CSS_SELECTOR if strategy[0] == "css" else By.XPATH
+            try:
+                product_containers = browser.find_elements(by, strategy[1])
+                if product_containers:
+                    print(f"Found {len(product_containers)} products using {strategy}")
+                    break
+            except Exception as e:
+                print(f"Strategy {strategy} failed: {e}")
+        
+        cards = []
+        for container in product_containers[:limit]:
+            def find_title(selector):
+                candidate_title = container.find_element(By.XPATH, selector).text.strip()
+                return candidate_title if candidate_title != "Add to Compare" else None
+            
+            _, title = first_match("flipkart", "search_title", TITLE_SELECTORS, find_title, reorder=False)
+            
+            try:
+                price_text = container.find_element(By.XPATH, PRICE_SELECTOR).text
+            except:
+                price_text = None
+            
+            try:
+                link = container.find_element(By.XPATH, LINK_SELECTOR).get_attribute('href')
+            except:
+                link = None
+            
+            cards.append({'title': title, 'price_text': price_text, 'link': link})
+        return cards
     
     def get_lowest_price_product(self):
         """Returns the product with the lowest price"""
@@ -145,13 +369,82 @@ class FlipkartProductSearch:
         return sorted_products[0]
 
 
+# CSS equivalents of the review XPaths used by FlipkartReviewScraper
+REVIEW_TEXT_SELECTORS = ['div.t-ZTKy', 'div._6K-7Co']
+
+# Limits for the last-resort text scan when no review selector matches
+TEXT_FALLBACK_MIN_LENGTH = 30
+TEXT_FALLBACK_MAX_NODES = int(os.environ.get("SCRAPER_TEXT_FALLBACK_MAX_NODES", "5000"))
+TEXT_FALLBACK_MAX_TEXTS = 50
+TEXT_FALLBACK_BUDGET_MS = int(os.environ.get("SCRAPER_TEXT_FALLBACK_BUDGET_MS", "1500"))
+
+# Same rule as //div[string-length(text()) > N], evaluated inside the page in one
+# call: walks at most maxNodes divs, stops after maxTexts texts or budgetMs, and
+# drops repeated texts with a Set
+TEXT_FALLBACK_SCRIPT = """
+const [minLength, maxNodes, maxTexts, budgetMs] = arguments;
+const deadline = performance.now() + budgetMs;
+const walker = document.createTreeWalker(document.body || document.documentElement, NodeFilter.SHOW_ELEMENT, {
+    acceptNode: node => node.tagName === 'DIV' ? NodeFilter.FILTER_ACCEPT : NodeFilter.FILTER_SKIP
+});
+const seen = new Set();
+const texts = [];
+let visited = 0;
+while (walker.nextNode()) {
+    if (++visited > maxNodes || texts.length >= maxTexts || performance.now() > deadline) break;
+    const node = walker.currentNode;
+    let first = node.firstChild;
+    while (first && first.nodeType !== Node.TEXT_NODE) first = first.nextSibling;
+    if (!first || first.nodeValue.length <= minLength) continue;
+    const text = node.innerText.trim();
+    if (text.length > minLength && !seen.has(text)) {
+        seen.add(text);
+        texts.push(text);
+    }
+}
+return texts;
+"""
+
+def parse_reviews_html(html):
+    """Review texts in page HTML; what FlipkartReviewScraper.extract_reviews reads from the DOM"""
+    soup = BeautifulSoup(html, 'lxml')
+    for selector in REVIEW_TEXT_SELECTORS:
+        elements = soup.select(selector)
+        if elements:
+            reviews = [element.get_text(" ", strip=True) for element in elements]
+            return [review for review in reviews if len(review) > 10]
+    return []
+
+def dom_review_records(titles, texts):
+    """Review records from the titles and texts read off one page's DOM.
+
+    With one title per text they are paired into whole reviews; otherwise
+    the pairing is unknown and each is kept on its own.
+    """
+    if len(titles) == len(texts):
+        return [{'id': None, 'title': title, 'text': text, 'rating': None} for title, text in zip(titles, texts)]
+    return ([{'id': None, 'title': title, 'text': '', 'rating': None} for title in titles] +
+            [{'id': None, 'title': '', 'text': text, 'rating': None} for text in texts])
+
+def flipkart_review_job(product_url):
+    """Tab job that loads the newest reviews of a product and parses their texts"""
+    review_url = newest_reviews_url(product_url)
+    if not review_url:
+        raise ValueError(f"No review page for {product_url}")
+    return TabJob(review_url, "flipkart", "reviews", parse_reviews_html)
+
 class FlipkartReviewScraper:
-    def __init__(self, driver_path="chromedriver.exe"):
+    def __init__(self, driver_path="chromedriver.exe", profile=DEFAULT_PROFILE):
         self.driver_path = driver_path
-        self.setup_driver()
+        self.profile = profile
+        self.pool = get_pool(("flipkart-reviews", driver_path, profile),
+                             lambda: launch_with_profile(f"flipkart-reviews-{profile}", self.create_driver))
+        # A browser is borrowed only for the length of each scrape
+        self._pooled = None
+        self.driver = None
         
-    def setup_driver(self):
-        """Setup Chrome driver with anti-detection measures"""
+    def create_driver(self, user_data_dir=None):
+        """Create a Chrome driver with anti-detection measures"""
         chrome_options = Options()
         chrome_options.add_argument('--disable-blink-features=AutomationControlled')
         chrome_options.add_argument('--disable-infobars')
@@ -162,23 +455,46 @@ class FlipkartReviewScraper:
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_experimental_option('useAutomationExtension', False)
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        apply_profile_options(chrome_options, self.profile)
+        # Review pages load through background JSON requests that can be read directly
+        enable_capture_options(chrome_options)
+        if user_data_dir:
+            chrome_options.add_argument(f'--user-data-dir={user_data_dir}')
+        
+        service = Service(executable_path=resolve_driver_path(self.driver_path))
+        driver = webdriver.Chrome(service=service, options=chrome_options)
         
+        # Additional anti-detection measures
+        driver.execute_cdp_cmd('Network.setUserAgentOverride', {
+            "userAgent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        })
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        return apply_profile(driver, self.profile)
+    
+    def setup_driver(self):
+        """Borrow a Chrome driver from the shared pool"""
         try:
-            service = Service(executable_path=self.driver_path)
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            
-            # Additional anti-detection measures
-            self.driver.execute_cdp_cmd('Network.setUserAgentOverride', {
-                "userAgent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            })
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            
-            self.wait = WebDriverWait(self.driver, 10)
+            self._pooled = self.pool.checkout()
+            self.driver = self._pooled.driver
+            # A pooled driver still holds log entries from its previous user
+            self.capture = NetworkCapture(self.driver)
+            self.capture.clear()
+            self._records_url = None
+            self._records = []
+            self._seen_reviews = set()
             logger.info("WebDriver set up successfully")
         except Exception as e:
             logger.error(f"Failed to set up WebDriver: {e}")
             raise
     
+    def release_driver(self, pages=1):
+        """Return the borrowed driver to the pool"""
+        if self._pooled:
+            self.pool.checkin(self._pooled, pages=pages)
+            self._pooled = None
+            # The browser may now belong to another borrower or be quit by the pool
+            self.driver = None
+    
     def handle_login(self):
         """Simple login handling - just close the popup if present"""
         logger.info("Handling login popup...")
@@ -192,7 +508,7 @@ class FlipkartReviewScraper:
                 if close_buttons:
                     close_buttons[0].click()
                     logger.info("Closed login popup")
-                    time.sleep(1)
+                    wait_for_staleness(self.driver, close_buttons[0], timeout=2)
             except Exception as e:
                 logger.info(f"No login popup or couldn't close: {e}")
                 
@@ -207,7 +523,7 @@ class FlipkartReviewScraper:
         logger.info(f"Navigating to product: {product_url}")
         try:
             self.driver.get(product_url)
-            time.sleep(3)
+            wait_for(self.driver, "flipkart", ("product", "reviews"))
             logger.info("Successfully loaded product page")
             return True
         except Exception as e:
@@ -227,9 +543,7 @@ class FlipkartReviewScraper:
             pass
         
         # Scroll down to make review section visible
-        for _ in range(3):
-            self.driver.execute_script("window.scrollBy(0, 500)")
-            time.sleep(1)
+        scroll_until_stable(self.driver, steps=3)
         
         # Try various review section selectors
         review_selectors = [
@@ -251,7 +565,7 @@ class FlipkartReviewScraper:
                             logger.info(f"Found reviews section: {element.text}")
                             element.click()
                             logger.info("Clicked on reviews section")
-                            time.sleep(3)
+                            wait_for(self.driver, "flipkart", "reviews")
                             return True
                     except:
                         continue
@@ -271,7 +585,7 @@ class FlipkartReviewScraper:
                             logger.info(f"Found review count: {elem.text}")
                             elem.click()
                             logger.info("Clicked on review count")
-                            time.sleep(3)
+                            wait_for(self.driver, "flipkart", "reviews")
                             return True
                     except:
                         continue
@@ -286,13 +600,42 @@ class FlipkartReviewScraper:
         logger.warning("Could not navigate to reviews section. Will try to extract reviews from current page.")
         return False
     
+    def page_review_records(self):
+        """Reviews on the current page read from captured API responses or the page state.
+        
+        Computed once per URL; reviews already returned for an earlier page are left
+        out so a stale page state never stands in for the DOM of a later page.
+        """
+        url = self.driver.current_url
+        if url == self._records_url:
+            return self._records
+        
+        records = []
+        for payload in self.capture.payloads("flipkart", "reviews", new_only=True):
+            records.extend(iter_state_reviews(payload))
+        source = "captured responses"
+        if not records:
+            records = list(iter_state_reviews(state_from_browser(self.driver)))
+            source = "page state"
+        
+        records = [r for r in records if r['text'] not in self._seen_reviews]
+        self._seen_reviews.update(r['text'] for r in records)
+        if records:
+            logger.info(f"Found {len(records)} reviews in {source}")
+        self._records_url, self._records = url, records
+        return records
+    
     def extract_review_titles(self):
         """Extract review titles from the current page"""
         review_titles = []
         
+        records = self.page_review_records()
+        if records:
+            return [r['title'] for r in records if len(r['title']) > 3]
+        
         # Scroll to load all content
         self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-        time.sleep(2)
+        wait_for(self.driver, "flipkart", "reviews", timeout=5)
         
         # Try different selectors for review titles
         title_selectors = [
@@ -303,76 +646,47 @@ class FlipkartReviewScraper:
             "//div[contains(@class, 't-ZTKy')]/div[1]"
         ]
         
-        for selector in title_selectors:
-            try:
-                title_elements = self.driver.find_elements(By.XPATH, selector)
-                if title_elements:
-                    logger.info(f"Found {len(title_elements)} review titles using selector: {selector}")
-                    for title_element in title_elements:
-                        title = title_element.text.strip()
-                        if title and len(title) > 3:  # Ensure it's a meaningful title
-                            review_titles.append(title)
-                    break
-            except Exception as e:
-                logger.debug(f"Error with selector {selector}: {e}")
+        selector, title_elements = first_match("flipkart", "review_title", title_selectors,
+                                               lambda xpath: self.driver.find_elements(By.XPATH, xpath),
+                                               reorder=False)
+        if selector:
+            logger.info(f"Found {len(title_elements)} review titles using selector: {selector}")
+            for title_element in title_elements:
+                title = title_element.text.strip()
+                if title and len(title) > 3:  # Ensure it's a meaningful title
+                    review_titles.append(title)
         
         return review_titles
     
     def extract_reviews(self):
         """Extract full reviews from the current page"""
-        reviews = []
+        # Review JSON needs no scrolling or waiting for the page to render it
+        records = self.page_review_records()
+        if records:
+            return [r['text'] for r in records if len(r['text']) > 10]
         
         # Scroll to ensure all reviews are loaded
-        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/3);")
-        time.sleep(1)
-        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight*2/3);")
-        time.sleep(1)
-        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
-        
-        # Try different review selectors
-        review_selectors = [
-            "//div[@class='t-ZTKy']",
-            "//div[@class='_6K-7Co']",
-            "//div[contains(@class, 't-ZTKy')]",
-            "//div[contains(@class, '_6K-7Co')]"
-        ]
+        scroll_until_stable(self.driver, steps=3)
+        wait_for(self.driver, "flipkart", "reviews", timeout=5)
         
-        review_elements = []
-        for selector in review_selectors:
-            try:
-                elements = self.driver.find_elements(By.XPATH, selector)
-                if elements:
-                    logger.info(f"Found {len(elements)} reviews using selector: {selector}")
-                    review_elements = elements
-                    break
-            except Exception as e:
-                logger.debug(f"Error with selector {selector}: {e}")
-        
-        # Extract text from the found elements
-        for element in review_elements:
-            try:
-                review_text = element.text.strip()
-                if review_text and len(review_text) > 10:
-                    reviews.append(review_text)
-            except Exception as e:
-                logger.debug(f"Error extracting review text: {e}")
+        # One page_source read parsed locally instead of a round-trip per review element
+        reviews = parse_reviews_html(self.driver.page_source)
+        if reviews:
+            logger.info(f"Found {len(reviews)} reviews in the page HTML")
         
         # If we found no reviews, take a more aggressive approach
         if not reviews:
             logger.warning("No reviews found with specific selectors. Trying general text elements...")
             try:
-                # Look for any elements with substantial text
-                text_elements = self.driver.find_elements(By.XPATH, 
-                    "//div[string-length(text()) > 30]")
-                
-                for element in text_elements:
-                    try:
-                        text = element.text.strip()
-                        if text and len(text) > 30 and text not in reviews:
-                            reviews.append(text)
-                    except:
-                        continue
+                # One bounded in-page scan instead of a round-trip per matching div
+                texts = self.driver.execute_script(
+                    TEXT_FALLBACK_SCRIPT, TEXT_FALLBACK_MIN_LENGTH, TEXT_FALLBACK_MAX_NODES,
+                    TEXT_FALLBACK_MAX_TEXTS, TEXT_FALLBACK_BUDGET_MS) or []
+                seen = set(reviews)
+                for text in texts:
+                    if text not in seen:
+                        seen.add(text)
+                        reviews.append(text)
             except Exception as e:
                 logger.error(f"Error finding text elements: {e}")
         
@@ -398,9 +712,9 @@ class FlipkartReviewScraper:
     def go_to_next_page(self):
         """Attempt to go to the next page of reviews"""
         try:
-            # Take screenshot of bottom of page
+            # Scroll to the bottom so the pagination controls render
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1)
+            wait_for(self.driver, "flipkart", "next_page", timeout=3)
             
             next_button_selectors = [
                 "//a[@class='_1LKTO3']",
@@ -415,9 +729,12 @@ class FlipkartReviewScraper:
                     try:
                         if button.is_displayed() and "Next" in button.text:
                             logger.info(f"Found Next button: {button.text}")
+                            current_url = self.driver.current_url
                             button.click()
                             logger.info("Clicked Next button")
-                            time.sleep(3)
+                            # Wait for the next page URL, then for its reviews to render
+                            wait_for_url_change(self.driver, current_url)
+                            wait_for(self.driver, "flipkart", "reviews")
                             return True
                     except:
                         continue
@@ -439,11 +756,10 @@ class FlipkartReviewScraper:
         neutral_count = 0
         
         logger.info("Performing sentiment analysis...")
-        for review in reviews:
-            sentiment = TextBlob(review).sentiment.polarity
-            if sentiment > 0.1:
+        for sentiment in polarities(reviews):
+            if sentiment > POSITIVE_THRESHOLD:
                 positive_count += 1
-            elif sentiment < -0.1:
+            elif sentiment < NEGATIVE_THRESHOLD:
                 negative_count += 1
             else:
                 neutral_count += 1
@@ -467,6 +783,25 @@ class FlipkartReviewScraper:
         """Extract basic product information like name and price"""
         product_info = {}
         
+        # One decode of the page state replaces the selector probes below
+        state_info = state_product_info(state_from_browser(self.driver))
+        if state_info:
+            product_info = dict(state_info, price=format_price(state_info['price']))
+            logger.info(f"Found product info in page state: {product_info['name']}")
+            return product_info
+        
+        # Next best: schema.org JSON-LD / microdata, read in one pass
+        structured = product_from_driver(self.driver)
+        if structured and structured.name and structured.price is not None:
+            product_info = {
+                'name': structured.name,
+                'price': format_price(structured.price),
+                'rating': structured.rating,
+                'rating_count': structured.rating_count,
+            }
+            logger.info(f"Found product info in structured data: {product_info['name']}")
+            return product_info
+        
         try:
             # Try to extract product name
             name_selectors = [
@@ -506,6 +841,10 @@ class FlipkartReviewScraper:
         
         return product_info
     
+    async def scrape_reviews_async(self, product_url, pages_to_scrape=3):
+        """Async version of scrape_reviews, bounded per domain"""
+        return await run_blocking("flipkart.com", self._scrape_reviews, product_url, pages_to_scrape)
+    
     def scrape_reviews(self, product_url, pages_to_scrape=3):
         """
         Extract reviews from a Flipkart product page and perform sentiment analysis
@@ -514,25 +853,50 @@ class FlipkartReviewScraper:
             product_url: URL of the Flipkart product page
             pages_to_scrape: Number of review pages to scrape
         """
+        return run(self.scrape_reviews_async(product_url, pages_to_scrape))
+    
+    def _scrape_reviews(self, product_url, pages_to_scrape=3):
         all_reviews = []
         all_titles = []
         
+        # Borrowed here and returned in the finally below
+        self.setup_driver()
+        
         try:
-            # Handle login (close popup)
-            if not self.handle_login():
-                logger.error("Login handling failed")
-                return [], [], "Error: Login handling failed", {}
-            
-            # Navigate to the product page
-            if not self.navigate_to_product(product_url):
-                logger.error("Failed to navigate to the product page")
-                return [], [], "Error: Failed to load product page", {}
+            product_id = flipkart_product_id(product_url)
+            known = known_review_ids("flipkart", product_id)
+            review_url = newest_reviews_url(product_url) if known else None
+            new_reviews = []
             
-            # Extract product info first
-            product_info = self.extract_product_info()
-            
-            # Navigate to reviews page
-            self.navigate_to_reviews()
+            if review_url:
+                # A product seen before: straight to its newest reviews, a single page load
+                logger.info(f"Refreshing stored reviews from {review_url}")
+                self.driver.get(review_url)
+                wait_for(self.driver, "flipkart", "reviews")
+                product_info = self.extract_product_info() or stored_product_info("flipkart", product_id) or {}
+            else:
+                # Handle login (close popup)
+                if not self.handle_login():
+                    logger.error("Login handling failed")
+                    return [], [], "Error: Login handling failed", {}
+                
+                # Navigate to the product page
+                if not self.navigate_to_product(product_url):
+                    logger.error("Failed to navigate to the product page")
+                    return [], [], "Error: Failed to load product page", {}
+                
+                # Extract product info first
+                product_info = self.extract_product_info()
+                
+                # Navigate to reviews page
+                self.navigate_to_reviews()
+                
+                # Newest first, so the next refresh can stop at the reviews stored now
+                if REVIEW_STORE and product_id and "/product-reviews/" in self.driver.current_url:
+                    sorted_url = newest_reviews_url(self.driver.current_url)
+                    if sorted_url != self.driver.current_url:
+                        self.driver.get(sorted_url)
+                        wait_for(self.driver, "flipkart", "reviews")
             
             # Main review extraction loop
             for page in range(1, pages_to_scrape + 1):
@@ -554,12 +918,29 @@ class FlipkartReviewScraper:
                 if not page_reviews and not page_titles:
                     logger.warning(f"No content found on page {page}")
                 
+                # Reviews read from the DOM have no ids, so they never stop the paging early
+                page_records = self.page_review_records() or dom_review_records(page_titles, page_reviews)
+                page_new, reached_known = split_new(page_records, known)
+                new_reviews.extend(page_new)
+                if reached_known:
+                    logger.info("Reached reviews seen on an earlier run. Stopping.")
+                    break
+                
                 # Go to next page if available
                 if page < pages_to_scrape:
                     if not self.go_to_next_page():
                         logger.info("No more pages available. Stopping.")
                         break
             
+            if product_id and REVIEW_STORE:
+                add_reviews("flipkart", product_id, new_reviews, info=product_info or None)
+                # The newest reviews, as many as a full scrape of pages_to_scrape would give.
+                # Titles and texts are counted apart: unpaired DOM reviews store them as separate rows.
+                stored = stored_reviews("flipkart", product_id)
+                limit = pages_to_scrape * 10
+                all_reviews = [r['text'] for r in stored if r['text']][:limit]
+                all_titles = [r['title'] for r in stored if r['title']][:limit]
+            
             # Remove duplicates
             all_reviews = list(set(all_reviews))
             all_titles = list(set(all_titles))
@@ -576,7 +957,7 @@ class FlipkartReviewScraper:
                         logger.info(f"Trying direct review URL: {direct_review_url}")
                         
                         self.driver.get(direct_review_url)
-                        time.sleep(3)
+                        wait_for(self.driver, "flipkart", "reviews")
                         
                         # Try again to extract reviews from this page
                         direct_titles = self.extract_review_titles()
@@ -609,9 +990,9 @@ class FlipkartReviewScraper:
             return [], [], f"Error: {e}", {}
         
         finally:
-            # Clean up resources
-            self.driver.quit()
-            logger.info("Browser closed successfully")
+            # Hand the browser back to the pool for the next job
+            self.release_driver(pages=pages_to_scrape)
+            logger.info("Browser returned to pool")
 
 
 def main():
@@ -625,7 +1006,7 @@ def main():
     if not driver_path:
         driver_path = "chromedriver.exe"
     
-    if not os.path.isfile(driver_path):
+    if not os.path.isfile(resolve_driver_path(driver_path)):
         print(f"⚠️ Warning: ChromeDriver not found at '{driver_path}'. The script may fail.")
     
     # Get product search term
@@ -0,0 +1,173 @@
+import json
+import logging
+
+from prices import parse_price
+
+logger = logging.getLogger(__name__)
+
+FLIPKART_HOME = "https://www.flipkart.com"
+
+# Script assignments that carry the server-rendered page state
+STATE_MARKERS = ("window.__INITIAL_STATE__", "window.__PRELOADED_STATE__")
+
+# One round-trip that hands the state back as a string for json.loads
+STATE_SCRIPT = "return JSON.stringify(window.__INITIAL_STATE__ || window.__PRELOADED_STATE__ || null);"
+
+# Fields only a review node has
+REVIEW_KEYS = ("reviewId", "reviewTitle", "author", "authorName")
+
+_decoder = json.JSONDecoder()
+
+
+def extract_state(html):
+    """Decode the embedded state object from page HTML, or None if there is none"""
+    for marker in STATE_MARKERS:
+        position = html.find(marker)
+        if position < 0:
+            continue
+        start = html.find("{", position + len(marker))
+        if start < 0:
+            continue
+        try:
+            # raw_decode stops at the end of the object, ignoring the rest of the script
+            state, _ = _decoder.raw_decode(html, start)
+            return state
+        except ValueError as e:
+            logger.info(f"Could not decode {marker}: {e}")
+    return None
+
+
+def state_from_browser(driver):
+    """Read the state straight from a loaded page with a single execute_script"""
+    try:
+        raw = driver.execute_script(STATE_SCRIPT)
+    except Exception as e:
+        logger.info(f"Could not read page state: {e}")
+        return None
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
+
+
+def _value(node, *path):
+    for key in path:
+        if not isinstance(node, dict):
+            return None
+        node = node.get(key)
+    return node
+
+
+def _product_record(node):
+    """Product fields from a productInfo-style node, or None if it is not one"""
+    title = _value(node, "titles", "title")
+    pricing = node.get("pricing")
+    if not title or not isinstance(pricing, dict):
+        return None
+
+    price = parse_price(_value(pricing, "finalPrice", "value") or _value(pricing, "finalPrice", "decimalValue"))
+    if price is None:
+        return None
+    mrp = parse_price(_value(pricing, "mrp", "value"))
+    if mrp is not None and mrp > price:
+        price.mrp = float(mrp)
+
+    link = node.get("baseUrl") or node.get("smartUrl") or ""
+    if link and not link.startswith("http"):
+        link = FLIPKART_HOME + link
+
+    return {
+        "id": node.get("id") or node.get("productId"),
+        "title": title,
+        "price": price,
+        "link": link or None,
+        "rating": _value(node, "rating", "average"),
+        "rating_count": _value(node, "rating", "count"),
+    }
+
+
+def iter_state_products(state):
+    """Yield every product record in the state, in document order, without duplicates"""
+    seen = set()
+    stack = [state]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            record = _product_record(node)
+            if record:
+                key = record["id"] or record["link"] or record["title"]
+                if key not in seen:
+                    seen.add(key)
+                    yield record
+                continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+
+def state_products(state, limit=None):
+    """Search-result products from a decoded state, keeping only ones with a link"""
+    products = []
+    if not state:
+        return products
+    for record in iter_state_products(state):
+        if record["link"]:
+            products.append(record)
+            if limit and len(products) >= limit:
+                break
+    return products
+
+
+def state_product_info(state):
+    """Main product of a product page (name, price, rating), or None"""
+    context = _value(state, "pageDataV4", "page", "pageData", "pageContext")
+    if not isinstance(context, dict):
+        return None
+    record = _product_record(context)
+    if not record:
+        return None
+    return {
+        "name": record["title"],
+        "price": record["price"],
+        "rating": record["rating"],
+        "rating_count": record["rating_count"],
+    }
+
+
+def _review_record(node):
+    """Review fields from a review value node, or None if it is not one"""
+    text = node.get("text")
+    if not isinstance(text, str) or not text.strip():
+        return None
+    # An id and a rating are not enough: product and seller nodes carry text, an
+    # id and a rating too, so ask for a review type or a review-only field
+    kind = str(node.get("@type") or node.get("type") or "")
+    if "Review" not in kind and not any(node.get(key) for key in REVIEW_KEYS):
+        return None
+    return {
+        "id": node.get("reviewId") or node.get("id"),
+        "title": (node.get("title") or "").strip(),
+        "text": text.strip(),
+        "rating": node.get("rating"),
+    }
+
+
+def iter_state_reviews(state):
+    """Yield every review in a page state or API payload, without duplicates"""
+    seen = set()
+    stack = [state]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            record = _review_record(node)
+            if record:
+                # Same review text in two widgets of one payload counts once
+                if record["text"] not in seen:
+                    seen.add(record["text"])
+                    yield record
+                continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
@@ -0,0 +1,208 @@
+"""Compressed archive of every fetched page, and a replay mode that serves from it.
+
+    python html_archive.py list [url-substring]
+    python html_archive.py export <dir> [--latest]   # <dir>/<kind>/*.html for benchmarks/bench_parsers.py
+"""
+import argparse
+import gzip
+import hashlib
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = os.environ.get(
+    "SCRAPER_ARCHIVE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "pricescraper", "archive"),
+)
+# Set SCRAPER_ARCHIVE=0 to stop saving fetched pages
+ARCHIVE_PAGES = os.environ.get("SCRAPER_ARCHIVE", "1") != "0"
+# "live" fetches pages as usual; "replay" serves them from the archive with no network or browser
+FETCH_MODE = os.environ.get("SCRAPER_FETCH_MODE", "live")
+REPLAY = FETCH_MODE == "replay"
+
+# zstd when the zstandard package is installed, gzip otherwise; both are read back
+try:
+    import zstandard
+    COMPRESSION = "zst"
+    _compressor = zstandard.ZstdCompressor(level=10)
+except ImportError:
+    zstandard = None
+    COMPRESSION = "gz"
+    _compressor = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_url ON pages (url, fetched_at);
+"""
+
+_write_lock = threading.Lock()
+
+
+class ReplayMiss(LookupError):
+    """Replay mode was asked for a page that was never archived"""
+
+
+def page_kind(url):
+    """Corpus kind of a page, matching the benchmark fixture layout"""
+    parsed = urlparse(url)
+    site = "amazon" if "amazon." in parsed.netloc else "flipkart" if "flipkart." in parsed.netloc else "other"
+    if "product-reviews" in parsed.path or "/reviews" in parsed.path:
+        return f"{site}_reviews"
+    if parsed.path in ("/s", "/search") or parsed.path.startswith("/s/"):
+        return f"{site}_search"
+    return f"{site}_page"
+
+
+def _blob_path(digest, compression):
+    return os.path.join(ARCHIVE_DIR, "objects", digest[:2], f"{digest}.html.{compression}")
+
+
+def _connect():
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    connection = sqlite3.connect(os.path.join(ARCHIVE_DIR, "index.sqlite3"), timeout=10)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _compress(data):
+    if _compressor is not None:
+        return _compressor.compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _read_blob(digest):
+    for compression in ("zst", "gz"):
+        path = _blob_path(digest, compression)
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        if compression == "gz":
+            return gzip.decompress(data).decode("utf-8")
+        if zstandard is None:
+            raise RuntimeError(f"{path} needs the zstandard package to read")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    return None
+
+
+def archive_page(url, html, kind=None):
+    """Store a fetched page; identical content is kept once. Returns its digest."""
+    if not ARCHIVE_PAGES or REPLAY or not html:
+        return None
+    data = html.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    try:
+        if not (os.path.exists(_blob_path(digest, "zst")) or os.path.exists(_blob_path(digest, "gz"))):
+            path = _blob_path(digest, COMPRESSION)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so a reader never sees half a blob
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(_compress(data))
+            os.replace(temp_path, path)
+        with _write_lock:
+            connection = _connect()
+            try:
+                with connection:
+                    connection.execute("INSERT INTO pages VALUES (?, ?, ?, ?)",
+                                       (url, digest, kind or page_kind(url), time.time()))
+            finally:
+                connection.close()
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Could not archive {url}: {e}")
+        return None
+    return digest
+
+
+def latest_html(url):
+    """Most recently archived HTML for a URL, or None"""
+    connection = _connect()
+    try:
+        row = connection.execute(
+            "SELECT digest FROM pages WHERE url = ? ORDER BY fetched_at DESC LIMIT 1", (url,)).fetchone()
+    finally:
+        connection.close()
+    return _read_blob(row[0]) if row else None
+
+
+def replay_html(url):
+    """Archived HTML for a URL in replay mode; raises ReplayMiss if there is none"""
+    html = latest_html(url)
+    if html is None:
+        raise ReplayMiss(f"No archived page for {url}")
+    logger.info(f"Replaying archived page for {url}")
+    return html
+
+
+def iter_pages(kind=None, url_contains=None, latest_only=False):
+    """Yield (url, kind, fetched_at, html) for archived pages, oldest first"""
+    query = "SELECT url, kind, fetched_at, digest FROM pages"
+    clauses, params = [], []
+    if kind:
+        clauses.append("kind = ?")
+        params.append(kind)
+    if url_contains:
+        clauses.append("instr(url, ?) > 0")
+        params.append(url_contains)
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    if latest_only:
+        query = f"SELECT url, kind, MAX(fetched_at), digest FROM ({query}) GROUP BY url"
+    query += " ORDER BY 3"
+
+    connection = _connect()
+    try:
+        rows = connection.execute(query, params).fetchall()
+    finally:
+        connection.close()
+    for url, page_kind_, fetched_at, digest in rows:
+        html = _read_blob(digest)
+        if html is not None:
+            yield url, page_kind_, fetched_at, html
+
+
+def export_corpus(directory, latest_only=False):
+    """Write archived pages as <directory>/<kind>/*.html; returns how many were written"""
+    written = 0
+    for url, kind, fetched_at, html in iter_pages(latest_only=latest_only):
+        kind_dir = os.path.join(directory, kind)
+        os.makedirs(kind_dir, exist_ok=True)
+        digest = hashlib.sha256(html.encode("utf-8")).hexdigest()
+        with open(os.path.join(kind_dir, f"{int(fetched_at)}-{digest[:12]}.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+        written += 1
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    listing = commands.add_parser("list", help="show archived pages")
+    listing.add_argument("url_contains", nargs="?")
+    export = commands.add_parser("export", help="write pages out as a benchmark fixture corpus")
+    export.add_argument("directory")
+    export.add_argument("--latest", action="store_true", help="only the newest copy of each URL")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for url, kind, fetched_at, html in iter_pages(url_contains=args.url_contains):
+            stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(fetched_at))
+            print(f"{stamp}  {kind:18} {len(html) // 1024:6} KB  {url}")
+    else:
+        count = export_corpus(args.directory, latest_only=args.latest)
+        print(f"Wrote {count} pages to {args.directory}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
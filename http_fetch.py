@@ -0,0 +1,87 @@
+import logging
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from html_archive import REPLAY, archive_page, latest_html
+
+logger = logging.getLogger(__name__)
+
+# Set SCRAPER_HTTP_FIRST=0 to always go straight to the browser
+HTTP_FIRST = os.environ.get("SCRAPER_HTTP_FIRST", "1") != "0"
+HTTP_TIMEOUT = float(os.environ.get("SCRAPER_HTTP_TIMEOUT", "10"))
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+
+# requests only decodes brotli when a brotli package is installed
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# Markers of bot-check pages that come back with a 200 status
+BLOCK_MARKERS = (
+    "/errors/validateCaptcha",
+    "api-services-support@amazon.com",
+    "Enter the characters you see below",
+    "Are you a human?",
+)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Shared keep-alive session with connection pooling and compression"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(500, 502, 504),
+                          allowed_methods=("GET", "HEAD"))
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({
+                "User-Agent": USER_AGENT,
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                "Accept-Language": "en-IN,en;q=0.9",
+                "Accept-Encoding": ACCEPT_ENCODING,
+                "Connection": "keep-alive",
+                "Upgrade-Insecure-Requests": "1",
+            })
+            _session = session
+        return _session
+
+
+def fetch_html(url, timeout=HTTP_TIMEOUT):
+    """Fetch a page over plain HTTP.
+
+    Returns the HTML, or None when the request fails or lands on a bot check,
+    so the caller can fall back to a real browser.
+    """
+    if REPLAY:
+        return latest_html(url)
+    if not HTTP_FIRST:
+        return None
+    try:
+        response = get_session().get(url, timeout=timeout)
+    except requests.RequestException as e:
+        logger.info(f"HTTP fetch failed for {url}: {e}")
+        return None
+
+    if response.status_code != 200:
+        logger.info(f"HTTP fetch for {url} returned status {response.status_code}")
+        return None
+
+    html = response.text
+    if any(marker in html for marker in BLOCK_MARKERS):
+        logger.info(f"HTTP fetch for {url} hit a bot check")
+        return None
+
+    logger.info(f"HTTP fetch for {url} took {response.elapsed.total_seconds():.2f}s ({len(html)} chars)")
+    archive_page(url, html)
+    return html
@@ -0,0 +1,163 @@
+import base64
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# Set SCRAPER_NETWORK_CAPTURE=0 to launch browsers without performance logging
+NETWORK_CAPTURE = os.environ.get("SCRAPER_NETWORK_CAPTURE", "1") != "0"
+
+# Background requests whose JSON the pages render, by site and kind: review
+# pagination, and the "load more" / in-page updates of search results
+ENDPOINTS = {
+    "flipkart": {
+        "reviews": [re.compile(r"/api/\d+/page/fetch"), re.compile(r"/api/\d+/product/reviews")],
+        "search": [re.compile(r"/api/\d+/page/fetch"), re.compile(r"/api/\d+/search")],
+    },
+    "amazon": {
+        "reviews": [re.compile(r"/hz/reviews-render/ajax/"), re.compile(r"/portal/customer-reviews/ajax/")],
+        "search": [re.compile(r"/s/query\b")],
+    },
+}
+
+# Don't pull bodies larger than this over the DevTools connection
+MAX_BODY_BYTES = 5 * 1024 * 1024
+
+
+def enable_capture_options(chrome_options):
+    """Turn on the DevTools network log for a ChromeOptions object"""
+    if not NETWORK_CAPTURE:
+        return chrome_options
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    chrome_options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    return chrome_options
+
+
+def decode_body(body):
+    """JSON from a response body; Amazon's ajax endpoints send '&&&'-separated chunks"""
+    try:
+        return json.loads(body)
+    except ValueError:
+        pass
+    chunks = []
+    for part in body.split("&&&"):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            chunks.append(json.loads(part))
+        except ValueError:
+            return None
+    return chunks or None
+
+
+def html_fragments(payload):
+    """HTML snippets inside a decoded payload; Amazon's ajax chunks carry rendered markup as "html" """
+    fragments = []
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if isinstance(node.get("html"), str):
+                fragments.append(node["html"])
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return fragments
+
+
+class CapturedResponse:
+    def __init__(self, url, status, data):
+        self.url = url
+        self.status = status
+        self.data = data
+
+    def __repr__(self):
+        return f"CapturedResponse({self.url!r}, status={self.status})"
+
+
+class NetworkCapture:
+    """Collect JSON response bodies for known endpoints from a driver's performance log"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.available = NETWORK_CAPTURE
+        # requestId -> (url, status) for responses whose body has not arrived yet
+        self._pending = {}
+        self.responses = []
+
+    def _matches(self, url):
+        return any(pattern.search(url)
+                   for kinds in ENDPOINTS.values() for patterns in kinds.values() for pattern in patterns)
+
+    def _body(self, request_id):
+        result = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        body = result.get("body", "")
+        if result.get("base64Encoded"):
+            body = base64.b64decode(body).decode("utf-8", "replace")
+        return body
+
+    def drain(self):
+        """Read new log entries and fetch the bodies of finished endpoint responses"""
+        if not self.available:
+            return []
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            # The driver was launched without performance logging
+            logger.info(f"Network capture unavailable: {e}")
+            self.available = False
+            return []
+
+        captured = []
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            method = message.get("method")
+            params = message.get("params", {})
+
+            if method == "Network.responseReceived":
+                response = params.get("response", {})
+                url = response.get("url", "")
+                # Matched by URL, not mime type: some endpoints answer JSON as text/plain or text/html
+                if self._matches(url):
+                    self._pending[params.get("requestId")] = (url, response.get("status"))
+
+            elif method == "Network.loadingFinished" and params.get("requestId") in self._pending:
+                url, status = self._pending.pop(params["requestId"])
+                if params.get("encodedDataLength", 0) > MAX_BODY_BYTES:
+                    continue
+                try:
+                    data = decode_body(self._body(params["requestId"]))
+                except Exception as e:
+                    logger.debug(f"No body for {url}: {e}")
+                    continue
+                if data is not None:
+                    captured.append(CapturedResponse(url, status, data))
+
+            elif method == "Network.loadingFailed":
+                self._pending.pop(params.get("requestId"), None)
+
+        self.responses.extend(captured)
+        return captured
+
+    def clear(self):
+        """Forget everything captured so far, including log entries not yet read"""
+        if self.available:
+            try:
+                self.driver.get_log("performance")
+            except Exception:
+                self.available = False
+        self._pending.clear()
+        self.responses = []
+
+    def payloads(self, site, kind, new_only=False):
+        """Decoded bodies for one site's endpoint kind; new_only skips those already returned"""
+        fresh = self.drain()
+        patterns = ENDPOINTS.get(site, {}).get(kind, [])
+        return [response.data for response in (fresh if new_only else self.responses)
+                if any(pattern.search(response.url) for pattern in patterns)]
@@ -7,11 +7,14 @@ import os
 import sys
 import logging
 import random
-from textblob import TextBlob
 
 # Import functions from your existing scripts
-from amaz import setup_chrome_driver, find_lowest_price_product, AmazonReviewScraper
+from amaz import setup_chrome_driver, stream_amazon_products, AmazonReviewScraper, get_browser_pool
 from flipAPI import FlipkartProductSearch, FlipkartReviewScraper
+from driver_resolver import resolve_driver_path
+from prices import format_price
+from product_stream import lowest_priced
+from sentiment_cache import NEGATIVE_THRESHOLD, POSITIVE_THRESHOLD, polarities, sentiment_label
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -28,11 +31,14 @@ st.set_page_config(
 # Importing authentication components from app.txt
 from hashlib import sha256
 import sqlite3
+import threading
 import time
 
+# How long searches and review analyses are reused for the same query and settings
+APP_CACHE_TTL = int(os.environ.get("SCRAPER_APP_CACHE_TTL", "900"))
+
 # User Authentication Database Setup
-def create_userdb():
-    conn = sqlite3.connect("userdb.db")
+def create_userdb(conn):
     cursor = conn.cursor()
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS users (
@@ -41,34 +47,97 @@ def create_userdb():
         )
     """)
     conn.commit()
-    conn.close()
+
+
+@st.cache_resource
+def get_userdb():
+    # Opened once per server; sessions run on separate threads, so use it under the lock
+    conn = sqlite3.connect("userdb.db", check_same_thread=False)
+    create_userdb(conn)
+    return conn, threading.Lock()
 
 
 def add_user(username, password):
-    conn = sqlite3.connect("userdb.db")
-    cursor = conn.cursor()
-    try:
-        hashed_password = sha256(password.encode()).hexdigest()
-        cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, hashed_password))
-        conn.commit()
-        conn.close()
-        return True
-    except sqlite3.IntegrityError:
-        conn.close()
-        return False
+    conn, lock = get_userdb()
+    with lock:
+        cursor = conn.cursor()
+        try:
+            hashed_password = sha256(password.encode()).hexdigest()
+            cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, hashed_password))
+            conn.commit()
+            return True
+        except sqlite3.IntegrityError:
+            conn.rollback()
+            return False
 
 
 def authenticate_user(username, password):
-    conn = sqlite3.connect("userdb.db")
-    cursor = conn.cursor()
-    hashed_password = sha256(password.encode()).hexdigest()
-    cursor.execute("SELECT * FROM users WHERE username = ? AND password = ?", (username, hashed_password))
-    result = cursor.fetchone()
-    conn.close()
+    conn, lock = get_userdb()
+    with lock:
+        cursor = conn.cursor()
+        hashed_password = sha256(password.encode()).hexdigest()
+        cursor.execute("SELECT * FROM users WHERE username = ? AND password = ?", (username, hashed_password))
+        return cursor.fetchone()
+
+
+class NoResults(Exception):
+    """Raised inside cached calls so a failed or empty scrape is never cached"""
+    def __init__(self, result=None):
+        super().__init__("no results")
+        self.result = result
+
+
+@st.cache_resource
+def warm_browsers(driver_path):
+    """Match the driver and start pooled browsers once per server, not on every rerun"""
+    amazon_pool = get_browser_pool(driver_path)
+    flipkart_pool = FlipkartProductSearch(driver_path).pool
+    amazon_pool.warm()
+    flipkart_pool.warm()
+    return amazon_pool, flipkart_pool
+
+
+# Products are written out as they are parsed; on a cache hit Streamlit replays those lines
+@st.cache_data(ttl=APP_CACHE_TTL, show_spinner=False)
+def search_flipkart(search_term, driver_path, max_products):
+    products = lowest_priced(
+        FlipkartProductSearch(driver_path).iter_products(search_term),
+        k=max_products,
+        on_product=lambda product: st.write(f"{product['title'][:60]} - {product['price_text']}"),
+    )
+    if not products:
+        raise NoResults()
+    return products
+
+
+@st.cache_data(ttl=APP_CACHE_TTL, show_spinner=False)
+def search_amazon(search_term, driver_path, max_products):
+    products = lowest_priced(
+        stream_amazon_products(search_term, driver_path),
+        k=max_products,
+        on_product=lambda product: st.write(f"{product[0][:60]} - {format_price(product[1])}"),
+    )
+    if not products:
+        raise NoResults()
+    return products
+
+
+@st.cache_data(ttl=APP_CACHE_TTL, show_spinner=False)
+def flipkart_reviews(link, pages, driver_path):
+    """(reviews, titles, decision, product info) for a product; reruns reuse it"""
+    result = FlipkartReviewScraper(driver_path).scrape_reviews(link, pages_to_scrape=pages)
+    if not (result[0] or result[1]):
+        raise NoResults(result)
     return result
 
-# Create user database on startup
-create_userdb()
+
+@st.cache_data(ttl=APP_CACHE_TTL, show_spinner=False)
+def amazon_reviews(link, pages, driver_path):
+    """(titles, decision) for a product; reruns reuse it"""
+    result = AmazonReviewScraper(driver_path).scrape_review_titles(link, max_pages=pages)
+    if not result[0]:
+        raise NoResults(result)
+    return result
 
 # Login and Signup Integration
 if 'logged_in' not in st.session_state:
@@ -349,6 +418,11 @@ if 'driver_path' not in st.session_state:
 st.session_state.max_review_pages = max_review_pages
 st.session_state.driver_path = driver_path
 
+# Match a driver to the installed Chrome once, then start pooled browsers in the
+# background so the first comparison skips the cold launch
+if os.path.isfile(resolve_driver_path(driver_path)):
+    warm_browsers(driver_path)
+
 # Main search section
 st.markdown("<div class='comparison-header'>🔎 Search Products Across Platforms</div>", unsafe_allow_html=True)
 
@@ -364,16 +438,18 @@ if st.button("Compare Prices", key="compare_button") and search_term:
             st.write(f"Searching for: {search_term}")
             
             # Setup chrome driver path
-            if not os.path.isfile(driver_path):
+            if not os.path.isfile(resolve_driver_path(driver_path)):
                 st.warning(f"ChromeDriver not found at '{driver_path}'. The search may fail.")
             
             # Find products
             try:
-                product_searcher = FlipkartProductSearch(driver_path)
-                flipkart_products = product_searcher.search_products(search_term)
+                # Show each product as soon as it is parsed; keep them cheapest first
+                try:
+                    flipkart_products = search_flipkart(search_term, driver_path, max_products)
+                except NoResults:
+                    flipkart_products = []
                 
                 if flipkart_products:
-                    lowest_price_product = product_searcher.get_lowest_price_product()
                     st.session_state.flipkart_products = flipkart_products
                     status.update(label="Flipkart search complete!", state="complete")
                 else:
@@ -390,24 +466,13 @@ if st.button("Compare Prices", key="compare_button") and search_term:
             
             # Find products
             try:
-                # Modify the find_lowest_price_product function to return all products
-                lowest_price_product = find_lowest_price_product(search_term, driver_path)
+                # Products appear as soon as their cards are parsed; keep the cheapest ones
+                try:
+                    all_products = search_amazon(search_term, driver_path, max_products)
+                except NoResults:
+                    all_products = []
                 
-                if lowest_price_product:
-                    # In a real implementation, you would have all products
-                    # Here we'll simulate multiple products with varying prices
-                    base_price = lowest_price_product[1]
-                    title = lowest_price_product[0]
-                    link = lowest_price_product[2]
-                    
-                    # Create a list of simulated products with different prices
-                    all_products = [
-                        lowest_price_product,  # The actual lowest price product
-                        [f"{title} (Variant 1)", base_price * 1.1, link],
-                        [f"{title} (Variant 2)", base_price * 1.25, link],
-                        [f"{title} (Variant 3)", base_price * 1.5, link],
-                    ]
-                    
+                if all_products:
                     st.session_state.amazon_products = all_products
                     status.update(label="Amazon search complete!", state="complete")
                 else:
@@ -498,10 +563,8 @@ if st.session_state.flipkart_products is not None or st.session_state.amazon_pro
         flipkart_lowest = st.session_state.flipkart_products[0]
         amazon_lowest = st.session_state.amazon_products[0]
         
-        # Extract and clean prices for comparison
-        # Assuming Flipkart price format is like "₹12,345" or "₹12,345.00"
-        flipkart_price_text = flipkart_lowest['price_text']
-        flipkart_price = float(flipkart_price_text.replace('₹', '').replace(',', '').strip().split('.')[0])
+        # Both scrapers return parsed prices, so compare the numbers directly
+        flipkart_price = flipkart_lowest['price']
         amazon_price = amazon_lowest[1]
         
         # Compare prices
@@ -566,13 +629,16 @@ if st.session_state.analyze_reviews_clicked and st.session_state.flipkart_select
             
             # Initialize review scraper and analyze reviews
             try:
-                scraper = FlipkartReviewScraper(driver_path)
-                
                 st.write("Navigating to product page...")
-                all_reviews, all_titles, decision, product_info = scraper.scrape_reviews(
-                    st.session_state.flipkart_selected_product['link'], 
-                    pages_to_scrape=st.session_state.max_review_pages
-                )
+                # Cached, so slider changes and tab switches don't scrape the reviews again
+                try:
+                    all_reviews, all_titles, decision, product_info = flipkart_reviews(
+                        st.session_state.flipkart_selected_product['link'], 
+                        st.session_state.max_review_pages,
+                        driver_path,
+                    )
+                except NoResults as empty:
+                    all_reviews, all_titles, decision, product_info = empty.result
                 
                 status.update(label="Flipkart analysis complete!", state="complete")
             except Exception as e:
@@ -591,23 +657,20 @@ if st.session_state.analyze_reviews_clicked and st.session_state.flipkart_select
             negative_count = 0
             neutral_count = 0
             
-            for review in all_content:
-                sentiment = TextBlob(review).sentiment.polarity
-                sentiment_label = ""
+            # Scores come from the cache the analyzer just filled, so nothing is scored twice
+            for review, sentiment in zip(all_content, polarities(all_content)):
+                label = sentiment_label(sentiment)
                 
-                if sentiment > 0.1:
-                    sentiment_label = "Positive 👍"
+                if sentiment > POSITIVE_THRESHOLD:
                     positive_count += 1
-                elif sentiment < -0.1:
-                    sentiment_label = "Negative 👎"
+                elif sentiment < NEGATIVE_THRESHOLD:
                     negative_count += 1
                 else:
-                    sentiment_label = "Neutral 😐"
                     neutral_count += 1
                     
                 reviews_data.append({
                     "Review": review[:100] + "..." if len(review) > 100 else review,
-                    "Sentiment": sentiment_label,
+                    "Sentiment": label,
                     "Score": round(sentiment, 2)
                 })
             
@@ -685,13 +748,15 @@ if st.session_state.analyze_reviews_clicked and st.session_state.flipkart_select
             
             # Initialize review scraper and analyze reviews
             try:
-                scraper = AmazonReviewScraper(driver_path)
-                
                 st.write("Navigating to product page...")
-                review_titles, decision = scraper.scrape_review_titles(
-                    st.session_state.amazon_selected_product[2], 
-                    max_pages=st.session_state.max_review_pages
-                )
+                try:
+                    review_titles, decision = amazon_reviews(
+                        st.session_state.amazon_selected_product[2], 
+                        st.session_state.max_review_pages,
+                        driver_path,
+                    )
+                except NoResults as empty:
+                    review_titles, decision = empty.result
                 
                 status.update(label="Amazon analysis complete!", state="complete")
             except Exception as e:
@@ -707,23 +772,20 @@ if st.session_state.analyze_reviews_clicked and st.session_state.flipkart_select
             negative_count = 0
             neutral_count = 0
             
-            for review in review_titles:
-                sentiment = TextBlob(review).sentiment.polarity
-                sentiment_label = ""
+            # Scores come from the cache the analyzer just filled, so nothing is scored twice
+            for review, sentiment in zip(review_titles, polarities(review_titles)):
+                label = sentiment_label(sentiment)
                 
-                if sentiment > 0.1:
-                    sentiment_label = "Positive 👍"
+                if sentiment > POSITIVE_THRESHOLD:
                     positive_count += 1
-                elif sentiment < -0.1:
-                    sentiment_label = "Negative 👎"
+                elif sentiment < NEGATIVE_THRESHOLD:
                     negative_count += 1
                 else:
-                    sentiment_label = "Neutral 😐"
                     neutral_count += 1
                     
                 reviews_data.append({
                     "Review": review,
-                    "Sentiment": sentiment_label,
+                    "Sentiment": label,
                     "Score": round(sentiment, 2)
                 })
             
@@ -802,8 +864,7 @@ if st.session_state.analyze_reviews_clicked and st.session_state.flipkart_select
         st.markdown("<div class='card'>", unsafe_allow_html=True)
         
         # Extract price data
-        flipkart_price_text = st.session_state.flipkart_selected_product['price_text']
-        flipkart_price = float(flipkart_price_text.replace('₹', '').replace(',', '').strip().split('.')[0])
+        flipkart_price = st.session_state.flipkart_selected_product['price']
         amazon_price = st.session_state.amazon_selected_product[1]
         
         # Analyze price difference
@@ -945,8 +1006,7 @@ if st.session_state.flipkart_selected_product and st.session_state.amazon_select
         dates = pd.date_range(end=pd.Timestamp.now(), periods=30)
         
         # Extract base prices
-        flipkart_price_text = st.session_state.flipkart_selected_product['price_text']
-        flipkart_current_price = float(flipkart_price_text.replace('₹', '').replace(',', '').strip().split('.')[0])
+        flipkart_current_price = st.session_state.flipkart_selected_product['price']
         amazon_current_price = st.session_state.amazon_selected_product[1]
         
         # Create price fluctuations (add some randomness)
@@ -0,0 +1,97 @@
+import re
+
+# Digits with western (1,234,567) or lakh-style (12,34,567) grouping, optional paise
+NUMBER = r"\d[\d,]*(?:\.\d+)?"
+CURRENCY_SIGN = r"(?:₹|Rs\.?|INR)\s*"
+CURRENCY = rf"(?:{CURRENCY_SIGN})?"
+
+NUMBER_PATTERN = re.compile(NUMBER)
+# The high end needs its own currency sign and must not be a percentage,
+# so "₹1,299 -35%" is a price with a discount, not a range
+RANGE_PATTERN = re.compile(rf"({NUMBER})\s*(?:-|–|to)\s*{CURRENCY_SIGN}({NUMBER})(?![\d,.]*\s*%)", re.IGNORECASE)
+MRP_PATTERN = re.compile(rf"(?:M\.?R\.?P\.?|List Price|Was)\s*:?\s*{CURRENCY}({NUMBER})", re.IGNORECASE)
+
+
+class Price(float):
+    """A parsed rupee price.
+
+    Behaves as the deal amount (a plain float) so it sorts, compares and formats
+    like the numbers the scrapers used before, and keeps the range upper bound,
+    the MRP and the original text alongside.
+    """
+    def __new__(cls, amount, high=None, mrp=None, raw=""):
+        price = super().__new__(cls, amount)
+        price.high = high
+        price.mrp = mrp
+        price.raw = raw
+        return price
+
+    @property
+    def amount(self):
+        return float(self)
+
+    @property
+    def is_range(self):
+        return self.high is not None
+
+    @property
+    def discount(self):
+        """Percentage off the MRP, or None when there is no (higher) MRP"""
+        if not self.mrp or self.mrp <= self:
+            return None
+        return (self.mrp - self) / self.mrp * 100
+
+    def text(self):
+        return format_price(self)
+
+    def __repr__(self):
+        return f"Price({float(self)!r}, high={self.high!r}, mrp={self.mrp!r})"
+
+
+def _to_number(text):
+    text = text.replace(",", "")
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def parse_price(text):
+    """Parse scraped price text into a Price, or None if it holds no price.
+
+    Handles "₹1,23,456", "Rs. 999.00", "1,299." (Amazon's whole-rupee span),
+    ranges like "₹499 - ₹799" (the low end is the amount) and an MRP/"List Price"
+    next to the deal price.
+    """
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return text if isinstance(text, Price) else Price(text, raw=str(text))
+    text = str(text).strip()
+    if not text:
+        return None
+
+    mrp = None
+    rest = text
+    mrp_match = MRP_PATTERN.search(text)
+    if mrp_match:
+        mrp = _to_number(mrp_match.group(1))
+        rest = text[:mrp_match.start()] + " " + text[mrp_match.end():]
+
+    range_match = RANGE_PATTERN.search(rest)
+    if range_match:
+        low, high = _to_number(range_match.group(1)), _to_number(range_match.group(2))
+        if low is not None and high is not None:
+            return Price(min(low, high), high=max(low, high), mrp=mrp, raw=text)
+
+    number = NUMBER_PATTERN.search(rest)
+    amount = _to_number(number.group()) if number else None
+    if amount is None:
+        # Only an MRP was shown
+        return Price(mrp, mrp=mrp, raw=text) if mrp is not None else None
+    return Price(amount, mrp=mrp, raw=text)
+
+
+def format_price(amount):
+    """Display form used across the UI, e.g. ₹1,299.00"""
+    return f"₹{float(amount):,.2f}"
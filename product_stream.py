@@ -0,0 +1,41 @@
+import heapq
+import itertools
+
+
+def price_of(product):
+    """Price of an Amazon [title, price, link] list or a Flipkart product dict"""
+    return product["price"] if isinstance(product, dict) else product[1]
+
+
+def lowest_priced(products, k=1, max_items=None, stop_at=None, on_product=None):
+    """The k cheapest products from a product stream, cheapest first.
+
+    Stops pulling from the stream (so the remaining cards are never parsed)
+    after max_items products, or as soon as k products at or below stop_at
+    have been seen. on_product is called with every product as it arrives.
+    """
+    if max_items is not None:
+        products = itertools.islice(products, max_items)
+
+    # Max-heap of the k cheapest seen so far; the counter keeps ties stable
+    heap = []
+    good_enough = 0
+    for order, product in enumerate(products):
+        if on_product:
+            on_product(product)
+        price = price_of(product)
+        if len(heap) < k:
+            heapq.heappush(heap, (-price, -order, product))
+        elif price < -heap[0][0]:
+            heapq.heapreplace(heap, (-price, -order, product))
+        if stop_at is not None and price <= stop_at:
+            good_enough += 1
+            if good_enough >= k:
+                break
+
+    return [product for _, _, product in sorted(heap, key=lambda entry: (-entry[0], -entry[1]))]
+
+
+def first_products(products, n):
+    """The first n products of a stream, without parsing any further cards"""
+    return list(itertools.islice(products, n))
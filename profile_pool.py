@@ -0,0 +1,202 @@
+import logging
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Set SCRAPER_PERSISTENT_PROFILES=0 to launch every browser with a throwaway profile
+PERSISTENT_PROFILES = os.environ.get("SCRAPER_PERSISTENT_PROFILES", "1") != "0"
+PROFILE_ROOT = os.environ.get(
+    "SCRAPER_PROFILE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "pricescraper", "profiles"),
+)
+# A profile above this size has its caches dropped when it is released
+MAX_PROFILE_MB = int(os.environ.get("SCRAPER_MAX_PROFILE_MB", "500"))
+MAX_SLOTS = int(os.environ.get("SCRAPER_MAX_PROFILE_SLOTS", "16"))
+# Locks whose owner cannot be checked (Windows) are taken over after this long
+STALE_LOCK_SECONDS = 6 * 60 * 60
+
+# Cache folders Chrome can rebuild; cookies and local storage are kept
+CACHE_DIRS = [
+    os.path.join("Default", "Cache"),
+    os.path.join("Default", "Code Cache"),
+    os.path.join("Default", "GPUCache"),
+    os.path.join("Default", "Service Worker", "CacheStorage"),
+    "ShaderCache",
+    "GrShaderCache",
+]
+
+_acquire_lock = threading.Lock()
+
+
+def _safe_name(name):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+
+
+def _pid_alive(pid):
+    if sys.platform.startswith("win"):
+        # os.kill would terminate the process here, so fall back to the lock age
+        return None
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _lock_is_stale(lock_path):
+    try:
+        with open(lock_path) as f:
+            text = f.read().strip()
+        if not text:
+            # Mid-write by another process, unless it has stayed empty for a long time
+            return time.time() - os.path.getmtime(lock_path) > STALE_LOCK_SECONDS
+        pid = int(text)
+        alive = _pid_alive(pid) if pid else False
+        if alive is None:
+            return time.time() - os.path.getmtime(lock_path) > STALE_LOCK_SECONDS
+        return not alive
+    except FileNotFoundError:
+        # Released between the failed create and this check; let the next attempt take it
+        return False
+    except (OSError, ValueError):
+        return True
+
+
+def _try_lock(lock_path):
+    """Create the lock file with our pid already in it, or return False if it exists"""
+    # Written aside and hard-linked into place, so no reader ever sees the lock without a pid
+    temp_path = f"{lock_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w") as f:
+        f.write(str(os.getpid()))
+    try:
+        os.link(temp_path, lock_path)
+        return True
+    except FileExistsError:
+        return False
+    except OSError:
+        # No hard links on this filesystem: create in place, which readers treat as live while empty
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+        return True
+    finally:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+def cleanup_profile(path, max_mb=MAX_PROFILE_MB):
+    """Trim a profile that has grown past max_mb, caches first, then the whole profile"""
+    limit = max_mb * 1024 * 1024
+    if directory_size(path) <= limit:
+        return
+
+    for cache_dir in CACHE_DIRS:
+        shutil.rmtree(os.path.join(path, cache_dir), ignore_errors=True)
+    size = directory_size(path)
+    if size <= limit:
+        logger.info(f"Dropped caches of browser profile {path}")
+        return
+
+    logger.info(f"Browser profile {path} still {size // (1024 * 1024)}MB after dropping caches, resetting it")
+    shutil.rmtree(path, ignore_errors=True)
+
+
+class ProfileLease:
+    """Exclusive use of one --user-data-dir until release() is called"""
+    def __init__(self, path, lock_path=None, temporary=False):
+        self.path = path
+        self.lock_path = lock_path
+        self.temporary = temporary
+        self.released = False
+
+    def release(self):
+        if self.released:
+            return
+        self.released = True
+        try:
+            if self.temporary:
+                shutil.rmtree(self.path, ignore_errors=True)
+            else:
+                cleanup_profile(self.path)
+        finally:
+            if self.lock_path:
+                try:
+                    os.remove(self.lock_path)
+                except OSError:
+                    pass
+
+
+def acquire_profile(name):
+    """Lease the first free profile slot for name, or a temporary one if all are busy"""
+    base = os.path.join(PROFILE_ROOT, _safe_name(name))
+    os.makedirs(base, exist_ok=True)
+
+    with _acquire_lock:
+        for slot in range(MAX_SLOTS):
+            path = os.path.join(base, f"slot-{slot}")
+            lock_path = path + ".lock"
+            if not _try_lock(lock_path):
+                if not _lock_is_stale(lock_path):
+                    continue
+                logger.info(f"Taking over stale browser profile lock {lock_path}")
+                try:
+                    os.remove(lock_path)
+                except OSError:
+                    continue
+                if not _try_lock(lock_path):
+                    continue
+            os.makedirs(path, exist_ok=True)
+            return ProfileLease(path, lock_path)
+
+    logger.warning(f"All {MAX_SLOTS} profiles for '{name}' are in use, using a temporary one")
+    return ProfileLease(tempfile.mkdtemp(prefix=f"{_safe_name(name)}-"), temporary=True)
+
+
+def launch_with_profile(name, launch):
+    """Start a browser via launch(user_data_dir) on a leased persistent profile.
+
+    The lease is attached to the driver as driver.profile_lease so the pool can
+    release it when the browser is quit.
+    """
+    if not PERSISTENT_PROFILES:
+        return launch(None)
+
+    lease = acquire_profile(name)
+    try:
+        driver = launch(lease.path)
+    except Exception:
+        lease.release()
+        raise
+    driver.profile_lease = lease
+    return driver
+
+
+def release_profile(driver):
+    """Release the profile leased by launch_with_profile, if any"""
+    lease = getattr(driver, "profile_lease", None)
+    if lease is not None:
+        lease.release()
@@ -0,0 +1,199 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from async_engine import run_blocking, submit_blocking
+from html_archive import REPLAY
+from prices import Price
+
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = os.environ.get(
+    "SCRAPER_RESULT_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "pricescraper", "results.sqlite3"),
+)
+# Seconds a search result counts as fresh; 0 turns the cache off
+RESULT_TTL = float(os.environ.get("SCRAPER_RESULT_TTL", "900"))
+# Least recently used entries beyond this many are evicted
+MAX_ENTRIES = int(os.environ.get("SCRAPER_RESULT_CACHE_SIZE", "500"))
+# Serve an expired result straight away and refresh it in the background,
+# as long as it is no older than STALE_TTL
+STALE_WHILE_REVALIDATE = os.environ.get("SCRAPER_STALE_WHILE_REVALIDATE", "1") != "0"
+STALE_TTL = float(os.environ.get("SCRAPER_RESULT_STALE_TTL", "86400"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    site TEXT NOT NULL,
+    query TEXT NOT NULL,
+    value TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (site, query)
+)
+"""
+
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def normalize_query(query):
+    """'iPhone  15 ' and 'iphone 15' share one cache entry"""
+    return " ".join(str(query).replace("+", " ").split()).casefold()
+
+
+def _encode(value):
+    # Prices keep their range, MRP and source text through the round trip
+    def convert(obj):
+        if isinstance(obj, Price):
+            return {"__price__": [float(obj), obj.high, obj.mrp, obj.raw]}
+        if isinstance(obj, dict):
+            return {key: convert(item) for key, item in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [convert(item) for item in obj]
+        return obj
+
+    return json.dumps(convert(value))
+
+
+def _decode(text):
+    def hook(obj):
+        if "__price__" in obj:
+            amount, high, mrp, raw = obj["__price__"]
+            return Price(amount, high=high, mrp=mrp, raw=raw)
+        return obj
+
+    return json.loads(text, object_hook=hook)
+
+
+def _connect():
+    # A connection per call: scrapes run on executor threads and sqlite3
+    # connections can't be shared between them
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    connection = sqlite3.connect(CACHE_PATH, timeout=10)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute(SCHEMA)
+    return connection
+
+
+def lookup(site, query, ttl=None):
+    """Return (value, state) where state is 'fresh', 'stale' or None on a miss"""
+    ttl = RESULT_TTL if ttl is None else ttl
+    # Replay re-runs the parsers, so it never answers from earlier results
+    if ttl <= 0 or REPLAY:
+        return None, None
+    key = normalize_query(query)
+    try:
+        connection = _connect()
+        try:
+            row = connection.execute(
+                "SELECT value, stored_at FROM results WHERE site = ? AND query = ?", (site, key)).fetchone()
+            if row is None:
+                return None, None
+            age = time.time() - row[1]
+            if age > ttl and not (STALE_WHILE_REVALIDATE and age <= ttl + STALE_TTL):
+                return None, None
+            with connection:
+                connection.execute("UPDATE results SET accessed_at = ? WHERE site = ? AND query = ?",
+                                   (time.time(), site, key))
+            return _decode(row[0]), ("fresh" if age <= ttl else "stale")
+        finally:
+            connection.close()
+    except (sqlite3.Error, ValueError) as e:
+        logger.warning(f"Result cache lookup failed: {e}")
+        return None, None
+
+
+def store(site, query, value):
+    """Save a result and evict the least recently used entries beyond MAX_ENTRIES"""
+    if RESULT_TTL <= 0 or REPLAY:
+        return
+    now = time.time()
+    try:
+        connection = _connect()
+        try:
+            with connection:
+                connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                                   (site, normalize_query(query), _encode(value), now, now))
+                connection.execute(
+                    "DELETE FROM results WHERE rowid NOT IN "
+                    "(SELECT rowid FROM results ORDER BY accessed_at DESC LIMIT ?)", (MAX_ENTRIES,))
+        finally:
+            connection.close()
+    except (sqlite3.Error, TypeError, ValueError) as e:
+        logger.warning(f"Could not cache result for {site} '{query}': {e}")
+
+
+def invalidate(site=None, query=None):
+    """Drop one entry, one site's entries, or the whole cache"""
+    clauses, params = [], []
+    if site is not None:
+        clauses.append("site = ?")
+        params.append(site)
+    if query is not None:
+        clauses.append("query = ?")
+        params.append(normalize_query(query))
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    connection = _connect()
+    try:
+        with connection:
+            connection.execute("DELETE FROM results" + where, params)
+    finally:
+        connection.close()
+
+
+def _fetch_and_store(site, query, fetch):
+    result = fetch()
+    # Empty or failed scrapes are not cached, so the next call tries again
+    if result:
+        store(site, query, result)
+    return result
+
+
+def _refresh_in_background(site, query, domain, fetch):
+    """Re-run fetch on the worker pool, holding a slot on the domain like any other scrape"""
+    key = (site, normalize_query(query))
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def refresh():
+        try:
+            _fetch_and_store(site, query, fetch)
+            logger.info(f"Refreshed cached {site} results for '{query}'")
+        except Exception as e:
+            logger.warning(f"Background refresh of {site} '{query}' failed: {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    submit_blocking(domain, refresh)
+
+
+def cached(site, query, domain, fetch, ttl=None):
+    """Return fetch() through the cache; a stale hit is served while fetch refreshes it"""
+    value, state = lookup(site, query, ttl)
+    if state == "fresh":
+        logger.info(f"Cached {site} results for '{query}'")
+        return value
+    if state == "stale":
+        logger.info(f"Serving stale {site} results for '{query}' while refreshing")
+        _refresh_in_background(site, query, domain, fetch)
+        return value
+    return _fetch_and_store(site, query, fetch)
+
+
+async def cached_async(site, query, domain, fetch, ttl=None):
+    """Async counterpart of cached: only a miss waits for a slot on the domain"""
+    value, state = lookup(site, query, ttl)
+    if state == "fresh":
+        logger.info(f"Cached {site} results for '{query}'")
+        return value
+    if state == "stale":
+        logger.info(f"Serving stale {site} results for '{query}' while refreshing")
+        _refresh_in_background(site, query, domain, fetch)
+        return value
+    return await run_blocking(domain, _fetch_and_store, site, query, fetch)
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger(__name__)
+
+REVIEW_DB = os.environ.get(
+    "SCRAPER_REVIEW_DB",
+    os.path.join(os.path.expanduser("~"), ".cache", "pricescraper", "reviews.sqlite3"),
+)
+# Set SCRAPER_REVIEW_STORE=0 to page through every review on every call
+REVIEW_STORE = os.environ.get("SCRAPER_REVIEW_STORE", "1") != "0"
+# Reviews kept per product; the oldest are dropped first
+MAX_REVIEWS_PER_PRODUCT = int(os.environ.get("SCRAPER_MAX_STORED_REVIEWS", "1000"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    site TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    review_id TEXT NOT NULL,
+    title TEXT,
+    text TEXT,
+    rating REAL,
+    seen_at REAL NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (site, product_id, review_id)
+);
+CREATE TABLE IF NOT EXISTS products (
+    site TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    newest_review_id TEXT,
+    refreshed_at REAL NOT NULL,
+    info TEXT,
+    PRIMARY KEY (site, product_id)
+);
+"""
+
+ASIN_PATTERN = re.compile(r"/(?:dp|gp/product|product-reviews)/([A-Z0-9]{10})(?:[/?]|$)")
+FLIPKART_ITEM_PATTERN = re.compile(r"/(?:p|product-reviews)/(itm[0-9a-zA-Z]+)")
+
+
+def amazon_asin(url):
+    match = ASIN_PATTERN.search(url or "")
+    return match.group(1) if match else None
+
+
+def flipkart_product_id(url):
+    """The pid query parameter, else the itm... id in the path"""
+    pid = parse_qs(urlparse(url or "").query).get("pid")
+    if pid:
+        return pid[0]
+    match = FLIPKART_ITEM_PATTERN.search(url or "")
+    return match.group(1) if match else None
+
+
+def review_id(review):
+    """The site's review id, or a hash of the whole review when the page gives none"""
+    if review.get("id"):
+        return str(review["id"])
+    content = f"{review.get('title') or ''}\n{review.get('text') or ''}\n{review.get('rating') or ''}"
+    return "h:" + hashlib.sha1(content.encode("utf-8")).hexdigest()[:16]
+
+
+def _connect():
+    os.makedirs(os.path.dirname(REVIEW_DB), exist_ok=True)
+    connection = sqlite3.connect(REVIEW_DB, timeout=10)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def known_review_ids(site, product_id):
+    """Ids of every stored review for a product; empty for a product never seen"""
+    if not (REVIEW_STORE and product_id):
+        return set()
+    connection = _connect()
+    try:
+        rows = connection.execute("SELECT review_id FROM reviews WHERE site = ? AND product_id = ?",
+                                  (site, product_id)).fetchall()
+    finally:
+        connection.close()
+    return {row[0] for row in rows}
+
+
+def split_new(page_reviews, known):
+    """Return (new reviews, reached_known) for one page of newest-first reviews.
+
+    reached_known means the page ran into stored reviews, so older pages
+    hold nothing new and paging can stop. Only reviews with a site id count:
+    two different reviews can share a stock title like "Great product", so a
+    hash match is no proof the rest of the page was seen before.
+    """
+    new = [review for review in page_reviews if review_id(review) not in known]
+    reached_known = any(review.get("id") and str(review["id"]) in known for review in page_reviews)
+    return new, reached_known
+
+
+def add_reviews(site, product_id, reviews, info=None):
+    """Store newly seen reviews (newest first) and note the refresh; returns how many were new"""
+    if not (REVIEW_STORE and product_id):
+        return 0
+    now = time.time()
+    connection = _connect()
+    try:
+        with connection:
+            added = 0
+            for position, review in enumerate(reviews):
+                cursor = connection.execute(
+                    "INSERT OR IGNORE INTO reviews VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (site, product_id, review_id(review), review.get("title"), review.get("text"),
+                     review.get("rating"), now, position))
+                added += cursor.rowcount
+            newest = review_id(reviews[0]) if reviews else None
+            connection.execute(
+                "INSERT INTO products VALUES (?, ?, ?, ?, ?) ON CONFLICT (site, product_id) DO UPDATE SET "
+                "newest_review_id = COALESCE(excluded.newest_review_id, newest_review_id), "
+                "refreshed_at = excluded.refreshed_at, info = COALESCE(excluded.info, info)",
+                (site, product_id, newest, now, json.dumps(info) if info else None))
+            connection.execute(
+                "DELETE FROM reviews WHERE site = ? AND product_id = ? AND rowid NOT IN "
+                "(SELECT rowid FROM reviews WHERE site = ? AND product_id = ? "
+                "ORDER BY seen_at DESC, position LIMIT ?)",
+                (site, product_id, site, product_id, MAX_REVIEWS_PER_PRODUCT))
+    finally:
+        connection.close()
+    return added
+
+
+def stored_reviews(site, product_id, limit=None):
+    """Stored reviews for a product, newest first"""
+    if not (REVIEW_STORE and product_id):
+        return []
+    connection = _connect()
+    try:
+        rows = connection.execute(
+            "SELECT review_id, title, text, rating FROM reviews WHERE site = ? AND product_id = ? "
+            "ORDER BY seen_at DESC, position LIMIT ?", (site, product_id, limit or -1)).fetchall()
+    finally:
+        connection.close()
+    return [{"id": row[0], "title": row[1], "text": row[2], "rating": row[3]} for row in rows]
+
+
+def product_info(site, product_id):
+    """Product details saved with the last refresh, or None"""
+    if not (REVIEW_STORE and product_id):
+        return None
+    connection = _connect()
+    try:
+        row = connection.execute("SELECT info FROM products WHERE site = ? AND product_id = ?",
+                                 (site, product_id)).fetchone()
+    finally:
+        connection.close()
+    return json.loads(row[0]) if row and row[0] else None
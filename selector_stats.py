@@ -0,0 +1,155 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+STATS_PATH = os.environ.get(
+    "SCRAPER_SELECTOR_STATS",
+    os.path.join(os.path.expanduser("~"), ".cache", "pricescraper", "selector_stats.json"),
+)
+# Stats are written at most this often (and once more at exit)
+SAVE_INTERVAL = 30
+
+
+def found(result):
+    """Whether a lookup found something: None and empty matches miss, a zero price does not"""
+    if result is None:
+        return False
+    if isinstance(result, (str, list, tuple, dict)):
+        return len(result) > 0
+    return True
+
+
+class SelectorStats:
+    """Hit/miss counts per (site, field, selector), used to try the likely winner first"""
+    def __init__(self, path=STATS_PATH):
+        self.path = path
+        self._stats = None
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._stats is not None:
+            return
+        self._stats = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._stats = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable selector stats {self.path}: {e}")
+
+    def _entry(self, site, field, selector):
+        fields = self._stats.setdefault(site, {}).setdefault(field, {})
+        return fields.setdefault(selector, {"hits": 0, "misses": 0, "last_hit": 0})
+
+    def ordered(self, site, field, candidates):
+        """Candidates with the last winner first, then by hit rate; unseen ones keep their order"""
+        with self._lock:
+            self._load()
+            known = self._stats.get(site, {}).get(field, {})
+
+            def rank(selector):
+                entry = known.get(selector)
+                if not entry:
+                    return (0, 0.0)
+                tries = entry["hits"] + entry["misses"]
+                return (entry["last_hit"], entry["hits"] / tries if tries else 0.0)
+
+            latest = max(candidates, key=lambda selector: rank(selector)[0], default=None)
+            if latest is None or not rank(latest)[0]:
+                return sorted(candidates, key=lambda selector: -rank(selector)[1])
+            rest = [selector for selector in candidates if selector != latest]
+            return [latest] + sorted(rest, key=lambda selector: -rank(selector)[1])
+
+    def record(self, site, field, selector, hit):
+        with self._lock:
+            self._load()
+            entry = self._entry(site, field, selector)
+            if hit:
+                entry["hits"] += 1
+                entry["last_hit"] = time.time()
+            else:
+                entry["misses"] += 1
+            self._dirty = True
+            due = time.monotonic() - self._last_save > SAVE_INTERVAL
+        if due:
+            self.save()
+
+    def first_match(self, site, field, candidates, find, reorder=True):
+        """Try find(selector) in learned order and return (selector, result) for the first one found.
+
+        Pass reorder=False for lists ordered from specific to broad: a broad
+        selector that won once would otherwise be tried first on every page
+        and change which nodes are read. Hits and misses are still recorded.
+        """
+        for selector in (self.ordered(site, field, candidates) if reorder else candidates):
+            try:
+                result = find(selector)
+            except Exception as e:
+                logger.debug(f"Selector {selector} for {site}/{field} failed: {e}")
+                result = None
+            hit = found(result)
+            self.record(site, field, selector, hit)
+            if hit:
+                return selector, result
+        return None, None
+
+    def report(self, site=None):
+        """Rows of (site, field, selector, hits, misses, hit_rate), worst hit rate first"""
+        with self._lock:
+            self._load()
+            rows = []
+            for site_name, fields in self._stats.items():
+                if site and site_name != site:
+                    continue
+                for field, selectors in fields.items():
+                    for selector, entry in selectors.items():
+                        tries = entry["hits"] + entry["misses"]
+                        rows.append((site_name, field, selector, entry["hits"], entry["misses"],
+                                     entry["hits"] / tries if tries else 0.0))
+        return sorted(rows, key=lambda row: row[5])
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._stats)
+            self._dirty = False
+            self._last_save = time.monotonic()
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            partial = f"{self.path}.{os.getpid()}.tmp"
+            with open(partial, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(partial, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save selector stats: {e}")
+
+
+stats = SelectorStats()
+atexit.register(stats.save)
+
+
+def ordered(site, field, candidates):
+    return stats.ordered(site, field, candidates)
+
+
+def record(site, field, selector, hit):
+    stats.record(site, field, selector, hit)
+
+
+def first_match(site, field, candidates, find, reorder=True):
+    return stats.first_match(site, field, candidates, find, reorder)
+
+
+if __name__ == "__main__":
+    # Selectors with a falling hit rate usually mean the site layout changed
+    for site, field, selector, hits, misses, rate in stats.report():
+        print(f"{site:10} {field:14} {rate:6.1%} {hits:6} hits {misses:6} misses  {selector}")
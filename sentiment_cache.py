@@ -0,0 +1,138 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from importlib import metadata
+
+from textblob import TextBlob
+
+logger = logging.getLogger(__name__)
+
+# Scores kept in memory, least recently used dropped first
+MEMORY_SIZE = int(os.environ.get("SCRAPER_SENTIMENT_CACHE_SIZE", "20000"))
+# Set SCRAPER_SENTIMENT_DB= (empty) to keep scores in memory only
+SENTIMENT_DB = os.environ.get(
+    "SCRAPER_SENTIMENT_DB",
+    os.path.join(os.path.expanduser("~"), ".cache", "pricescraper", "sentiment.sqlite3"),
+)
+# Scores from another TextBlob version are not reused
+try:
+    SCORER = f"textblob-{metadata.version('textblob')}"
+except metadata.PackageNotFoundError:
+    SCORER = "textblob"
+
+POSITIVE_THRESHOLD = 0.1
+NEGATIVE_THRESHOLD = -0.1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS polarity (
+    digest TEXT NOT NULL,
+    scorer TEXT NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (digest, scorer)
+)
+"""
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+_db_failed = False
+
+
+def text_key(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def sentiment_label(score):
+    if score > POSITIVE_THRESHOLD:
+        return "Positive 👍"
+    if score < NEGATIVE_THRESHOLD:
+        return "Negative 👎"
+    return "Neutral 😐"
+
+
+def _remember(key, score):
+    with _lock:
+        _memory[key] = score
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_SIZE:
+            _memory.popitem(last=False)
+
+
+def _connect():
+    os.makedirs(os.path.dirname(SENTIMENT_DB), exist_ok=True)
+    connection = sqlite3.connect(SENTIMENT_DB, timeout=10)
+    connection.execute(SCHEMA)
+    return connection
+
+
+def _load(keys):
+    """Scores stored on disk for the given keys; {} when the disk cache is off or broken"""
+    global _db_failed
+    if not (SENTIMENT_DB and keys) or _db_failed:
+        return {}
+    found = {}
+    try:
+        connection = _connect()
+        try:
+            keys = list(keys)
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = connection.execute(
+                    f"SELECT digest, score FROM polarity WHERE scorer = ? AND digest IN ({','.join('?' * len(chunk))})",
+                    [SCORER] + chunk).fetchall()
+                found.update(rows)
+        finally:
+            connection.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Sentiment cache unavailable, scoring in memory only: {e}")
+        _db_failed = True
+    return found
+
+
+def _save(scores):
+    global _db_failed
+    if not (SENTIMENT_DB and scores) or _db_failed:
+        return
+    try:
+        connection = _connect()
+        try:
+            with connection:
+                connection.executemany("INSERT OR REPLACE INTO polarity VALUES (?, ?, ?)",
+                                       [(key, SCORER, score) for key, score in scores.items()])
+        finally:
+            connection.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Could not save sentiment scores: {e}")
+        _db_failed = True
+
+
+def polarities(texts):
+    """TextBlob polarity of every text, scoring each distinct text at most once ever"""
+    keys = [text_key(text) for text in texts]
+    scores = {}
+    with _lock:
+        for key in keys:
+            if key in _memory:
+                scores[key] = _memory[key]
+                _memory.move_to_end(key)
+
+    missing = {key for key in keys if key not in scores}
+    for key, score in _load(missing).items():
+        scores[key] = score
+        _remember(key, score)
+
+    computed = {}
+    for key, text in zip(keys, texts):
+        if key not in scores:
+            scores[key] = computed[key] = TextBlob(text).sentiment.polarity
+            _remember(key, scores[key])
+    _save(computed)
+    return [scores[key] for key in keys]
+
+
+def polarity(text):
+    return polarities([text])[0]
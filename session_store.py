@@ -0,0 +1,188 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+SESSION_DIR = os.environ.get(
+    "SCRAPER_SESSION_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "pricescraper", "sessions"),
+)
+# Cookies without an expiry are only trusted for this long after they were saved
+MAX_SESSION_AGE = float(os.environ.get("SCRAPER_SESSION_MAX_AGE_HOURS", "168")) * 3600
+LOCK_TIMEOUT = 10
+STALE_LOCK_SECONDS = 60
+
+SITE_HOMES = {
+    "amazon": "https://www.amazon.in",
+    "flipkart": "https://www.flipkart.com",
+}
+
+# Cookies that only exist while a user is signed in
+AUTH_COOKIES = {
+    "amazon": ["at-acbin", "x-acbin"],
+}
+
+_thread_lock = threading.Lock()
+_cache = {}
+
+
+def _session_path(site):
+    return os.path.join(SESSION_DIR, f"{site}.json")
+
+
+@contextmanager
+def _locked(site):
+    """Serialise writers across threads and processes with an exclusive lock file"""
+    os.makedirs(SESSION_DIR, exist_ok=True)
+    lock_path = _session_path(site) + ".lock"
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    with _thread_lock:
+        while True:
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                try:
+                    # A writer that died mid-save never removes its lock
+                    if time.time() - os.path.getmtime(lock_path) > STALE_LOCK_SECONDS:
+                        os.remove(lock_path)
+                        continue
+                except OSError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Could not lock session store for {site}")
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
+
+
+def _read(site):
+    """Stored session for site as {"saved_at", "cookies"}, or None"""
+    path = _session_path(site)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    cached = _cache.get(site)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            session = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable session file {path}: {e}")
+        return None
+    _cache[site] = (mtime, session)
+    return session
+
+
+def _is_live(cookie, saved_at, now):
+    expiry = cookie.get("expiry")
+    if expiry is not None:
+        return expiry > now
+    return now - saved_at < MAX_SESSION_AGE
+
+
+def load_cookies(site):
+    """Unexpired cookies stored for site"""
+    session = _read(site)
+    if not session:
+        return []
+    now = time.time()
+    return [cookie for cookie in session["cookies"] if _is_live(cookie, session["saved_at"], now)]
+
+
+def session_version(site):
+    """Save time of the stored session, used to tell whether another worker replaced it"""
+    session = _read(site)
+    return session["saved_at"] if session else None
+
+
+def has_valid_session(site):
+    """True when unexpired cookies (including any sign-in cookies) are stored - no page load needed"""
+    names = {cookie["name"] for cookie in load_cookies(site)}
+    if not names:
+        return False
+    return all(name in names for name in AUTH_COOKIES.get(site, []))
+
+
+def save_session(site, cookies):
+    """Store a browser's cookies (as returned by driver.get_cookies()) for every worker"""
+    now = time.time()
+    cookies = [cookie for cookie in cookies if _is_live(cookie, now, now)]
+    path = _session_path(site)
+    with _locked(site):
+        partial = f"{path}.{os.getpid()}.tmp"
+        with open(partial, "w", encoding="utf-8") as f:
+            json.dump({"saved_at": now, "cookies": cookies}, f)
+        # Readers never see a half-written file
+        os.replace(partial, path)
+    logger.info(f"Saved {len(cookies)} cookies for {site}")
+    return now
+
+
+def invalidate_session(site, version=None):
+    """Drop the stored session; with version, only if nobody has replaced it since"""
+    with _locked(site):
+        if version is not None and session_version(site) != version:
+            return False
+        try:
+            os.remove(_session_path(site))
+        except OSError:
+            pass
+        _cache.pop(site, None)
+    logger.info(f"Invalidated stored session for {site}")
+    return True
+
+
+def _to_cdp(cookie):
+    cdp_cookie = {
+        "name": cookie["name"],
+        "value": cookie["value"],
+        "domain": cookie.get("domain"),
+        "path": cookie.get("path", "/"),
+        "secure": cookie.get("secure", False),
+        "httpOnly": cookie.get("httpOnly", False),
+    }
+    if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+        cdp_cookie["sameSite"] = cookie["sameSite"]
+    if cookie.get("expiry") is not None:
+        cdp_cookie["expires"] = cookie["expiry"]
+    return cdp_cookie
+
+
+def apply_session(driver, site):
+    """Install the stored cookies for site into a browser.
+
+    Uses CDP so no page has to be loaded first; falls back to add_cookie on the
+    site's home page. Returns the session version applied, or None.
+    """
+    version = session_version(site)
+    cookies = load_cookies(site)
+    if not cookies:
+        return None
+
+    try:
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": [_to_cdp(cookie) for cookie in cookies]})
+    except Exception as e:
+        logger.info(f"CDP cookie install failed ({e}), loading {SITE_HOMES[site]} instead")
+        driver.get(SITE_HOMES[site])
+        for cookie in cookies:
+            try:
+                driver.add_cookie(cookie)
+            except Exception:
+                pass
+
+    logger.info(f"Applied {len(cookies)} stored cookies for {site}")
+    return version
@@ -0,0 +1,177 @@
+import json
+import logging
+from lxml import html as lxml_html
+
+from prices import parse_price
+
+logger = logging.getLogger(__name__)
+
+# Collects every JSON-LD block in one round-trip
+JSON_LD_SCRIPT = """
+return Array.from(document.querySelectorAll('script[type="application/ld+json"]')).map(s => s.textContent);
+"""
+
+
+class ProductRecord:
+    """Product details read from schema.org markup"""
+    def __init__(self, name=None, price=None, currency=None, rating=None, rating_count=None,
+                 brand=None, sku=None, url=None, availability=None, source=None):
+        self.name = name
+        self.price = price
+        self.currency = currency
+        self.rating = rating
+        self.rating_count = rating_count
+        self.brand = brand
+        self.sku = sku
+        self.url = url
+        self.availability = availability
+        self.source = source
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    def __repr__(self):
+        return f"ProductRecord(name={self.name!r}, price={self.price!r}, rating={self.rating!r}, source={self.source!r})"
+
+
+def _number(value):
+    try:
+        return float(str(value).replace(",", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+def _count(value):
+    number = _number(value)
+    return int(number) if number is not None else None
+
+
+def _is_product(node):
+    kind = node.get("@type")
+    kinds = kind if isinstance(kind, list) else [kind]
+    return any(isinstance(k, str) and k.split("/")[-1] == "Product" for k in kinds)
+
+
+def _iter_json_ld_nodes(data):
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, dict):
+            yield node
+            if "@graph" in node:
+                stack.append(node["@graph"])
+
+
+def _record_from_json_ld(node):
+    offers = node.get("offers") or {}
+    if isinstance(offers, list):
+        offers = offers[0] if offers else {}
+    price = parse_price(offers.get("price") or offers.get("lowPrice"))
+    high = _number(offers.get("highPrice"))
+    if price is not None and high and high > price:
+        price.high = high
+
+    rating = node.get("aggregateRating") or {}
+    brand = node.get("brand")
+    if isinstance(brand, dict):
+        brand = brand.get("name")
+
+    return ProductRecord(
+        name=node.get("name"),
+        price=price,
+        currency=offers.get("priceCurrency"),
+        rating=_number(rating.get("ratingValue")),
+        rating_count=_count(rating.get("reviewCount") or rating.get("ratingCount")),
+        brand=brand,
+        sku=node.get("sku") or node.get("productID") or node.get("mpn"),
+        url=node.get("url") or offers.get("url"),
+        availability=offers.get("availability"),
+        source="json-ld",
+    )
+
+
+def from_json_ld(blocks):
+    """First schema.org Product in a list of JSON-LD script texts, or None"""
+    for block in blocks:
+        try:
+            data = json.loads(block)
+        except (TypeError, ValueError):
+            continue
+        for node in _iter_json_ld_nodes(data):
+            if _is_product(node):
+                return _record_from_json_ld(node)
+    return None
+
+
+def _itemprop_value(element):
+    for attribute in ("content", "value", "href", "src"):
+        value = element.get(attribute)
+        if value:
+            return value.strip()
+    return element.text_content().strip()
+
+
+def _microdata_props(scope):
+    """itemprop values directly owned by scope, with nested item scopes as dicts"""
+    props = {}
+    for element in scope.iterdescendants():
+        if not element.get("itemprop"):
+            continue
+        # Skip properties that belong to a nested item rather than to this one
+        owner = element.getparent()
+        while owner is not None and owner is not scope and owner.get("itemscope") is None:
+            owner = owner.getparent()
+        if owner is not scope:
+            continue
+        value = _microdata_props(element) if element.get("itemscope") is not None else _itemprop_value(element)
+        for name in element.get("itemprop").split():
+            props.setdefault(name, value)
+    return props
+
+
+def from_microdata(tree):
+    """First schema.org/Product microdata item in a parsed document, or None"""
+    for scope in tree.xpath('//*[@itemscope][contains(@itemtype, "schema.org/Product")]'):
+        props = _microdata_props(scope)
+        offers = props.get("offers") if isinstance(props.get("offers"), dict) else props
+        rating = props.get("aggregateRating") if isinstance(props.get("aggregateRating"), dict) else {}
+        brand = props.get("brand")
+        if isinstance(brand, dict):
+            brand = brand.get("name")
+        return ProductRecord(
+            name=props.get("name"),
+            price=parse_price(offers.get("price") or offers.get("lowPrice")),
+            currency=offers.get("priceCurrency"),
+            rating=_number(rating.get("ratingValue")),
+            rating_count=_count(rating.get("reviewCount") or rating.get("ratingCount")),
+            brand=brand,
+            sku=props.get("sku") or props.get("productID"),
+            url=props.get("url"),
+            availability=offers.get("availability"),
+            source="microdata",
+        )
+    return None
+
+
+def extract_product(html):
+    """Product record from JSON-LD or microdata, parsing the page once; None if neither is present"""
+    try:
+        tree = lxml_html.fromstring(html)
+    except (ValueError, lxml_html.etree.ParserError):
+        return None
+    record = from_json_ld(tree.xpath('//script[@type="application/ld+json"]/text()'))
+    return record or from_microdata(tree)
+
+
+def product_from_driver(driver):
+    """Product record for the page loaded in driver, in one or two round-trips"""
+    try:
+        record = from_json_ld(driver.execute_script(JSON_LD_SCRIPT) or [])
+        if record:
+            return record
+        return from_microdata(lxml_html.fromstring(driver.page_source))
+    except Exception as e:
+        logger.info(f"Could not read structured data: {e}")
+        return None
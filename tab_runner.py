@@ -0,0 +1,130 @@
+import logging
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from waits import READY_SELECTORS, POLL_INTERVAL, site_timeout
+
+logger = logging.getLogger(__name__)
+
+# Tabs driven by one browser; each tab costs far less memory than a new Chrome
+DEFAULT_TABS = int(os.environ.get("SCRAPER_TABS_PER_BROWSER", "4"))
+
+# The old document is flagged before navigating, so a reused tab is never read
+# before its new page has replaced the previous one
+START_SCRIPT = "window.__staleTab = true; window.location.href = arguments[0];"
+STATE_SCRIPT = """
+if (window.__staleTab === true) return 'loading';
+if (document.querySelector(arguments[0])) return 'ready';
+return document.readyState;
+"""
+
+
+class TabJob:
+    """One page to load in a tab, plus how to turn its HTML into a result"""
+    def __init__(self, url, site, ready, parse):
+        self.url = url
+        self.site = site
+        self.ready = ready
+        self.parse = parse
+
+
+class MultiTabBrowser:
+    """Runs several page loads in parallel inside one Chrome process.
+
+    Navigation is started with window.location so it does not block, then the
+    tabs are polled round-robin until each one is ready to be read.
+    """
+    def __init__(self, driver, tabs=DEFAULT_TABS):
+        self.driver = driver
+        self.tabs = max(1, tabs)
+        self.handles = []
+        # Page loads so far, for the pool's recycle count
+        self.pages = 0
+
+    def _open_tabs(self, count):
+        self.handles = list(self.driver.window_handles[:count])
+        while len(self.handles) < count:
+            self.driver.switch_to.new_window('tab')
+            self.handles.append(self.driver.current_window_handle)
+
+    def _start(self, handle, job):
+        self.driver.switch_to.window(handle)
+        self.driver.execute_script(START_SCRIPT, job.url)
+
+    def _start_next(self, handle, queue, active):
+        """Start the next queued job in a tab; a job that fails to start yields None"""
+        while queue:
+            index, job = queue.popleft()
+            try:
+                self._start(handle, job)
+            except Exception as e:
+                logger.error(f"Tab job for {job.url} failed to start: {e}")
+                continue
+            active[handle] = (index, job, time.monotonic())
+            return
+
+    def _is_ready(self, job):
+        state = self.driver.execute_script(STATE_SCRIPT, READY_SELECTORS[job.site][job.ready])
+        # A finished page without the marker (e.g. "no results") is still done
+        return state in ("ready", "complete")
+
+    def run(self, jobs):
+        """Run every job and return the parsed results in the same order.
+
+        A job that fails or times out yields None.
+        """
+        jobs = list(jobs)
+        results = [None] * len(jobs)
+        if not jobs:
+            return results
+        self.pages += len(jobs)
+
+        self._open_tabs(min(self.tabs, len(jobs)))
+        queue = deque(enumerate(jobs))
+        active = {}
+
+        for handle in self.handles:
+            self._start_next(handle, queue, active)
+
+        while active:
+            for handle, (index, job, started) in list(active.items()):
+                finished = False
+                try:
+                    self.driver.switch_to.window(handle)
+                    if self._is_ready(job):
+                        results[index] = job.parse(self.driver.page_source)
+                        finished = True
+                    elif time.monotonic() - started > site_timeout(job.site):
+                        logger.warning(f"Tab timed out loading {job.url}")
+                        finished = True
+                except Exception as e:
+                    logger.error(f"Tab job for {job.url} failed: {e}")
+                    finished = True
+
+                if finished:
+                    del active[handle]
+                    self._start_next(handle, queue, active)
+
+            if active:
+                time.sleep(POLL_INTERVAL)
+
+        return results
+
+
+@contextmanager
+def tab_browser(pool, tabs=DEFAULT_TABS):
+    """Borrow one browser from a pool for several rounds of tab jobs"""
+    pooled = pool.checkout()
+    browser = MultiTabBrowser(pooled.driver, tabs)
+    try:
+        yield browser
+    finally:
+        pool.checkin(pooled, pages=browser.pages)
+
+
+def run_in_tabs(pool, jobs, tabs=DEFAULT_TABS):
+    """Borrow one browser from a pool and spread the jobs across its tabs"""
+    with tab_browser(pool, tabs) as browser:
+        return browser.run(jobs)
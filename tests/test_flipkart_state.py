@@ -0,0 +1,18 @@
+from flipkart_state import iter_state_reviews
+
+
+def test_review_values_are_read():
+    payload = {"slots": [{"value": {"type": "ProductReviewValue", "id": "R1", "title": "Great",
+                                    "text": "Works well", "rating": 5}}]}
+    assert [r["id"] for r in iter_state_reviews(payload)] == ["R1"]
+
+
+def test_product_nodes_are_not_reviews():
+    payload = {"slots": [{"value": {"id": "MOBXYZ", "rating": 4.3, "text": "Galaxy M14 5G"}},
+                         {"value": {"id": "SELLER1", "rating": 4.1, "text": "RetailNet"}}]}
+    assert list(iter_state_reviews(payload)) == []
+
+
+def test_author_marks_a_review():
+    payload = [{"id": "R2", "author": "Asha", "rating": 4, "text": "Good battery"}]
+    assert [r["text"] for r in iter_state_reviews(payload)] == ["Good battery"]
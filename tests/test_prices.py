@@ -0,0 +1,50 @@
+from prices import Price, parse_price
+
+
+def test_plain_price():
+    price = parse_price("₹1,23,456")
+    assert price == 123456
+    assert not price.is_range
+
+
+def test_range_takes_low_end():
+    price = parse_price("₹499 - ₹799")
+    assert price == 499
+    assert price.high == 799
+
+
+def test_discount_percentage_is_not_a_range():
+    price = parse_price("₹1,299 -35%")
+    assert price == 1299
+    assert price.high is None
+
+
+def test_discount_after_a_range():
+    price = parse_price("₹1,299-₹1,499 -10%")
+    assert price == 1299
+    assert price.high == 1499
+
+
+def test_discount_with_mrp():
+    price = parse_price("M.R.P.: ₹2,000 ₹1,299 -35%")
+    assert price == 1299
+    assert price.mrp == 2000
+    assert round(price.discount) == 35
+
+
+def test_high_end_needs_currency_sign():
+    price = parse_price("₹499 - 799")
+    assert price == 499
+    assert price.high is None
+
+
+def test_zero_price_is_a_price():
+    price = parse_price("₹0")
+    assert price is not None
+    assert price == 0
+
+
+def test_no_price():
+    assert parse_price("Currently unavailable") is None
+    assert parse_price("") is None
+    assert isinstance(parse_price(10), Price)
@@ -0,0 +1,25 @@
+from prices import Price
+from selector_stats import SelectorStats
+
+
+def test_zero_price_is_a_hit(tmp_path):
+    stats = SelectorStats(str(tmp_path / "stats.json"))
+    results = {"a": None, "b": Price(0), "c": Price(99)}
+    selector, result = stats.first_match("site", "price", ["a", "b", "c"], results.get, reorder=False)
+    assert selector == "b"
+    assert result == 0
+
+
+def test_empty_matches_are_misses(tmp_path):
+    stats = SelectorStats(str(tmp_path / "stats.json"))
+    results = {"a": [], "b": "", "c": ["node"]}
+    assert stats.first_match("site", "title", ["a", "b", "c"], results.get) == ("c", ["node"])
+    assert stats.first_match("site", "title", ["a", "b"], results.get) == (None, None)
+
+
+def test_fixed_order_ignores_last_winner(tmp_path):
+    stats = SelectorStats(str(tmp_path / "stats.json"))
+    stats.record("site", "results", "broad", True)
+    results = {"specific": ["x"], "broad": ["x", "y"]}
+    assert stats.ordered("site", "results", ["specific", "broad"]) == ["broad", "specific"]
+    assert stats.first_match("site", "results", ["specific", "broad"], results.get, reorder=False)[0] == "specific"
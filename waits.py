@@ -0,0 +1,119 @@
+import logging
+import os
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+
+logger = logging.getLogger(__name__)
+
+# How often the wait engine re-checks the page
+POLL_INTERVAL = 0.1
+
+# Longest we are prepared to wait for each site before giving up
+SITE_TIMEOUTS = {
+    "amazon": float(os.environ.get("SCRAPER_AMAZON_TIMEOUT", "15")),
+    "flipkart": float(os.environ.get("SCRAPER_FLIPKART_TIMEOUT", "20")),
+}
+
+# CSS selectors that signal a page (or part of it) is ready to be read
+READY_SELECTORS = {
+    "amazon": {
+        "results": 'div[data-component-type="s-search-result"], div.s-result-item',
+        "product": '#productTitle, #dp-container, #averageCustomerReviews',
+        "reviews": 'div[data-hook="review"], a[data-hook="review-title"], span[data-hook="review-title"], a.review-title-content',
+        "review_link": "a[data-hook='see-all-reviews-link-foot'], a.a-link-emphasis[href*='customer-reviews'], a[href*='product-reviews']",
+        "next_page": 'li.a-last a, a[href*="pageNumber"]',
+        "login": 'form[name="signIn"], #ap_email, #ap_password',
+    },
+    "flipkart": {
+        "results": 'div[data-id], div._1YokD2._3Mn1Gg, div._1AtVbE, div._4ddWXP, div._1xHGtK, a[href*="/p/"]',
+        "product": 'span.B_NuCI, h1.yhB1nd, div._30jeq3, h1',
+        "reviews": 'div.t-ZTKy, div._6K-7Co, p._2-N8zT, div._2sc7ZR, div._27M-vq',
+        "next_page": 'a._1LKTO3, nav a[href*="page="]',
+        "popup": 'button._2KpZ6l._2doB4z',
+    },
+}
+
+
+def site_timeout(site, timeout=None):
+    return timeout if timeout is not None else SITE_TIMEOUTS.get(site, 15)
+
+
+def wait_for(driver, site, kinds, timeout=None):
+    """Wait until any of the given page parts is present.
+
+    Returns the name of the first kind that appeared, or None on timeout.
+    """
+    if isinstance(kinds, str):
+        kinds = (kinds,)
+    selectors = [(kind, READY_SELECTORS[site][kind]) for kind in kinds]
+
+    def _present(d):
+        for kind, selector in selectors:
+            if d.find_elements(By.CSS_SELECTOR, selector):
+                return kind
+        return False
+
+    start = time.monotonic()
+    try:
+        found = WebDriverWait(driver, site_timeout(site, timeout), poll_frequency=POLL_INTERVAL).until(_present)
+        logger.debug(f"{site} '{found}' ready after {time.monotonic() - start:.2f}s")
+        return found
+    except TimeoutException:
+        logger.info(f"Timed out after {time.monotonic() - start:.1f}s waiting for {site} {'/'.join(kinds)}")
+        return None
+
+
+def wait_for_document(driver, timeout=10):
+    """Wait until the browser reports the document as fully loaded"""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
+def wait_for_staleness(driver, element, timeout=10):
+    """Wait until an element is detached from the page, e.g. after a click navigates away"""
+    def _stale(_):
+        try:
+            element.is_enabled()
+            return False
+        except StaleElementReferenceException:
+            return True
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(_stale)
+        return True
+    except TimeoutException:
+        return False
+
+
+def wait_for_url_change(driver, old_url, timeout=10):
+    """Wait until the browser has navigated away from old_url"""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(lambda d: d.current_url != old_url)
+        return True
+    except TimeoutException:
+        return False
+
+
+def scroll_until_stable(driver, steps=3, timeout=0.5):
+    """Scroll down in steps, waiting only as long as the page keeps growing"""
+    stable = 0
+    for step in range(1, steps + 1):
+        height = driver.execute_script("return document.body.scrollHeight")
+        driver.execute_script(f"window.scrollTo(0, document.body.scrollHeight*{step}/{steps});")
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(
+                lambda d: d.execute_script("return document.body.scrollHeight") > height
+            )
+            stable = 0
+        except TimeoutException:
+            # One quiet step can just be a slow lazy-load; two in a row means the page is done
+            stable += 1
+            if stable >= 2:
+                break